@@ -0,0 +1,159 @@
+"""
+API catalog: the HAR's requests collapsed into endpoint templates.
+
+A page polling `/api/items/123?ts=...` records hundreds of near-identical
+entries. Entries are grouped by method plus URL template: path segments
+that look like identifiers (numbers, UUIDs, long hex or token strings)
+become `{id}` and the query keeps only its keys (`?page={page}&ts={ts}`,
+sorted). Each endpoint carries its request count, status distribution,
+latency (from the entry's `timings`) and response size percentiles, and
+one sample request/response, truncated to SAMPLE_BODY_CHARS characters.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from har import read_response_body
+from run_stats import summarize
+
+SAMPLE_BODY_CHARS = 2000
+
+# Phases that add up to an entry's total time; `ssl` is already part of `connect`.
+TIMING_PHASES = ("blocked", "dns", "connect", "send", "wait", "receive")
+
+_UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+_HEX = re.compile(r"^[0-9a-f]{16,}$", re.IGNORECASE)
+_TOKEN = re.compile(r"^[A-Za-z0-9_-]{20,}$")
+
+
+def _is_id_segment(segment: str) -> bool:
+    if segment.isdigit() or _UUID.match(segment):
+        return True
+    has_digit = any(c.isdigit() for c in segment)
+    if _HEX.match(segment):
+        return has_digit
+    return bool(_TOKEN.match(segment)) and has_digit and any(c.isalpha() for c in segment)
+
+
+def template_url(url: str) -> str:
+    """`url` with identifier segments as `{id}` and query values as `{key}`."""
+    parts = urlsplit(url)
+    path = "/".join("{id}" if _is_id_segment(s) else s for s in parts.path.split("/"))
+    keys = sorted({key for key, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    query = "&".join(f"{key}={{{key}}}" for key in keys)
+    origin = f"{parts.scheme}://{parts.netloc}" if parts.scheme else ""
+    return f"{origin}{path}" + (f"?{query}" if query else "")
+
+
+def entry_latency_ms(entry: Dict[str, Any]) -> Optional[float]:
+    """Sum of the entry's timing phases (-1 means not applicable), else its `time`."""
+    timings = entry.get("timings") or {}
+    phases = [timings.get(phase) for phase in TIMING_PHASES]
+    values = [value for value in phases if isinstance(value, (int, float)) and value >= 0]
+    if values:
+        return float(sum(values))
+    total = entry.get("time")
+    return float(total) if isinstance(total, (int, float)) and total >= 0 else None
+
+
+def response_bytes(response: Dict[str, Any]) -> Optional[int]:
+    for size in ((response.get("content") or {}).get("size"), response.get("bodySize")):
+        if isinstance(size, int) and size >= 0:
+            return size
+    return None
+
+
+def _truncate(body: Optional[str]) -> Tuple[Optional[str], bool]:
+    if body is None or len(body) <= SAMPLE_BODY_CHARS:
+        return body, False
+    return body[:SAMPLE_BODY_CHARS], True
+
+
+def _is_success(status: Any) -> bool:
+    return isinstance(status, int) and 200 <= status < 300
+
+
+@dataclass
+class _Endpoint:
+    method: str
+    url: str
+    statuses: Counter = field(default_factory=Counter)
+    latencies: List[float] = field(default_factory=list)
+    sizes: List[int] = field(default_factory=list)
+    sample: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        sample = self.sample or {}
+        return {
+            "method": self.method,
+            "url": self.url,
+            "status": self.statuses.most_common(1)[0][0],
+            "count": sum(self.statuses.values()),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            "latencyMs": summarize(self.latencies),
+            "responseBytes": summarize(self.sizes),
+            "sampleUrl": sample.get("url"),
+            "sampleRequestBody": sample.get("requestBody"),
+            "sampleResponseBody": sample.get("responseBody"),
+            "sampleTruncated": sample.get("truncated", False),
+        }
+
+
+class CatalogBuilder:
+    """Folds HAR entries, one at a time, into endpoint templates."""
+
+    def __init__(self, har_dir: Path) -> None:
+        # Attached bodies (HAR content mode "attach") are resolved relative to the HAR.
+        self.har_dir = har_dir
+        self.entries = 0
+        self._endpoints: Dict[Tuple[str, str], _Endpoint] = {}
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        request = entry.get("request", {})
+        response = entry.get("response", {})
+        method = request.get("method", "")
+        url = request.get("url", "")
+        status = response.get("status", 0)
+
+        key = (method, template_url(url))
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = self._endpoints[key] = _Endpoint(method, key[1])
+        self.entries += 1
+        endpoint.statuses[status] += 1
+        latency = entry_latency_ms(entry)
+        if latency is not None:
+            endpoint.latencies.append(latency)
+        size = response_bytes(response)
+        if size is not None:
+            endpoint.sizes.append(size)
+
+        # The first successful call is the sample (the first call until one succeeds);
+        # bodies of the others are never read.
+        if endpoint.sample is None or (not endpoint.sample["success"] and _is_success(status)):
+            post_data = request.get("postData", {})
+            request_body, request_cut = _truncate(
+                post_data.get("text") if isinstance(post_data, dict) else None
+            )
+            response_body, response_cut = _truncate(
+                read_response_body(response.get("content", {}), self.har_dir)
+            )
+            endpoint.sample = {
+                "url": url,
+                "success": _is_success(status),
+                "requestBody": request_body,
+                "responseBody": response_body,
+                "truncated": request_cut or response_cut,
+            }
+
+    def catalog(self) -> Dict[str, Any]:
+        return {
+            "entries": self.entries,
+            "endpoints": [endpoint.to_dict() for endpoint in self._endpoints.values()],
+        }
@@ -0,0 +1,120 @@
+"""
+Reuse of a logged-in browser session across runs of the same job.
+
+When a run passes the job's login flow (`flow_login` in the semantic
+model, matched against the test's steps by action and selector), the
+runner saves the context's Playwright `storageState` and the URL the login
+led to. Later runs that ask to start authenticated load that state into
+their context, skip the login steps and go to that URL instead, until the
+entry is older than `ttl_seconds` (0 turns reuse off). A run that fails
+after reusing a state drops it, so the next run logs in afresh.
+
+States hold session cookies, so they live under `<storage_root>/_cache/auth/`
+(readable by the owner only) rather than among the job's artifacts.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from config import settings
+from storage import LocalFSStorageAdapter, storage_adapter
+
+LOGIN_FLOW_ID = "flow_login"
+
+
+def login_step_range(
+    steps: List[Dict[str, Any]],
+    semantic_model: Optional[Dict[str, Any]],
+) -> Optional[range]:
+    """
+    Indexes (0-based) of the test steps that perform the login flow, or
+    None when the model has no login flow or the test does not contain it.
+    """
+    if not semantic_model:
+        return None
+    flow = next(
+        (f for f in semantic_model.get("flows", []) if f.get("id") == LOGIN_FLOW_ID),
+        None,
+    )
+    if not flow or not flow.get("steps"):
+        return None
+
+    selectors = {el["id"]: el.get("selector") for el in semantic_model.get("elements", [])}
+    wanted = [(s.get("action"), selectors.get(s.get("target"))) for s in flow["steps"]]
+    actual = [(s.get("action"), s.get("selector")) for s in steps]
+    for start in range(len(actual) - len(wanted) + 1):
+        if actual[start : start + len(wanted)] == wanted:
+            return range(start, start + len(wanted))
+    return None
+
+
+def load_semantic_model(storage: LocalFSStorageAdapter, job_id: str) -> Optional[Dict[str, Any]]:
+    path = storage.root / job_id / "semantic_model.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+class SavedSession(NamedTuple):
+    storage_state: Dict[str, Any]
+    url: Optional[str]  # where the login led; None in entries saved without it
+
+
+class AuthStateCache:
+    def __init__(
+        self,
+        storage: LocalFSStorageAdapter,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.storage = storage
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.root = storage.root / "_cache" / "auth"
+
+    def _path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.json"
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job's saved storageState, unless missing or expired."""
+        session = self.load_session(job_id)
+        return session.storage_state if session else None
+
+    def load_session(self, job_id: str) -> Optional[SavedSession]:
+        """The job's saved session, unless missing or expired."""
+        if not self.enabled:
+            return None
+        try:
+            entry = json.loads(self._path(job_id).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if self.clock() - entry.get("createdAt", 0) > self.ttl_seconds:
+            return None
+        return SavedSession(entry.get("storageState"), entry.get("url"))
+
+    def store(self, job_id: str, storage_state: Dict[str, Any], url: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(job_id)
+        tmp_path = path.with_suffix(".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"createdAt": self.clock(), "storageState": storage_state, "url": url}, handle)
+        tmp_path.replace(path)
+
+    def invalidate(self, job_id: str) -> None:
+        self._path(job_id).unlink(missing_ok=True)
+
+
+auth_state_cache = AuthStateCache(storage_adapter, settings.runner_auth_state_ttl_seconds)
@@ -0,0 +1,165 @@
+"""
+Batch test runs: many (job, test) pairs executed as queued runner tasks.
+
+The backend assigns every run its id up front and splits the batch into
+shards (see sharding.py), one runner task each. A shard's runs execute
+concurrently on one shared browser and write the usual per-run reports
+into each job's directory, plus a shard report under
+`<storage_root>/_batches/`. The batch plan saved next to them lets the
+shard reports be merged into one aggregated report.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sharding import Shard
+
+BATCH_DIR = "_batches"
+
+
+@dataclass(frozen=True)
+class BatchRun:
+    job_id: str
+    test_id: str
+    run_id: str
+    test_profile: Optional[str] = None  # picks the run's default timeouts
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return asdict(self)
+
+
+def new_batch_id() -> str:
+    return f"batch_{uuid.uuid4().hex}"
+
+
+def plan_batch(
+    batch_id: str,
+    pairs: List[tuple[str, str]],
+    profiles: Optional[Dict[str, str]] = None,
+) -> List[BatchRun]:
+    """
+    Give each (job_id, test_id) pair a run id derived from the batch id,
+    and the job's test profile from `profiles` (job_id -> profile).
+    """
+    profiles = profiles or {}
+    return [
+        BatchRun(
+            job_id=job_id,
+            test_id=test_id,
+            run_id=f"{batch_id}_{index}",
+            test_profile=profiles.get(job_id),
+        )
+        for index, (job_id, test_id) in enumerate(pairs, start=1)
+    ]
+
+
+def batch_report_name(batch_id: str, shard: Optional[int] = None) -> str:
+    return f"{batch_id}.json" if shard is None else f"{batch_id}.shard{shard}.json"
+
+
+def batch_plan_name(batch_id: str) -> str:
+    return f"{batch_id}.plan.json"
+
+
+def batch_plan(batch_id: str, shards: List[Shard[BatchRun]]) -> Dict[str, Any]:
+    return {
+        "batchId": batch_id,
+        "shards": [
+            {
+                "shard": index,
+                "estimatedMs": shard.estimated_ms,
+                "runIds": [run.run_id for run in shard.items],
+            }
+            for index, shard in enumerate(shards, start=1)
+        ],
+    }
+
+
+def aggregate_batch_report(
+    batch_id: str,
+    runs: List[BatchRun],
+    statuses: List[str],
+    started_at: datetime,
+    finished_at: datetime,
+) -> Dict[str, Any]:
+    """
+    One report for the whole batch. `statuses` lines up with `runs`; a run
+    that could not be executed at all is reported as "error", one cut off
+    by the end of the batch task as "interrupted".
+    """
+    counts: Dict[str, int] = {}
+    entries = []
+    for run, run_status in zip(runs, statuses):
+        counts[run_status] = counts.get(run_status, 0) + 1
+        entries.append(
+            {
+                "jobId": run.job_id,
+                "testId": run.test_id,
+                "runId": run.run_id,
+                "status": run_status,
+                "report": f"{run.job_id}/test_report_{run.run_id}.json",
+            }
+        )
+
+    return {
+        "batchId": batch_id,
+        "status": "passed" if runs and counts.get("passed", 0) == len(runs) else "failed",
+        "total": len(runs),
+        "counts": counts,
+        "runs": entries,
+        "startedAt": started_at.isoformat(),
+        "finishedAt": finished_at.isoformat(),
+    }
+
+
+def merge_shard_reports(
+    plan: Dict[str, Any],
+    shard_reports: Dict[int, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Combine the reports of a sharded batch. Until every shard has reported
+    the batch is "running" and only finished shards' runs are listed.
+    """
+    counts: Dict[str, int] = {}
+    runs: List[Dict[str, Any]] = []
+    shards = []
+    for shard in plan["shards"]:
+        report = shard_reports.get(shard["shard"])
+        summary = {
+            "shard": shard["shard"],
+            "estimatedMs": shard["estimatedMs"],
+            "runs": len(shard["runIds"]),
+            "status": report["status"] if report else "pending",
+        }
+        if report:
+            summary["startedAt"] = report["startedAt"]
+            summary["finishedAt"] = report["finishedAt"]
+            runs.extend(report["runs"])
+            for run_status, count in report["counts"].items():
+                counts[run_status] = counts.get(run_status, 0) + count
+        shards.append(summary)
+
+    total = sum(len(shard["runIds"]) for shard in plan["shards"])
+    done = len(shard_reports) == len(plan["shards"])
+    if not done:
+        batch_status = "running"
+    elif counts.get("passed", 0) == total:
+        batch_status = "passed"
+    else:
+        batch_status = "failed"
+
+    finished = [s for s in shards if "finishedAt" in s]
+    return {
+        "batchId": plan["batchId"],
+        "status": batch_status,
+        "total": total,
+        "counts": counts,
+        "runs": runs,
+        "shards": shards,
+        "startedAt": min((s["startedAt"] for s in finished), default=None),
+        "finishedAt": max((s["finishedAt"] for s in finished), default=None) if done else None,
+    }
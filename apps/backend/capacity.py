@@ -0,0 +1,71 @@
+"""
+Sizing of in-process concurrency from the host's CPU and memory.
+
+Workers that run several browser contexts at once use `concurrency_cap` so
+a configured value never exceeds what the container can actually hold.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity/cpusets where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def _meminfo_available_mb() -> float | None:
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _cgroup_available_mb() -> float | None:
+    # cgroup v2: the container's limit minus what it already uses.
+    try:
+        limit = Path("/sys/fs/cgroup/memory.max").read_text().strip()
+        current = Path("/sys/fs/cgroup/memory.current").read_text().strip()
+    except OSError:
+        return None
+    if limit == "max":
+        return None
+    try:
+        return max(0, int(limit) - int(current)) / (1024 * 1024)
+    except ValueError:
+        return None
+
+
+def available_memory_mb() -> float | None:
+    """Memory still available to this container, or None if unknown."""
+    candidates = [mb for mb in (_meminfo_available_mb(), _cgroup_available_mb()) if mb is not None]
+    return min(candidates) if candidates else None
+
+
+def concurrency_cap(
+    configured: int,
+    cpus: int,
+    memory_mb: float | None,
+    per_cpu: int,
+    per_slot_mb: int,
+) -> int:
+    """
+    Slots to run at once: `configured` (0 means no explicit limit), bounded
+    by `per_cpu` slots per CPU and by how many `per_slot_mb` slots fit in
+    `memory_mb`. Never less than 1.
+    """
+    limits = []
+    if configured > 0:
+        limits.append(configured)
+    if per_cpu > 0:
+        limits.append(cpus * per_cpu)
+    if memory_mb is not None and per_slot_mb > 0:
+        limits.append(int(memory_mb // per_slot_mb))
+    return max(1, min(limits)) if limits else 1
@@ -12,6 +12,53 @@ class Settings(BaseSettings):
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
     storage_backend: str = Field(default="localfs", alias="STORAGE_BACKEND")
     storage_root: str = Field(default="./artifacts", alias="STORAGE_ROOT")
+    timeline_dir: str = Field(default=".", alias="TIMELINE_DIR")
+    extractor_browser_max_jobs: int = Field(
+        default=50,
+        alias="EXTRACTOR_BROWSER_MAX_JOBS",
+    )
+    extractor_browser_max_rss_mb: int = Field(
+        default=1024,
+        alias="EXTRACTOR_BROWSER_MAX_RSS_MB",
+    )
+    extractor_concurrency: int = Field(default=4, alias="EXTRACTOR_CONCURRENCY")
+    extractor_job_timeout_seconds: float = Field(
+        default=120.0,
+        alias="EXTRACTOR_JOB_TIMEOUT_SECONDS",
+    )
+    # Comma-separated; see extraction_profiles.build_extraction_profiles.
+    extractor_allow_hosts: str = Field(default="", alias="EXTRACTOR_ALLOW_HOSTS")
+    extractor_deny_hosts: str = Field(default="", alias="EXTRACTOR_DENY_HOSTS")
+    extractor_fast_block_resource_types: str = Field(
+        default="image,media,font",
+        alias="EXTRACTOR_FAST_BLOCK_RESOURCE_TYPES",
+    )
+    runner_browser_max_runs: int = Field(default=100, alias="RUNNER_BROWSER_MAX_RUNS")
+    runner_browser_max_rss_mb: int = Field(default=1024, alias="RUNNER_BROWSER_MAX_RSS_MB")
+    runner_concurrency: int = Field(default=0, alias="RUNNER_CONCURRENCY")
+    runner_contexts_per_cpu: int = Field(default=2, alias="RUNNER_CONTEXTS_PER_CPU")
+    runner_context_memory_mb: int = Field(default=200, alias="RUNNER_CONTEXT_MEMORY_MB")
+    runner_run_timeout_seconds: float = Field(
+        default=300.0,
+        alias="RUNNER_RUN_TIMEOUT_SECONDS",
+    )
+    runner_auth_state_ttl_seconds: float = Field(
+        default=1800.0,
+        alias="RUNNER_AUTH_STATE_TTL_SECONDS",
+    )
+    run_events_ttl_seconds: float = Field(default=3600.0, alias="RUN_EVENTS_TTL_SECONDS")
+    semantic_html_parser: str = Field(default="auto", alias="SEMANTIC_HTML_PARSER")
+    semantic_cache_enabled: bool = Field(default=True, alias="SEMANTIC_CACHE_ENABLED")
+    semantic_cache_max_entries: int = Field(default=256, alias="SEMANTIC_CACHE_MAX_ENTRIES")
+    extraction_cache_enabled: bool = Field(default=True, alias="EXTRACTION_CACHE_ENABLED")
+    extraction_cache_ttl_seconds: float = Field(
+        default=86400.0,
+        alias="EXTRACTION_CACHE_TTL_SECONDS",
+    )
+    extraction_cache_probe_timeout_seconds: float = Field(
+        default=5.0,
+        alias="EXTRACTION_CACHE_PROBE_TIMEOUT_SECONDS",
+    )
 
     class Config:
         env_file = ".env"
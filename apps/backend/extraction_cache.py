@@ -0,0 +1,200 @@
+"""
+Reuse of earlier extractions when the target page has not changed.
+
+Jobs against the same `target_url` and extraction profile share a cache
+entry pointing at the last job that actually loaded the page. Two checks
+decide how much of that job can be reused, cheapest first:
+
+- not_modified: a conditional HEAD request (If-None-Match /
+  If-Modified-Since) answers 304, or the ETag is unchanged. Every artifact
+  of the earlier job is linked into the new one and no browser is started.
+- dom_match: the page is loaded and its DOM hashes the same as before. The
+  DOM-derived artifacts (accessibility tree, semantic candidates) are
+  linked; the screenshot and HAR are captured fresh.
+
+The semantic step's outputs are never linked, as they would outlive the
+code that built them: it rebuilds `semantic_model.json` (from
+semantic_cache.py when the input and rules are unchanged) and
+`api_catalog.json` from the job's own HAR.
+
+Entries live under `<storage_root>/_cache/extraction/` and expire after
+`ttl_seconds`, so a page is fully re-captured at least that often.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from config import settings
+from har import attached_files
+from storage import ArtifactRecord, LocalFSStorageAdapter, storage_adapter
+
+# Artifacts a DOM match may reuse: they depend on nothing but the DOM.
+DOM_DERIVED_ARTIFACTS = ("accessibility.json", "semantic_candidates.json")
+
+
+def cache_key(target_url: str, profile_name: str) -> str:
+    return hashlib.sha256(f"{profile_name}\n{target_url}".encode("utf-8")).hexdigest()
+
+
+def dom_hash(outer_html: str) -> str:
+    return hashlib.sha256(outer_html.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    job_id: str
+    target_url: str
+    profile: str
+    dom_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    created_at: float = 0.0
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of the conditional request sent before loading the page."""
+
+    status: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "ProbeResult":
+        return cls(
+            status=response.status_code,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+
+    def unchanged_since(self, entry: CacheEntry) -> bool:
+        if self.status == 304:
+            return bool(entry.etag or entry.last_modified)
+        # Some servers ignore conditional HEAD requests but still send the ETag.
+        return self.status == 200 and self.etag is not None and self.etag == entry.etag
+
+
+def probe(target_url: str, entry: CacheEntry | None, timeout: float) -> ProbeResult | None:
+    """Send the conditional request; None if the server could not be reached."""
+    headers = entry.conditional_headers() if entry else {}
+    try:
+        response = httpx.head(target_url, headers=headers, timeout=timeout, follow_redirects=True)
+    except httpx.HTTPError:
+        return None
+    return ProbeResult.from_response(response)
+
+
+async def probe_async(target_url: str, entry: CacheEntry | None, timeout: float) -> ProbeResult | None:
+    headers = entry.conditional_headers() if entry else {}
+    try:
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+            response = await client.head(target_url, headers=headers)
+    except httpx.HTTPError:
+        return None
+    return ProbeResult.from_response(response)
+
+
+class ExtractionCache:
+    def __init__(
+        self,
+        storage: LocalFSStorageAdapter,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.storage = storage
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.root = storage.root / "_cache" / "extraction"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def lookup(self, target_url: str, profile_name: str) -> CacheEntry | None:
+        """The live entry for this URL and profile, if its source job still exists."""
+        path = self._entry_path(cache_key(target_url, profile_name))
+        try:
+            entry = CacheEntry(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        if self.ttl_seconds > 0 and self.clock() - entry.created_at > self.ttl_seconds:
+            return None
+        if not (self.storage.root / entry.job_id / "manifest.json").is_file():
+            return None
+        return entry
+
+    def store(
+        self,
+        job_id: str,
+        target_url: str,
+        profile_name: str,
+        fingerprint: str,
+        probed: ProbeResult | None,
+    ) -> CacheEntry:
+        entry = CacheEntry(
+            job_id=job_id,
+            target_url=target_url,
+            profile=profile_name,
+            dom_hash=fingerprint,
+            etag=probed.etag if probed else None,
+            last_modified=probed.last_modified if probed else None,
+            created_at=self.clock(),
+        )
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(cache_key(target_url, profile_name))
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(entry)), encoding="utf-8")
+        tmp_path.replace(path)
+        return entry
+
+    def reuse(self, entry: CacheEntry, job_id: str, names: Iterable[str]) -> List[ArtifactRecord]:
+        """
+        Link the named artifacts of the entry's job into `job_id` and return
+        their manifest records; files the earlier job does not have are skipped.
+        """
+        previous = {record.name: record for record in self.storage.load_manifest(entry.job_id)}
+        records: List[ArtifactRecord] = []
+        for name in names:
+            path = self.storage.link_artifact(entry.job_id, job_id, name)
+            if path is None:
+                continue
+            record = previous.get(name) or ArtifactRecord(
+                name=name,
+                type="unknown",
+                path=path,
+            )
+            if record.type == "har":
+                # Bodies recorded in attach mode sit next to the HAR.
+                har_path = self.storage.root / entry.job_id / name
+                for attached in attached_files(har_path):
+                    self.storage.link_artifact(entry.job_id, job_id, attached)
+            records.append(
+                replace(record, path=path, details={**record.details, "reusedFrom": entry.job_id})
+            )
+        return records
+
+    def reusable_artifacts(self, entry: CacheEntry) -> List[str]:
+        """Everything the earlier job's extraction produced, minus its own summary."""
+        return [
+            record.name
+            for record in self.storage.load_manifest(entry.job_id)
+            if record.type != "extraction"
+        ]
+
+
+extraction_cache = ExtractionCache(storage_adapter, settings.extraction_cache_ttl_seconds)
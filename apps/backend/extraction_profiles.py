@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from config import Settings, settings
+from har import TEXTUAL_CONTENT_TYPES
+
+
+def _split_list(value: str) -> Tuple[str, ...]:
+    """A comma-separated setting as a tuple of lower-cased, non-empty items."""
+    return tuple(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+def _host_matches(host: str, patterns: Tuple[str, ...]) -> bool:
+    """`example.com` matches the host itself and any subdomain of it."""
+    return any(host == p or host.endswith("." + p) for p in patterns)
+
+
+@dataclass(frozen=True)
+class ExtractionProfile:
+    """
+    How the extractor loads a page, selected by the job's `test_profile`.
+
+    Request blocking: a request is dropped when its host is denied, its
+    resource type is blocked, or it is off-origin while `block_third_party`
+    is set. Hosts in `allow_hosts` are never blocked.
+
+    Waiting: `wait_strategy` names how the extractor decides the page is
+    ready (see extractor/wait_strategies.py). `dom_stable` waits for
+    `domcontentloaded` and then for `dom_quiet_ms` without DOM mutations,
+    giving up at `wait_deadline_ms` after navigation started.
+
+    HAR: `har_content` is one of har.HAR_CONTENT_MODES. In `filtered` mode
+    only bodies matching `har_body_content_types` and no larger than
+    `har_body_max_bytes` are kept.
+
+    Screenshot: `screenshot` is `full_page`, `viewport` or `off`;
+    `screenshot_format` is `png`, `jpeg` or `webp` (`screenshot_quality`
+    applies to the lossy ones); `screenshot_max_height` clips tall pages
+    (0 means no limit).
+
+    Semantics: with `semantic_source="browser"` the extractor also collects
+    the semantic candidate elements in the page (semantic_candidates.json),
+    so the semantic builder can skip parsing dom.json.
+    """
+
+    name: str
+    block_resource_types: Tuple[str, ...] = ()
+    block_third_party: bool = False
+    allow_hosts: Tuple[str, ...] = ()
+    deny_hosts: Tuple[str, ...] = ()
+    wait_strategy: str = "networkidle"
+    dom_quiet_ms: int = 500
+    wait_deadline_ms: int = 15000
+    har_content: str = "embed"
+    har_body_max_bytes: int = 256 * 1024
+    har_body_content_types: Tuple[str, ...] = TEXTUAL_CONTENT_TYPES
+    screenshot: str = "full_page"
+    screenshot_format: str = "png"
+    screenshot_quality: int = 80
+    screenshot_max_height: int = 0
+    semantic_source: str = "dom"
+
+    @property
+    def blocks_requests(self) -> bool:
+        return bool(self.block_resource_types or self.block_third_party or self.deny_hosts)
+
+    def block_reason(self, resource_type: str, url: str, target_url: str) -> str | None:
+        """Return why a request should be blocked, or None to let it through."""
+        host = (urlsplit(url).hostname or "").lower()
+        if host and _host_matches(host, self.allow_hosts):
+            return None
+        if host and _host_matches(host, self.deny_hosts):
+            return "deny_host"
+        if resource_type in self.block_resource_types:
+            return "resource_type"
+        if self.block_third_party and host:
+            target_host = (urlsplit(target_url).hostname or "").lower()
+            if not _host_matches(host, (target_host,)):
+                return "third_party"
+        return None
+
+
+def build_extraction_profiles(config: Settings) -> Dict[str, ExtractionProfile]:
+    """
+    The profiles, with the request lists taken from `config`: every profile
+    allows EXTRACTOR_ALLOW_HOSTS and denies EXTRACTOR_DENY_HOSTS, and `fast`
+    blocks EXTRACTOR_FAST_BLOCK_RESOURCE_TYPES.
+    """
+    hosts = {
+        "allow_hosts": _split_list(config.extractor_allow_hosts),
+        "deny_hosts": _split_list(config.extractor_deny_hosts),
+    }
+    return {
+        # Load everything, as a user's browser would.
+        "functional": ExtractionProfile(name="functional", **hosts),
+        # Skip heavy media and third-party hosts; the DOM and first-party API
+        # traffic are all the semantic step needs.
+        "fast": ExtractionProfile(
+            name="fast",
+            block_resource_types=_split_list(config.extractor_fast_block_resource_types),
+            block_third_party=True,
+            wait_strategy="dom_stable",
+            har_content="filtered",
+            screenshot="viewport",
+            screenshot_format="jpeg",
+            screenshot_quality=70,
+            semantic_source="browser",
+            **hosts,
+        ),
+    }
+
+
+EXTRACTION_PROFILES: Dict[str, ExtractionProfile] = build_extraction_profiles(settings)
+
+DEFAULT_EXTRACTION_PROFILE = "functional"
+
+
+def get_extraction_profile(test_profile: str | None) -> ExtractionProfile:
+    """Unknown profiles fall back to the default so old jobs keep working."""
+    return EXTRACTION_PROFILES.get(
+        test_profile or DEFAULT_EXTRACTION_PROFILE,
+        EXTRACTION_PROFILES[DEFAULT_EXTRACTION_PROFILE],
+    )
+
+
+@dataclass
+class BlockedRequestLog:
+    """Tally of requests the extractor dropped, stored in extraction.json."""
+
+    max_samples: int = 50
+    total: int = 0
+    by_reason: Dict[str, int] = field(default_factory=dict)
+    by_resource_type: Dict[str, int] = field(default_factory=dict)
+    by_host: Dict[str, int] = field(default_factory=dict)
+    samples: List[Dict[str, str]] = field(default_factory=list)
+
+    def record(self, reason: str, resource_type: str, url: str) -> None:
+        host = urlsplit(url).hostname or ""
+        self.total += 1
+        self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+        self.by_resource_type[resource_type] = self.by_resource_type.get(resource_type, 0) + 1
+        self.by_host[host] = self.by_host.get(host, 0) + 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append({"url": url, "resourceType": resource_type, "reason": reason})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "byReason": self.by_reason,
+            "byResourceType": self.by_resource_type,
+            "byHost": self.by_host,
+            "samples": self.samples,
+        }
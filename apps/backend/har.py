@@ -0,0 +1,315 @@
+"""
+HAR helpers shared by the extractor (capture) and the semantic step (reading).
+
+The extractor records HARs in one of several content modes:
+
+- embed:    response bodies inline in `content.text` (Playwright default).
+- omit:     no response bodies at all.
+- attach:   bodies stored as separate files next to the HAR, referenced
+            by `content._file`.
+- filtered: recorded as `attach`, then rewritten so only textual bodies
+            under a size cap are embedded and the rest are dropped.
+
+`read_response_body` hides the difference from readers, and
+`iter_har_entries` streams entries so readers never load a whole HAR.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List
+from urllib.parse import urlsplit
+
+import ijson
+
+HAR_CONTENT_MODES = ("embed", "omit", "attach", "filtered")
+
+TEXTUAL_CONTENT_TYPES = (
+    "application/json",
+    "+json",
+    "text/",
+    "application/xml",
+    "+xml",
+    "application/javascript",
+    "application/x-www-form-urlencoded",
+)
+
+# Upper bound for bodies returned to readers, embedded or attached.
+MAX_BODY_BYTES = 1_000_000
+
+
+def is_textual(mime_type: str | None, content_types: Iterable[str] = TEXTUAL_CONTENT_TYPES) -> bool:
+    """
+    Match a MIME type against `content_types`: entries ending in `/` are
+    prefixes, entries starting with `+` are structured-syntax suffixes, and
+    anything else must match exactly.
+    """
+    mime = (mime_type or "").split(";", 1)[0].strip().lower()
+    if not mime:
+        return False
+    for pattern in content_types:
+        if pattern.endswith("/") and mime.startswith(pattern):
+            return True
+        if pattern.startswith("+") and mime.endswith(pattern):
+            return True
+        if mime == pattern:
+            return True
+    return False
+
+
+def playwright_har_content(mode: str) -> str:
+    """Playwright's `record_har_content` value for one of our content modes."""
+    if mode not in HAR_CONTENT_MODES:
+        raise ValueError(f"Unknown HAR content mode: {mode}")
+    return "attach" if mode == "filtered" else mode
+
+
+def _attached_path(har_dir: Path, attached: str) -> Path | None:
+    path = (har_dir / attached).resolve()
+    if har_dir.resolve() not in path.parents:
+        # `_file` must stay inside the HAR's directory.
+        return None
+    return path
+
+
+def filter_har_bodies(
+    src: Path,
+    dest: Path,
+    content_types: Iterable[str],
+    max_bytes: int,
+) -> Dict[str, int]:
+    """
+    Rewrite an `attach`-mode HAR at `src` into `dest`, embedding only
+    bodies whose MIME type is in `content_types` and whose size is at most
+    `max_bytes`. Attached files are left in place for the caller to remove.
+    """
+    content_types = tuple(content_types)
+    har = json.loads(src.read_text(encoding="utf-8"))
+    kept = 0
+    dropped = 0
+    for entry in har.get("log", {}).get("entries", []):
+        content = entry.get("response", {}).get("content", {})
+        attached = content.pop("_file", None)
+        if not attached:
+            continue
+        body_path = _attached_path(src.parent, attached)
+        if (
+            body_path is not None
+            and body_path.is_file()
+            and is_textual(content.get("mimeType"), content_types)
+            and body_path.stat().st_size <= max_bytes
+        ):
+            content["text"] = body_path.read_text(encoding="utf-8", errors="replace")
+            kept += 1
+        else:
+            dropped += 1
+
+    dest.write_text(json.dumps(har), encoding="utf-8")
+    return {"bodiesKept": kept, "bodiesDropped": dropped}
+
+
+# JSON strings read by `iter_har_entries` are cut to about this many bytes
+# (at most twice as many, see _CappedStrings).
+MAX_STRING_BYTES = MAX_BODY_BYTES
+
+# The rest of a JSON string: up to its closing quote or the end of the data.
+_STRING_REST = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+
+def _escape_starts_at(data: bytes, index: int) -> bool:
+    """Whether the backslash at `index` opens an escape rather than ends one."""
+    run = 1
+    while index - run >= 0 and data[index - run] == 0x5C:
+        run += 1
+    return run % 2 == 1
+
+
+def _whole_characters(cut: bytes) -> bytes:
+    """
+    `cut`, a string's bytes from a character boundary on, without a trailing
+    partial escape, high surrogate or UTF-8 sequence. Only its tail is read.
+    """
+    while True:
+        backslash = cut.rfind(b"\\", max(0, len(cut) - 6))
+        if backslash < 0 or not _escape_starts_at(cut, backslash):
+            break
+        escape = cut[backslash + 1 :]
+        partial = not escape or (escape[:1] == b"u" and len(escape) < 5)
+        high_surrogate = escape[:1] == b"u" and escape[1:3].lower() in (b"d8", b"d9", b"da", b"db")
+        if not (partial or high_surrogate):
+            break
+        cut = cut[:backslash]
+    end = len(cut)
+    while end > 0 and len(cut) - end < 3 and cut[end - 1] & 0xC0 == 0x80:
+        end -= 1
+    if end > 0 and cut[end - 1] >= 0xC0:
+        lead = cut[end - 1]
+        size = 4 if lead >= 0xF0 else 3 if lead >= 0xE0 else 2
+        if len(cut) - end + 1 < size:
+            return cut[: end - 1]
+    return cut
+
+
+def _unescaped_quotes(data: bytes) -> int:
+    """
+    Quotes in `data` that open or close a string. `data` starts on a
+    character boundary, so backslash runs pair up from their start; a
+    backslash left before a quote once the pairs are removed escapes it.
+    """
+    unpaired = data.replace(b"\\\\", b"")
+    return unpaired.count(b'"') - unpaired.count(b'\\"')
+
+
+class _CappedStrings:
+    """
+    Binary file wrapper that cuts the JSON strings of the underlying file
+    short, so the JSON parser never holds a huge one: yajl rescans a string
+    split over many reads from its start each time, and one embedded 40 MB
+    body took seconds to tokenize.
+
+    Reads are `max_bytes` long, so a string within one read is short. A
+    string still open at the end of a read is kept for `max_bytes` more
+    bytes; the rest of it is dropped. Where the open strings are is found by
+    counting unescaped quotes, so reads are scanned by C code only.
+    """
+
+    def __init__(self, handle: BinaryIO, max_bytes: int) -> None:
+        self._handle = handle
+        self._max_bytes = max_bytes
+        self._in_string = False
+        self._kept = 0  # bytes of the open string passed on since its read
+        self._carry = b""  # the start of a character the next read completes
+
+    def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""
+        while True:
+            data = self._handle.read(self._max_bytes)
+            if not data:
+                rest, self._carry = self._carry, b""
+                return rest
+            out = self._filter(self._carry + data)
+            if out:
+                return out
+
+    def _hold_partial_tail(self, chunk: bytes) -> bytes:
+        # A character or escape split by the read waits for the next one.
+        whole = _whole_characters(chunk)
+        self._carry = chunk[len(whole) :]
+        return whole
+
+    def _filter(self, data: bytes) -> bytes:
+        self._carry = b""
+        out: List[bytes] = []
+        if self._in_string:
+            # Most reads of a huge string hold no quote that closes it.
+            closes = _unescaped_quotes(data) > 0
+            end = _STRING_REST.match(data).end() if closes else len(data)
+            closed = end < len(data) and data[end] == 0x22
+            chunk = data[:end] if closed else self._hold_partial_tail(data)
+            room = self._max_bytes - self._kept
+            if len(chunk) > room:
+                chunk = _whole_characters(chunk[:room])
+                self._kept = self._max_bytes
+            else:
+                self._kept += len(chunk)
+            out.append(chunk)
+            if not closed:
+                return b"".join(out)
+            out.append(b'"')
+            self._in_string = False
+            data = data[end + 1 :]
+
+        # `data` now starts outside any string: an odd count leaves one open.
+        if _unescaped_quotes(data) % 2:
+            self._in_string, self._kept = True, 0
+            data = self._hold_partial_tail(data)
+        out.append(data)
+        return b"".join(out)
+
+
+def iter_har_entries(har_path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    The HAR's `log.entries`, parsed incrementally: only the current entry
+    is held in memory, whatever the file's size, and any string in it
+    (such as an embedded body) is cut to MAX_STRING_BYTES. A missing file
+    yields nothing; a malformed one yields the entries before the damage.
+    """
+    try:
+        with har_path.open("rb") as handle:
+            yield from ijson.items(
+                _CappedStrings(handle, MAX_STRING_BYTES), "log.entries.item", use_float=True
+            )
+    except (OSError, ijson.JSONError):
+        return
+
+
+def read_response_body(content: Dict[str, Any], har_dir: Path) -> str | None:
+    """
+    Return a response body regardless of the HAR content mode it was
+    recorded with, or None when the body was not captured. Binary (base64)
+    bodies and bodies over MAX_BODY_BYTES are left out; attached bodies are
+    only loaded when textual.
+    """
+    if not isinstance(content, dict):
+        return None
+    if "text" in content:
+        text = content["text"]
+        if content.get("encoding") == "base64" or (isinstance(text, str) and len(text) > MAX_BODY_BYTES):
+            return None
+        return text
+    attached = content.get("_file")
+    if not attached or not is_textual(content.get("mimeType")):
+        return None
+    body_path = _attached_path(har_dir, attached)
+    if body_path is None or not body_path.is_file():
+        return None
+    if body_path.stat().st_size > MAX_BODY_BYTES:
+        return None
+    return body_path.read_text(encoding="utf-8", errors="replace")
+
+
+def attached_files(har_path: Path) -> List[str]:
+    """Names of the body files an `attach`-mode HAR references, relative to its directory."""
+    files: List[str] = []
+    for entry in iter_har_entries(har_path):
+        attached = entry.get("response", {}).get("content", {}).get("_file")
+        if attached and _attached_path(har_path.parent, attached) is not None:
+            files.append(attached)
+    return files
+
+
+def has_response_body(content: Dict[str, Any], har_dir: Path) -> bool:
+    """Whether a response's body was recorded, embedded or attached, whatever its type or size."""
+    if not isinstance(content, dict):
+        return False
+    if "text" in content:
+        return True
+    attached = content.get("_file")
+    if not attached:
+        return False
+    body_path = _attached_path(har_dir, attached)
+    return body_path is not None and body_path.is_file()
+
+
+def har_navigation(har_path: Path) -> Dict[str, Any] | None:
+    """The HAR's first http(s) entry, which is the page's navigation. None without one."""
+    for entry in iter_har_entries(har_path):
+        parts = urlsplit(entry.get("request", {}).get("url", ""))
+        if parts.scheme in ("http", "https") and parts.netloc:
+            return entry
+    return None
+
+
+def har_origin(har_path: Path) -> str | None:
+    """
+    Origin (`scheme://host[:port]`) of the page a HAR was recorded for: that
+    of its first request, which is the navigation. None without entries.
+    """
+    navigation = har_navigation(har_path)
+    if navigation is None:
+        return None
+    parts = urlsplit(navigation["request"]["url"])
+    return f"{parts.scheme}://{parts.netloc}"
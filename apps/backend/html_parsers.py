@@ -0,0 +1,206 @@
+"""
+HTML parser backends for semantic extraction.
+
+`build_semantic_model` only needs the links, buttons and inputs of a DOM
+snapshot (see `Candidate`), not a full BeautifulSoup tree. On real pages
+(megabytes of HTML) bs4 with the pure-Python `html.parser` dominates the
+backend's CPU time, so the candidates can also be collected with lxml
+(libxml2) or selectolax (lexbor) when installed. Each backend reproduces
+bs4's view of the page: text is `get_text(strip=True)` (no comments, and
+no text inside script, style, template, rt or rp), `class` is a list of
+class names and an input's label is the first `<label for=id>`. All of
+them walk the tree once (see `_collect`).
+
+The remaining differences are the parsers' own: on malformed markup (e.g.
+nested forms, duplicate attributes) their error recovery can build other
+trees, lxml gives valueless attributes their name as value, and lexbor
+keeps `<template>` contents out of the document. `html.parser` stays
+available as the reference.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # optional speed-up
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional speed-up
+    LexborHTMLParser = None
+
+# Preference order for "auto": lxml's lenient parsing is closest to html.parser.
+PARSER_BACKENDS = ("lxml", "selectolax", "html.parser")
+
+# bs4 stores the text of these tags as special strings get_text() leaves out.
+_TEXTLESS_TAGS = ("script", "style", "template", "rt", "rp")
+
+
+class Candidate:
+    """
+    Parser-independent view of an element the builder may turn into a
+    SemanticElement. It exposes the slice of the bs4 Tag API the builder
+    relies on (`name`, `get`), so _build_selector accepts either.
+    """
+
+    __slots__ = ("name", "attrs", "text", "for_label")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], text: str = "", for_label: str = "") -> None:
+        self.name = name
+        self.attrs = attrs
+        self.text = text  # get_text(strip=True) for clickables
+        self.for_label = for_label  # text of the first <label for=id>, inputs only
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.attrs.get(key, default)
+
+
+def _with_class_list(attrs: Dict[str, str]) -> Dict[str, Any]:
+    """Attributes as bs4 reports them: `class` split into its names."""
+    if "class" in attrs:
+        attrs["class"] = attrs["class"].split()
+    return attrs
+
+
+# Everything the builder reads, collected in a single walk of the tree.
+_WALKED_TAGS = ("a", "button", "input", "label")
+
+
+def _collect(
+    elements: Iterable[Any],
+    tag_of: Callable[[Any], str],
+    attrs_of: Callable[[Any], Dict[str, Any]],
+    text_of: Callable[[Any], str],
+) -> List[Candidate]:
+    """
+    Candidates from one document-order walk over the `_WALKED_TAGS`
+    elements. Labels are indexed by `for` as the walk meets them, so an
+    input's label is a dict lookup rather than a rescan of the document.
+    """
+    links: List[Candidate] = []
+    buttons: List[Candidate] = []
+    inputs: List[Dict[str, Any]] = []
+    labels: Dict[str, str] = {}
+    for el in elements:
+        tag = tag_of(el)
+        attrs = attrs_of(el)
+        if tag == "label":
+            target = attrs.get("for")
+            if target and target not in labels:
+                labels[target] = text_of(el)
+        elif tag == "input":
+            inputs.append(attrs)
+        else:
+            (links if tag == "a" else buttons).append(Candidate(tag, attrs, text_of(el)))
+
+    return [
+        *links,
+        *buttons,
+        *(Candidate("input", attrs, for_label=labels.get(attrs.get("id") or "", "")) for attrs in inputs),
+    ]
+
+
+def candidates_from_soup(soup: BeautifulSoup) -> List[Candidate]:
+    return _collect(
+        soup.find_all(_WALKED_TAGS),
+        lambda el: el.name,
+        lambda el: el.attrs,
+        lambda el: el.get_text(strip=True),
+    )
+
+
+def _html_parser_candidates(html: str) -> List[Candidate]:
+    return candidates_from_soup(BeautifulSoup(html, "html.parser"))
+
+
+if lxml is not None:
+    _lxml_text_nodes = etree.XPath(
+        ".//text()[not(" + " or ".join(f"ancestor::{tag}" for tag in _TEXTLESS_TAGS) + ")]"
+    )
+
+
+def _lxml_text(el) -> str:
+    return "".join(text.strip() for text in _lxml_text_nodes(el))
+
+
+def _lxml_candidates(html: str) -> List[Candidate]:
+    try:
+        root = lxml.html.document_fromstring(html)
+    except etree.ParserError:  # nothing but whitespace or comments
+        return []
+    return _collect(
+        root.iter(*_WALKED_TAGS),
+        lambda el: el.tag,
+        lambda el: _with_class_list(dict(el.attrib)),
+        _lxml_text,
+    )
+
+
+def _lexbor_in_textless(node) -> bool:
+    parent = node.parent
+    while parent is not None:
+        if parent.tag in _TEXTLESS_TAGS:
+            return True
+        parent = parent.parent
+    return False
+
+
+def _lexbor_text(el) -> str:
+    return "".join(
+        node.text_content.strip()
+        for node in el.traverse(include_text=True)
+        if node.tag == "-text" and not _lexbor_in_textless(node)
+    )
+
+
+def _lexbor_attrs(el) -> Dict[str, Any]:
+    # Valueless attributes come back as None; bs4 reports "".
+    return _with_class_list({key: value or "" for key, value in el.attributes.items()})
+
+
+def _selectolax_candidates(html: str) -> List[Candidate]:
+    tree = LexborHTMLParser(html)
+    return _collect(
+        tree.css(", ".join(_WALKED_TAGS)),
+        lambda el: el.tag,
+        _lexbor_attrs,
+        _lexbor_text,
+    )
+
+
+_BACKENDS: Dict[str, Callable[[str], List[Candidate]]] = {
+    "lxml": _lxml_candidates,
+    "selectolax": _selectolax_candidates,
+    "html.parser": _html_parser_candidates,
+}
+
+
+def available_backends() -> List[str]:
+    installed = {"lxml": lxml is not None, "selectolax": LexborHTMLParser is not None}
+    return [name for name in PARSER_BACKENDS if installed.get(name, True)]
+
+
+def resolve_backend(name: str) -> str:
+    """
+    The backend to use for `name` ("auto" picks the first installed one).
+    Raises ValueError for unknown or uninstalled backends.
+    """
+    available = available_backends()
+    if name == "auto":
+        return available[0]
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"unknown HTML parser backend: {name!r}")
+    if name not in available:
+        raise ValueError(f"HTML parser backend {name!r} is not installed")
+    return name
+
+
+def parse_candidates(html: str, backend: str = "auto") -> List[Candidate]:
+    """Links, then buttons, then inputs of `html`, in document order."""
+    return _BACKENDS[resolve_backend(backend)](html)
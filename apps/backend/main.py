@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from routes import jobs, tests
+from routes import jobs, tests, timeline
 from db import init_db
 
 app = FastAPI(title="Autonomous QA Automation WebApp Demo")
@@ -29,3 +29,4 @@ app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 app.include_router(tests.router, prefix="/tests", tags=["tests"])
 
 
+app.include_router(timeline.router, tags=["timeline"])
@@ -6,13 +6,15 @@ for job execution timelines. Every phase transition is logged as JSON.
 """
 
 import json
+import mmap
 import os
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from pathlib import Path
 
-
 class Phase(str, Enum):
     """Job execution phases."""
     PREFLIGHT = "preflight"
@@ -28,6 +30,7 @@ class Status(str, Enum):
     STARTED = "started"
     COMPLETED = "completed"
     FAILED = "failed"
+    STEP = "step"  # timed sub-step inside a phase; does not change phase status
 
 
 class TimelineEntry(dict):
@@ -215,6 +218,65 @@ class StructuredLogger:
         return summary
 
 
+def rss_mb() -> Optional[float]:
+    """
+    Current resident memory of this process, or None where /proc is
+    unavailable. Unlike the peak (ru_maxrss), it also goes down, so it tells
+    the steps of a long-lived worker apart.
+    """
+    try:
+        resident_pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(resident_pages * mmap.PAGESIZE / (1024 * 1024), 1)
+
+
+class StepRecorder:
+    """
+    Times the sub-steps of one phase and logs each as a `step` entry.
+    
+    Every entry's details hold `step`, `duration_ms` and `rss_mb` (this
+    process, as the step ends), plus `child_rss_mb` when `child_rss_mb` is
+    given (e.g. the browser's processes). Callers add step-specific details, such as
+    `bytes_written`, to the dict yielded by `step()`. Durations are also
+    kept in `timings` for summaries.
+    """
+    
+    def __init__(
+        self,
+        logger: StructuredLogger,
+        phase: Phase,
+        child_rss_mb: Optional[Callable[[], float]] = None,
+    ):
+        self.logger = logger
+        self.phase = phase
+        self.child_rss_mb = child_rss_mb
+        self.timings: Dict[str, int] = {}
+    
+    @contextmanager
+    def step(self, name: str, **details: Any) -> Iterator[Dict[str, Any]]:
+        """Time the enclosed block as step `name`; failures are logged and re-raised."""
+        started = time.perf_counter()
+        try:
+            yield details
+        except BaseException as exc:
+            details["error_type"] = type(exc).__name__
+            raise
+        finally:
+            self.record(name, started, **details)
+    
+    def record(self, name: str, started: float, **details: Any) -> TimelineEntry:
+        """Log step `name` as having run from `started` (a perf_counter value) until now."""
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        self.timings[name] = duration_ms
+        entry_details: Dict[str, Any] = {"step": name, "duration_ms": duration_ms}
+        entry_details.update(details)
+        entry_details["rss_mb"] = rss_mb()
+        if self.child_rss_mb is not None:
+            entry_details["child_rss_mb"] = round(self.child_rss_mb(), 1)
+        return self.logger.log(self.phase, Status.STEP, entry_details)
+
+
 def get_logger(job_id: str, log_dir: str = ".") -> StructuredLogger:
     """Factory function to create or retrieve a logger for a job."""
     return StructuredLogger(job_id, log_dir)
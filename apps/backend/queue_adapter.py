@@ -1,7 +1,53 @@
+import math
+
 from redis import Redis
-from rq import Queue
+from rq import Queue, Worker
 
+from batch_runs import BatchRun
 from config import settings
+from run_options import RunOptions
+
+# Added to every computed `job_timeout`, so that RQ only kills a task the
+# worker's own time limits failed to stop (browser launch, saving reports).
+JOB_TIMEOUT_MARGIN_SECONDS = 60
+
+
+def extraction_batch_timeout(job_count: int) -> int:
+    """
+    RQ `job_timeout` for a batch of `job_count` extractions: they run
+    `extractor_concurrency` at a time, each within its own job timeout.
+    -1 (no RQ timeout) when extraction jobs have none.
+    """
+    per_job = settings.extractor_job_timeout_seconds
+    if per_job <= 0:
+        return -1
+    waves = math.ceil(job_count / max(1, settings.extractor_concurrency))
+    return math.ceil(waves * per_job) + JOB_TIMEOUT_MARGIN_SECONDS
+
+
+def run_limit_seconds(options: RunOptions, test_profile: str | None = None) -> float:
+    """
+    How long the runner lets one run take: its budget, capped by the
+    worker-wide RUNNER_RUN_TIMEOUT_SECONDS, plus the step timeout its
+    backstop allows past the budget (see runner.worker._run_deadline).
+    """
+    resolved = options.for_profile(test_profile)
+    budget = resolved.run_timeout_seconds
+    if settings.runner_run_timeout_seconds > 0:
+        budget = min(budget, settings.runner_run_timeout_seconds)
+    return budget + resolved.step_timeout_ms / 1000
+
+
+def run_batch_timeout(runs: list[BatchRun], options: RunOptions) -> int:
+    """
+    RQ `job_timeout` for a batch (or shard) task. Its runs share the
+    worker's RUNNER_CONCURRENCY slots (assumed 1 when the worker sizes
+    itself), so they are done within the sum of their limits spread over
+    the slots, plus the longest limit.
+    """
+    limits = [run_limit_seconds(options, run.test_profile) for run in runs]
+    slots = max(1, settings.runner_concurrency)
+    return math.ceil(sum(limits) / slots + max(limits, default=0)) + JOB_TIMEOUT_MARGIN_SECONDS
 
 
 class OrchestrationQueue:
@@ -17,22 +63,71 @@ class OrchestrationQueue:
         self._job_queue = Queue("jobs", connection=self._redis)
         self._run_queue = Queue("runs", connection=self._redis)
 
+    # Task arguments always go through `kwargs=`: RQ reads a bare `job_id=`
+    # as the id of the RQ job itself and never passes it to the task.
+
     def enqueue_extraction(self, job_id: str) -> None:
         # The worker side will implement `extractor.worker.process_job`.
-        self._job_queue.enqueue("extractor.worker.process_job", job_id=job_id)
+        self._job_queue.enqueue("extractor.worker.process_job", kwargs={"job_id": job_id})
 
-    def enqueue_test_run(self, job_id: str, test_id: str) -> str:
+    def enqueue_extraction_batch(self, job_ids: list[str]) -> None:
+        # Extracted concurrently by `extractor.async_worker.process_jobs`.
+        self._job_queue.enqueue(
+            "extractor.async_worker.process_jobs",
+            kwargs={"job_ids": job_ids},
+            job_timeout=extraction_batch_timeout(len(job_ids)),
+        )
+
+    def enqueue_test_run(
+        self,
+        job_id: str,
+        test_id: str,
+        options: RunOptions | None = None,
+        run_id: str | None = None,
+    ) -> str:
         """
-        Enqueue a test run into the runner queue.
-        Returns the Redis/RQ job id which we treat as runId.
+        Enqueue a test run into the runner queue, as RQ job `run_id` if
+        given. Returns the Redis/RQ job id which we treat as runId.
         """
+        options = options or RunOptions()
         rq_job = self._run_queue.enqueue(
             "runner.worker.run_test",
-            job_id=job_id,
-            test_id=test_id,
+            kwargs={
+                "job_id": job_id,
+                "test_id": test_id,
+                "options": options.to_dict(),
+            },
+            job_id=run_id,
+            # The run stops itself at its budget; RQ only steps in past it.
+            job_timeout=math.ceil(run_limit_seconds(options)) + JOB_TIMEOUT_MARGIN_SECONDS,
         )
         return rq_job.id
 
+    def enqueue_test_batch(
+        self,
+        batch_id: str,
+        runs: list[BatchRun],
+        options: RunOptions | None = None,
+        shard: int | None = None,
+    ) -> None:
+        """Enqueue several test runs as one runner task sharing a browser."""
+        options = options or RunOptions()
+        self._run_queue.enqueue(
+            "runner.async_worker.run_batch",
+            kwargs={
+                "batch_id": batch_id,
+                "runs": [run.to_dict() for run in runs],
+                "options": options.to_dict(),
+                "shard": shard,
+            },
+            job_id=batch_id if shard is None else f"{batch_id}_shard{shard}",
+            job_timeout=run_batch_timeout(runs, options),
+        )
+
+    def run_worker_count(self) -> int:
+        """Number of runner workers currently listening on the runs queue."""
+        return Worker.count(connection=self._redis, queue=self._run_queue)
+
 
 queue_adapter = OrchestrationQueue(settings.redis_url)
 
@@ -139,7 +139,13 @@ async def list_artifacts(
 ) -> list[ArtifactItem]:
     records = storage_adapter.load_manifest(job_id)
     return [
-        ArtifactItem(name=r.name, type=r.type, path=r.path)
+        ArtifactItem(
+            name=r.name,
+            type=r.type,
+            path=r.path,
+            encoding=r.encoding,
+            details=r.details,
+        )
         for r in records
     ]
 
@@ -1,16 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+import json
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy.orm import Session
 
+from batch_runs import (
+    BATCH_DIR,
+    batch_plan,
+    batch_plan_name,
+    batch_report_name,
+    merge_shard_reports,
+    new_batch_id,
+    plan_batch,
+)
+from config import settings
 from db import Job, SessionLocal
 from queue_adapter import queue_adapter
+from run_events import new_run_id, run_events, sse_stream, stream_key
+from run_options import RunOptions
+from run_stats import DEFAULT_RUN_LIMIT, iter_run_reports, run_stats
+from sharding import estimate_durations, plan_shards
 from storage import storage_adapter
 
 router = APIRouter()
 
 
-class RunRequest(BaseModel):
+class RunOptionsRequest(BaseModel):
+    screenshotPolicy: Literal["always", "on-failure", "final-only", "every-n"] = "always"
+    screenshotEvery: int = Field(default=1, ge=1)
+    screenshotMode: Literal["full_page", "viewport"] = "full_page"
+    # Unset timeouts take the job's test profile defaults.
+    runTimeoutSeconds: Optional[float] = Field(default=None, gt=0)
+    stepTimeoutMs: Optional[int] = Field(default=None, ge=1)
+    navigationTimeoutMs: Optional[int] = Field(default=None, ge=1)
+    # Reuse the job's saved login session and skip the login steps.
+    startAuthenticated: bool = False
+    # "har" replays the job's recorded traffic instead of hitting the target.
+    network: Literal["live", "har"] = "live"
+    harNotFound: Literal["abort", "fallback"] = "abort"
+
+    def run_options(self) -> RunOptions:
+        return RunOptions(
+            screenshot_policy=self.screenshotPolicy,
+            screenshot_every=self.screenshotEvery,
+            screenshot_mode=self.screenshotMode,
+            run_timeout_seconds=self.runTimeoutSeconds,
+            step_timeout_ms=self.stepTimeoutMs,
+            navigation_timeout_ms=self.navigationTimeoutMs,
+            start_authenticated=self.startAuthenticated,
+            network=self.network,
+            har_not_found=self.harNotFound,
+        )
+
+
+class RunRequest(RunOptionsRequest):
+    jobId: str
+
+
+class BatchRunItem(BaseModel):
     jobId: str
+    testId: Optional[str] = None  # defaults to the job's generated test
+
+
+class BatchRunRequest(RunOptionsRequest):
+    jobIds: List[str] = []
+    runs: List[BatchRunItem] = []
+    shards: Optional[int] = Field(default=None, ge=1)  # defaults to the runner worker count
 
 
 def get_db():
@@ -40,7 +98,15 @@ async def run_test(
             detail="Job not found",
         )
 
-    run_id = queue_adapter.enqueue_test_run(body.jobId, test_id)
+    run_id = new_run_id()
+    # Published first: a runner may pick the run up as soon as it is enqueued.
+    run_events.publish(run_id, "queued", {"jobId": body.jobId, "testId": test_id})
+    queue_adapter.enqueue_test_run(
+        body.jobId,
+        test_id,
+        body.run_options().for_profile(job.test_profile),
+        run_id=run_id,
+    )
     return {
         "runId": run_id,
         "testId": test_id,
@@ -48,3 +114,162 @@ async def run_test(
         "status": "queued",
     }
 
+
+def _generated_test_id(job_id: str) -> str | None:
+    path = storage_adapter.root / job_id / "generated_test.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8")).get("testId")
+
+
+@router.post(
+    "/batch",
+)
+async def run_batch(
+    body: BatchRunRequest,
+    db: Session = Depends(get_db),
+) -> dict:
+    """
+    Run the generated tests of several jobs as one batch, split into
+    duration-balanced shards that runner workers pick up in parallel.
+    Every run gets its own report; the batch report aggregates them.
+    """
+    items = [BatchRunItem(jobId=job_id) for job_id in body.jobIds] + body.runs
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide jobIds or runs",
+        )
+
+    job_ids = {item.jobId for item in items}
+    profiles = {
+        job.id: job.test_profile for job in db.query(Job).filter(Job.id.in_(job_ids)).all()
+    }
+    missing = sorted(job_ids - profiles.keys())
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Jobs not found: {', '.join(missing)}",
+        )
+
+    pairs = []
+    for item in items:
+        test_id = item.testId or _generated_test_id(item.jobId)
+        if not test_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No generated test for job {item.jobId}",
+            )
+        pairs.append((item.jobId, test_id))
+
+    batch_id = new_batch_id()
+    runs = plan_batch(batch_id, pairs, profiles)
+    shard_count = body.shards or max(1, queue_adapter.run_worker_count())
+    shards = plan_shards(runs, estimate_durations(storage_adapter.root, pairs), shard_count)
+    plan = batch_plan(batch_id, shards)
+    storage_adapter.save_json(BATCH_DIR, batch_plan_name(batch_id), plan)
+
+    for run in runs:
+        run_events.publish(
+            run.run_id,
+            "queued",
+            {"jobId": run.job_id, "testId": run.test_id, "batchId": batch_id},
+        )
+    # Heaviest shard first so the longest one starts earliest.
+    options = body.run_options()
+    for index, shard in enumerate(shards, start=1):
+        queue_adapter.enqueue_test_batch(batch_id, shard.items, options, shard=index)
+    return {
+        "batchId": batch_id,
+        "status": "queued",
+        "runs": [
+            {"jobId": run.job_id, "testId": run.test_id, "runId": run.run_id}
+            for run in runs
+        ],
+        "shards": [
+            {"shard": entry["shard"], "estimatedMs": entry["estimatedMs"], "runs": len(entry["runIds"])}
+            for entry in plan["shards"]
+        ],
+    }
+
+
+@router.get(
+    "/batches/{batch_id}",
+)
+async def get_batch_report(
+    batch_id: str,
+) -> dict:
+    """
+    Return the aggregated report of a batch run, merged from the shards
+    that have finished so far.
+    """
+    batch_root = storage_adapter.root / BATCH_DIR
+    plan_path = batch_root / batch_plan_name(batch_id)
+    if not plan_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No report found for this batch",
+        )
+    plan = json.loads(plan_path.read_text(encoding="utf-8"))
+
+    shard_reports = {}
+    for entry in plan["shards"]:
+        report_path = batch_root / batch_report_name(batch_id, entry["shard"])
+        if report_path.exists():
+            shard_reports[entry["shard"]] = json.loads(report_path.read_text(encoding="utf-8"))
+    return merge_shard_reports(plan, shard_reports)
+
+
+@router.get(
+    "/stats",
+)
+async def get_run_stats(
+    jobId: Optional[str] = None,
+    testId: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_RUN_LIMIT, ge=1),
+) -> dict:
+    """
+    p50/p95/p99 run and step durations (plus `goto` navigation timing)
+    across the stored run reports, per test. `limit` caps the runs
+    considered per test, newest first.
+    """
+    if jobId and not (storage_adapter.root / jobId).is_dir():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return run_stats(iter_run_reports(storage_adapter.root, jobId), test_id=testId, limit=limit)
+
+
+@router.get(
+    "/runs/{run_id}/events",
+)
+async def stream_run_events(
+    run_id: str,
+    last_event_id: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    """
+    Server-Sent Events of a run as it executes: `queued`, `started`, one
+    `step` per step result and `finished`, after which the stream closes.
+    Reconnecting with `Last-Event-ID` resumes after that event.
+    """
+    client = AsyncRedis.from_url(settings.redis_url)
+    if not await client.exists(stream_key(run_id)):
+        await client.aclose()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No events for this run",
+        )
+
+    async def events():
+        try:
+            async for message in sse_stream(client, run_id, last_event_id or "0-0"):
+                yield message
+        finally:
+            await client.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
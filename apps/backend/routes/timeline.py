@@ -7,12 +7,13 @@ Provides queryable access to job execution timelines.
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, Query
 from pathlib import Path
+from config import settings
 from observability import StructuredLogger, Phase
 
 router = APIRouter()
 
-# Default timeline log directory (can be configured)
-TIMELINE_DIR = "."
+# Timeline log directory, shared with the workers that write to it
+TIMELINE_DIR = settings.timeline_dir
 
 
 def get_logger_for_job(job_id: str) -> StructuredLogger:
@@ -0,0 +1,143 @@
+"""
+Live events of a test run, published to a Redis stream per run.
+
+The backend adds `queued` just before it enqueues a run; the runner adds
+`started`, one `step` per step result as soon as it exists, and `finished`
+with the run's status once the report is saved. Streams are capped at
+STREAM_MAXLEN entries and expire `ttl_seconds` after their last event, so
+a client connecting late (or reconnecting with the last id it saw) still
+gets the whole run.
+
+Publishing is best effort: a Redis hiccup never fails a run, the report
+on disk stays the source of truth.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Tuple
+
+from redis import Redis, RedisError
+
+from config import settings
+
+EVENT_TYPES = ("queued", "started", "step", "finished")
+TERMINAL_EVENT = "finished"
+
+STREAM_MAXLEN = 1000
+
+# How long a relay waits for the next event before sending a keepalive.
+KEEPALIVE_SECONDS = 15
+
+
+def new_run_id() -> str:
+    """
+    Id for a run about to be enqueued (it becomes its RQ job id), so its
+    `queued` event is in the stream before a runner can start it.
+    """
+    return str(uuid.uuid4())
+
+
+def stream_key(run_id: str) -> str:
+    return f"run_events:{run_id}"
+
+
+def decode_entry(fields: Dict[Any, Any]) -> Tuple[str, Dict[str, Any]]:
+    """(event type, data) of a stream entry, as written by RunEventPublisher."""
+    fields = {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in fields.items()
+    }
+    return fields["type"], json.loads(fields["data"])
+
+
+def sse_message(event_id: str, event_type: str, data: Dict[str, Any]) -> str:
+    """One Server-Sent Events message; `id` lets clients resume via Last-Event-ID."""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+async def sse_stream(
+    client: Any,
+    run_id: str,
+    last_id: str = "0-0",
+    keepalive_seconds: float = KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Relay a run's events (after `last_id`) as SSE messages until `finished`,
+    or until the stream expires. `client` is a redis.asyncio client.
+    """
+    key = stream_key(run_id)
+    while True:
+        response = await client.xread({key: last_id}, count=100, block=int(keepalive_seconds * 1000))
+        if not response:
+            if not await client.exists(key):
+                return
+            yield ": keepalive\n\n"
+            continue
+        for _, entries in response:
+            for entry_id, fields in entries:
+                last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                event_type, data = decode_entry(fields)
+                yield sse_message(last_id, event_type, data)
+                if event_type == TERMINAL_EVENT:
+                    return
+
+
+class RunEventPublisher:
+    def __init__(self, redis_url: str, ttl_seconds: float) -> None:
+        # A short timeout bounds what a slow Redis can cost a run per event.
+        self._redis = Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def publish(self, run_id: str | None, event_type: str, data: Dict[str, Any]) -> None:
+        if not self.enabled or not run_id:
+            return
+        key = stream_key(run_id)
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.xadd(
+                key,
+                {"type": event_type, "data": json.dumps(data)},
+                maxlen=STREAM_MAXLEN,
+                approximate=True,
+            )
+            pipe.expire(key, int(self.ttl_seconds))
+            pipe.execute()
+        except RedisError:
+            pass
+
+    def step_results(self, run_id: str | None) -> "StepResults":
+        return StepResults(lambda result: self.publish(run_id, "step", result))
+
+
+class StepResults:
+    """
+    A run's step results. They are only added through `add`, which
+    publishes each one as a `step` event; `to_list` gives them for the report.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[Dict[str, Any]], None],
+        results: Iterable[Dict[str, Any]] = (),
+    ) -> None:
+        self._results: List[Dict[str, Any]] = list(results)
+        self._publish = publish
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self._results.append(result)
+        self._publish(result)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self._results)
+
+
+run_events = RunEventPublisher(settings.redis_url, settings.run_events_ttl_seconds)
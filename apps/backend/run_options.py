@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Callable, Dict
+
+SCREENSHOT_POLICIES = ("always", "on-failure", "final-only", "every-n")
+SCREENSHOT_MODES = ("full_page", "viewport")
+NETWORK_MODES = ("live", "har")
+HAR_NOT_FOUND_POLICIES = ("abort", "fallback")
+
+
+@dataclass(frozen=True)
+class RunTimeouts:
+    """Time limits of a run, selected by the job's `test_profile`."""
+
+    run_seconds: float
+    step_ms: int
+    navigation_ms: int
+
+
+RUN_TIMEOUTS: Dict[str, RunTimeouts] = {
+    "functional": RunTimeouts(run_seconds=180.0, step_ms=10_000, navigation_ms=30_000),
+    # Fast-profile targets are expected to answer quickly; give up sooner.
+    "fast": RunTimeouts(run_seconds=60.0, step_ms=5_000, navigation_ms=15_000),
+}
+
+DEFAULT_RUN_TIMEOUTS = "functional"
+
+
+def get_run_timeouts(test_profile: str | None) -> RunTimeouts:
+    """Unknown profiles fall back to the default, as extraction profiles do."""
+    return RUN_TIMEOUTS.get(test_profile or DEFAULT_RUN_TIMEOUTS, RUN_TIMEOUTS[DEFAULT_RUN_TIMEOUTS])
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """
+    Per-run settings chosen on the run request and passed to the runner.
+
+    Screenshots: `screenshot_policy` decides which passing steps are
+    captured (`always`, `every-n` with `screenshot_every`, `final-only`, or
+    none for `on-failure`); a failing step is captured under every policy.
+    `screenshot_mode` is `full_page` or `viewport`.
+
+    Timeouts: `run_timeout_seconds` bounds the whole run, `step_timeout_ms`
+    each action and `navigation_timeout_ms` each `goto`. Left as None they
+    take the test profile's defaults (see `for_profile`).
+
+    Auth: with `start_authenticated` the runner loads the job's saved login
+    session, if it has a fresh one, skips the login steps and goes to the
+    page the login led to (auth_state.py).
+
+    Network: `network="har"` serves the run's traffic from the job's
+    recorded trace.har instead of the live target; a request the HAR has no
+    entry for is aborted, or sent to the network with
+    `har_not_found="fallback"`.
+    """
+
+    screenshot_policy: str = "always"
+    screenshot_every: int = 1
+    screenshot_mode: str = "full_page"
+    run_timeout_seconds: float | None = None
+    step_timeout_ms: int | None = None
+    navigation_timeout_ms: int | None = None
+    start_authenticated: bool = False
+    network: str = "live"
+    har_not_found: str = "abort"
+
+    def __post_init__(self) -> None:
+        if self.screenshot_policy not in SCREENSHOT_POLICIES:
+            raise ValueError(f"Unknown screenshot policy: {self.screenshot_policy}")
+        if self.screenshot_mode not in SCREENSHOT_MODES:
+            raise ValueError(f"Unknown screenshot mode: {self.screenshot_mode}")
+        if self.network not in NETWORK_MODES:
+            raise ValueError(f"Unknown network mode: {self.network}")
+        if self.har_not_found not in HAR_NOT_FOUND_POLICIES:
+            raise ValueError(f"Unknown HAR not-found policy: {self.har_not_found}")
+        if self.screenshot_every < 1:
+            raise ValueError("screenshot_every must be at least 1")
+        for name in ("run_timeout_seconds", "step_timeout_ms", "navigation_timeout_ms"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive")
+
+    @property
+    def full_page(self) -> bool:
+        return self.screenshot_mode == "full_page"
+
+    def screenshot_after(self, step: int, total_steps: int) -> bool:
+        """Whether passing step `step` (1-based) of `total_steps` is captured."""
+        if self.screenshot_policy == "always":
+            return True
+        if self.screenshot_policy == "every-n":
+            return step % self.screenshot_every == 0
+        if self.screenshot_policy == "final-only":
+            return step == total_steps
+        return False
+
+    def for_profile(self, test_profile: str | None) -> "RunOptions":
+        """Fill the timeouts left unset from the test profile's defaults."""
+        defaults = get_run_timeouts(test_profile)
+        return replace(
+            self,
+            run_timeout_seconds=self.run_timeout_seconds or defaults.run_seconds,
+            step_timeout_ms=self.step_timeout_ms or defaults.step_ms,
+            navigation_timeout_ms=self.navigation_timeout_ms or defaults.navigation_ms,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any] | None) -> "RunOptions":
+        """Build from enqueued kwargs; unknown keys (from newer senders) are ignored."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in known})
+
+
+class RunDeadline:
+    """
+    The whole-run budget as a runner sees it: every step's timeout is cut
+    down to what is left, so a run ends when its budget does.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.seconds = seconds
+        self._clock = clock
+        self._ends_at = clock() + seconds
+
+    def remaining_ms(self) -> float:
+        return max(0.0, (self._ends_at - self._clock()) * 1000)
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+    def cap(self, timeout_ms: float) -> float:
+        """`timeout_ms`, or the remaining budget if that is shorter (at least 1 ms)."""
+        return max(1.0, min(timeout_ms, self.remaining_ms()))
@@ -0,0 +1,160 @@
+"""
+Performance statistics over stored run reports.
+
+The runner records every step's `durationMs` (and, for `goto`, the page's
+navigation timing) in `test_report_*.json`. This module turns the reports
+of a job, or of all jobs, into p50/p95/p99 per test and per step, so slow
+pages and runner regressions show up without digging through reports.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+PERCENTILES = (50, 95, 99)
+
+# Run reports considered per test, newest first.
+DEFAULT_RUN_LIMIT = 100
+
+# Browser-side: the page's PerformanceNavigationTiming entry, if any.
+NAVIGATION_TIMING_SCRIPT = (
+    "() => { const [entry] = performance.getEntriesByType('navigation');"
+    " return entry ? entry.toJSON() : null; }"
+)
+
+
+def navigation_timing(entry: Dict[str, Any] | None) -> Dict[str, float] | None:
+    """
+    Condense a PerformanceNavigationTiming entry to the few figures worth
+    keeping per `goto` step; phases the page never reached are left out.
+    """
+    if not entry:
+        return None
+
+    def span(start: str, end: str) -> float | None:
+        begin, finish = entry.get(start), entry.get(end)
+        if not isinstance(begin, (int, float)) or not isinstance(finish, (int, float)) or finish <= 0:
+            return None
+        return round(max(0.0, finish - begin), 3)
+
+    timing = {
+        "ttfbMs": span("requestStart", "responseStart"),
+        "responseMs": span("responseStart", "responseEnd"),
+        "domContentLoadedMs": span("startTime", "domContentLoadedEventEnd"),
+        "loadMs": span("startTime", "loadEventEnd"),
+        "transferBytes": entry.get("transferSize"),
+    }
+    return {key: value for key, value in timing.items() if value is not None}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    value = ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+    return round(value, 3)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    summary: Dict[str, float] = {"count": len(values)}
+    if values:
+        for pct in PERCENTILES:
+            summary[f"p{pct}"] = percentile(values, pct)
+        summary["max"] = round(max(values), 3)
+    return summary
+
+
+def iter_run_reports(storage_root: Path, job_id: str | None = None) -> Iterator[Dict[str, Any]]:
+    """Run reports under `storage_root` (or one job's directory), newest first."""
+    pattern = f"{job_id}/test_report_*.json" if job_id else "*/test_report_*.json"
+    paths = sorted(storage_root.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in paths:
+        try:
+            yield json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+
+
+def _wall_ms(report: Dict[str, Any]) -> float | None:
+    try:
+        started = datetime.fromisoformat(report["startedAt"])
+        finished = datetime.fromisoformat(report["finishedAt"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (finished - started).total_seconds() * 1000
+
+
+def _step_summary(index: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+    summary = {
+        "step": index,
+        "action": entry["action"],
+        "durationMs": summarize(entry["durations"]),
+    }
+    if entry["navigation"]:
+        summary["navigation"] = {
+            key: summarize(values) for key, values in entry["navigation"].items()
+        }
+    return summary
+
+
+def run_stats(
+    reports: Iterable[Dict[str, Any]],
+    test_id: str | None = None,
+    limit: int = DEFAULT_RUN_LIMIT,
+) -> Dict[str, Any]:
+    """
+    Aggregate reports (newest first) per test and per step. Durations come
+    from passed runs and passed steps only, so failures cut short do not
+    drag the percentiles down; they are counted separately.
+    """
+    tests: Dict[str, Dict[str, Any]] = {}
+    for report in reports:
+        report_test = report.get("testId")
+        if not report_test or (test_id and report_test != test_id):
+            continue
+        entry = tests.setdefault(
+            report_test,
+            {"runs": 0, "failed": 0, "durations": [], "steps": {}},
+        )
+        if entry["runs"] >= limit:
+            continue
+        entry["runs"] += 1
+        if report.get("status") != "passed":
+            entry["failed"] += 1
+        else:
+            wall = _wall_ms(report)
+            if wall is not None:
+                entry["durations"].append(wall)
+
+        for step in report.get("steps", []):
+            duration = step.get("durationMs")
+            if step.get("status") != "passed" or not isinstance(duration, (int, float)):
+                continue
+            step_entry = entry["steps"].setdefault(
+                step["step"],
+                {"action": step.get("action"), "durations": [], "navigation": {}},
+            )
+            step_entry["durations"].append(duration)
+            for key, value in (step.get("navigation") or {}).items():
+                step_entry["navigation"].setdefault(key, []).append(value)
+
+    return {
+        "tests": [
+            {
+                "testId": name,
+                "runs": entry["runs"],
+                "failed": entry["failed"],
+                "durationMs": summarize(entry["durations"]),
+                "steps": [
+                    _step_summary(index, step_entry)
+                    for index, step_entry in sorted(entry["steps"].items())
+                ],
+            }
+            for name, entry in sorted(tests.items())
+        ]
+    }
@@ -40,4 +40,6 @@ class ArtifactItem(BaseModel):
     name: str
     type: str
     path: str
+    encoding: Optional[str] = None
+    details: dict[str, Any] = {}
 
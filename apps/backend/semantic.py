@@ -5,10 +5,12 @@ from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, Dict, List
 
-from bs4 import BeautifulSoup
-
+from api_catalog import CatalogBuilder
 from config import settings
+from har import iter_har_entries
+from html_parsers import Candidate, parse_candidates, resolve_backend
 from mock_llm import ClassifiedElement, classify_element
+from semantic_cache import cache_key, semantic_cache
 from storage import storage_adapter, ArtifactRecord
 
 
@@ -21,24 +23,6 @@ class SemanticElement:
     confidence: float
 
 
-def _load_dom(job_id: str) -> str:
-    path = Path(settings.storage_root) / job_id / "dom.json"
-    raw = path.read_text(encoding="utf-8")
-    data = json.loads(raw)
-    return data.get("outer_html", "")
-
-
-def _load_har(job_id: str) -> Dict[str, Any] | None:
-    path = Path(settings.storage_root) / job_id / "trace.har"
-    if not path.exists():
-        return None
-    raw = path.read_text(encoding="utf-8", errors="ignore")
-    try:
-        return json.loads(raw)
-    except Exception:
-        return None
-
-
 def _build_selector(el) -> str:
     el_id = el.get("id")
     if el_id:
@@ -52,13 +36,34 @@ def _build_selector(el) -> str:
     return el.name
 
 
-def _label_for_input(soup: BeautifulSoup, el) -> str:
+# Keys of semantic_candidates.json entries mapped to HTML attribute names.
+_BROWSER_CANDIDATE_ATTRS = {
+    "id": "id",
+    "name": "name",
+    "classes": "class",
+    "ariaLabel": "aria-label",
+    "placeholder": "placeholder",
+}
+
+
+def _candidates_from_browser(items: List[Dict[str, Any]]) -> List[Candidate]:
+    candidates = []
+    for item in items:
+        attrs = {
+            attr: item[key]
+            for key, attr in _BROWSER_CANDIDATE_ATTRS.items()
+            if key in item
+        }
+        candidates.append(
+            Candidate(item["tag"], attrs, item.get("text", ""), item.get("label", ""))
+        )
+    return candidates
+
+
+def _label_for_input(el: Candidate) -> str:
     # Label via <label for="...">
-    el_id = el.get("id")
-    if el_id:
-        label_el = soup.find("label", attrs={"for": el_id})
-        if label_el and label_el.get_text(strip=True):
-            return label_el.get_text(strip=True)
+    if el.for_label:
+        return el.for_label
     # aria-label
     aria = el.get("aria-label")
     if aria:
@@ -70,44 +75,40 @@ def _label_for_input(soup: BeautifulSoup, el) -> str:
     return ""
 
 
-def build_semantic_model(job_id: str) -> Dict[str, Any]:
-    outer_html = _load_dom(job_id)
-    soup = BeautifulSoup(outer_html, "html.parser")
-
+def _model_from_candidates(candidates: List[Candidate]) -> Dict[str, Any]:
     elements: List[SemanticElement] = []
     counter = 1
 
-    # Clickable elements
-    clickable_tags = ["a", "button"]
-    for tag in clickable_tags:
-        for el in soup.find_all(tag):
-            label = el.get_text(strip=True) or el.get("aria-label", "") or ""
-            if not label:
-                continue
+    # Candidates come ordered: links, then buttons, then inputs.
+    for el in candidates:
+        if el.name == "input":
+            label = _label_for_input(el)
             selector = _build_selector(el)
-            classified: ClassifiedElement = classify_element(label, el.name)
+            classified: ClassifiedElement = classify_element(label or selector, el.name)
             elements.append(
                 SemanticElement(
                     id=f"el_{counter}",
                     selector=selector,
                     role=classified.role,
-                    label=label,
+                    label=label or selector,
                     confidence=classified.confidence,
                 )
             )
             counter += 1
+            continue
 
-    # Inputs
-    for el in soup.find_all("input"):
-        label = _label_for_input(soup, el)
+        # Clickable elements
+        label = el.text or el.get("aria-label", "") or ""
+        if not label:
+            continue
         selector = _build_selector(el)
-        classified = classify_element(label or selector, el.name)
+        classified = classify_element(label, el.name)
         elements.append(
             SemanticElement(
                 id=f"el_{counter}",
                 selector=selector,
                 role=classified.role,
-                label=label or selector,
+                label=label,
                 confidence=classified.confidence,
             )
         )
@@ -134,49 +135,45 @@ def build_semantic_model(job_id: str) -> Dict[str, Any]:
             }
         )
 
-    model = {
+    return {
         "elements": [asdict(e) for e in elements],
         "flows": flows,
     }
 
+
+def build_semantic_model(job_id: str) -> Dict[str, Any]:
+    # Prefer the element list the browser already produced (see
+    # extractor/semantic_capture.py); fall back to parsing the DOM snapshot.
+    job_dir = Path(settings.storage_root) / job_id
+    candidates_path = job_dir / "semantic_candidates.json"
+    if candidates_path.exists():
+        source, data = "browser", candidates_path.read_bytes()
+    else:
+        source, data = resolve_backend(settings.semantic_html_parser), (job_dir / "dom.json").read_bytes()
+
+    # Pages seen before (by any job) skip parsing and classification.
+    key = cache_key(source, data)
+    model = semantic_cache.get(key)
+    if model is None:
+        if source == "browser":
+            candidates = _candidates_from_browser(json.loads(data).get("candidates", []))
+        else:
+            candidates = parse_candidates(json.loads(data).get("outer_html", ""), source)
+        model = _model_from_candidates(candidates)
+        semantic_cache.put(key, model)
+
     storage_adapter.save_json(job_id, "semantic_model.json", model)
     return model
 
 
 def build_api_catalog(job_id: str) -> Dict[str, Any]:
-    har = _load_har(job_id)
-    endpoints: List[Dict[str, Any]] = []
-    if not har:
-        catalog = {"endpoints": endpoints}
-        storage_adapter.save_json(job_id, "api_catalog.json", catalog)
-        return catalog
-
-    entries = har.get("log", {}).get("entries", [])
-    for entry in entries:
-        request = entry.get("request", {})
-        response = entry.get("response", {})
-
-        method = request.get("method", "")
-        url = request.get("url", "")
-        status = response.get("status", 0)
-
-        post_data = request.get("postData", {})
-        req_body = post_data.get("text") if isinstance(post_data, dict) else None
-
-        content = response.get("content", {})
-        res_body = content.get("text") if isinstance(content, dict) else None
-
-        endpoints.append(
-            {
-                "method": method,
-                "url": url,
-                "status": status,
-                "sampleRequestBody": req_body,
-                "sampleResponseBody": res_body,
-            }
-        )
+    har_dir = Path(settings.storage_root) / job_id
+    builder = CatalogBuilder(har_dir)
+    # One entry in memory at a time; a missing HAR gives an empty catalog.
+    for entry in iter_har_entries(har_dir / "trace.har"):
+        builder.add(entry)
 
-    catalog = {"endpoints": endpoints}
+    catalog = builder.catalog()
     storage_adapter.save_json(job_id, "api_catalog.json", catalog)
     return catalog
 
@@ -0,0 +1,110 @@
+"""
+Semantic models shared by every job whose page yields the same input.
+
+`build_semantic_model` is a pure function of the job's semantic input
+(`semantic_candidates.json`, or `dom.json` read with a given parser
+backend) and of the rules that turn it into a model. The cache key hashes
+both: the input file's bytes and `rules_version()`, a hash of the source of
+the modules holding those rules, so editing the classifier or the builder
+invalidates every entry without any bookkeeping.
+
+Entries are kept in an in-process LRU of `max_entries` models and on disk
+under `<storage_root>/_cache/semantic/`, so workers and restarts share them.
+Stale entries are never read again and can be deleted at any time.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import settings
+from storage import LocalFSStorageAdapter, storage_adapter
+
+# Modules whose code decides a semantic model: the builder, the parser
+# backends and the classifier.
+RULE_MODULES = ("semantic.py", "html_parsers.py", "mock_llm.py")
+
+
+@lru_cache(maxsize=None)
+def rules_version() -> str:
+    digest = hashlib.sha256()
+    for name in RULE_MODULES:
+        digest.update(name.encode("utf-8"))
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def cache_key(source: str, data: bytes) -> str:
+    """`source` names how `data` is read, e.g. "browser" or the HTML parser backend."""
+    digest = hashlib.sha256(f"{rules_version()}\n{source}\n".encode("utf-8"))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class SemanticModelCache:
+    def __init__(self, storage: LocalFSStorageAdapter, max_entries: int, enabled: bool = True) -> None:
+        self.storage = storage
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.root = storage.root / "_cache" / "semantic"
+        self._memory: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _remember(self, key: str, model: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = model
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            model = self._memory.get(key)
+            if model is not None:
+                self._memory.move_to_end(key)
+            return model
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """A copy of the cached model, from memory or else from disk."""
+        if not self.enabled:
+            return None
+        model = self._recall(key)
+        if model is not None:
+            return copy.deepcopy(model)
+        try:
+            model = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self._remember(key, model)
+        return copy.deepcopy(model)
+
+    def put(self, key: str, model: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        self._remember(key, copy.deepcopy(model))
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        # Unique per writer: jobs on the same page may store the same key at once.
+        tmp_path = path.with_name(f"{key}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps(model), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+semantic_cache = SemanticModelCache(
+    storage_adapter,
+    settings.semantic_cache_max_entries,
+    enabled=settings.semantic_cache_enabled,
+)
@@ -0,0 +1,107 @@
+"""
+Duration-aware sharding of batch runs across runner workers.
+
+Each run's cost is estimated from the reports of its test's previous runs
+(`test_report_*.json`: summed per-step `durationMs` where recorded, the
+report's wall time otherwise). Runs are then packed longest-processing-
+time first: from slowest to fastest, each goes to the currently lightest
+shard, which keeps the slowest shard (the suite's makespan) within 4/3 of
+the optimum.
+
+Estimates are sequential: a shard's `estimated_ms` is the sum of its runs'
+durations, whereas a runner executes a shard's runs concurrently. Its wall
+time is roughly that sum divided by the runner's concurrency, which the
+backend does not know; dividing every shard by the same factor would not
+change how they are balanced.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import statistics
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Reports considered per test, newest first.
+HISTORY_DEPTH = 5
+
+# Estimate for a run when no test in the batch has any history.
+DEFAULT_RUN_MS = 30_000
+
+
+@dataclass
+class Shard(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    estimated_ms: int = 0  # the runs' summed durations, not wall time
+
+
+def report_duration_ms(report: Dict[str, Any]) -> int | None:
+    """How long a finished run took, preferring the recorded step durations."""
+    step_durations = [step.get("durationMs") for step in report.get("steps", [])]
+    if step_durations and all(isinstance(d, (int, float)) for d in step_durations):
+        return int(sum(step_durations))
+    try:
+        started = datetime.fromisoformat(report["startedAt"])
+        finished = datetime.fromisoformat(report["finishedAt"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return max(0, int((finished - started).total_seconds() * 1000))
+
+
+def historical_duration_ms(job_dir: Path, test_id: str, depth: int = HISTORY_DEPTH) -> int | None:
+    """Median duration of the test's last `depth` runs in `job_dir`, or None without history."""
+    reports = sorted(
+        job_dir.glob("test_report_*.json"),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    durations: List[int] = []
+    for path in reports:
+        try:
+            report = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if report.get("testId") != test_id:
+            continue
+        duration = report_duration_ms(report)
+        if duration is not None:
+            durations.append(duration)
+        if len(durations) >= depth:
+            break
+    return int(statistics.median(durations)) if durations else None
+
+
+def estimate_durations(storage_root: Path, pairs: Sequence[Tuple[str, str]]) -> List[int]:
+    """
+    Estimated milliseconds for each (job_id, test_id). Tests without history
+    get the median of the others (or DEFAULT_RUN_MS when nothing has run).
+    """
+    known = [historical_duration_ms(storage_root / job_id, test_id) for job_id, test_id in pairs]
+    measured = [d for d in known if d is not None]
+    fallback = int(statistics.median(measured)) if measured else DEFAULT_RUN_MS
+    return [fallback if d is None else d for d in known]
+
+
+def plan_shards(items: Sequence[T], durations: Sequence[int], shard_count: int) -> List[Shard[T]]:
+    """
+    Pack `items` into at most `shard_count` shards balancing their estimated
+    durations. Shards are returned heaviest first and keep no empty shards.
+    """
+    shard_count = max(1, min(shard_count, len(items)))
+    shards: List[Shard[T]] = [Shard() for _ in range(shard_count)]
+    # Heap of (load, shard index); ties go to the lower index for determinism.
+    loads = [(0, index) for index in range(shard_count)]
+    order = sorted(range(len(items)), key=lambda i: (-durations[i], i))
+    for i in order:
+        load, index = heapq.heappop(loads)
+        shards[index].items.append(items[i])
+        shards[index].estimated_ms += durations[i]
+        heapq.heappush(loads, (load + durations[i], index))
+    shards = [shard for shard in shards if shard.items]
+    shards.sort(key=lambda shard: shard.estimated_ms, reverse=True)
+    return shards
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass, asdict
+import os
+import shutil
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Protocol
 
 from config import settings
 
@@ -13,6 +15,20 @@ class ArtifactRecord:
     name: str
     type: str
     path: str  # path relative to storage root, e.g. "job_123/dom.json"
+    encoding: Optional[str] = None  # e.g. "png", "jpeg", "webp" for screenshots
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class ArtifactSaver(Protocol):
+    """
+    The writes page captures need, met by LocalFSStorageAdapter and by
+    extractor.artifact_writer.BackgroundArtifactWriter. Both return the
+    artifact's path relative to the storage root.
+    """
+
+    def save_bytes(self, job_id: str, filename: str, data: bytes) -> str: ...
+
+    def save_json(self, job_id: str, filename: str, obj: object) -> str: ...
 
 
 class LocalFSStorageAdapter:
@@ -35,7 +51,11 @@ class LocalFSStorageAdapter:
     def save_bytes(self, job_id: str, filename: str, data: bytes) -> str:
         job_dir = self.job_dir(job_id)
         file_path = job_dir / filename
-        file_path.write_bytes(data)
+        # Write to a sibling and rename, so a file hard-linked from another
+        # job (see link_artifact) is replaced rather than modified in place.
+        tmp_path = file_path.with_name(f".{filename}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, file_path)
         rel_path = f"{job_id}/{filename}"
         return rel_path
 
@@ -43,6 +63,25 @@ class LocalFSStorageAdapter:
         serialized = json.dumps(obj, indent=2).encode("utf-8")
         return self.save_bytes(job_id, filename, serialized)
 
+    def link_artifact(self, src_job_id: str, dest_job_id: str, filename: str) -> Optional[str]:
+        """
+        Make `filename` from one job's directory available in another's,
+        hard-linking where possible and copying otherwise. Returns the new
+        relative path, or None if the source file does not exist.
+        """
+        src_path = self.root / src_job_id / filename
+        if not src_path.is_file():
+            return None
+        dest_path = self.job_dir(dest_job_id) / filename
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        if dest_path.exists():
+            dest_path.unlink()
+        try:
+            os.link(src_path, dest_path)
+        except OSError:
+            shutil.copy2(src_path, dest_path)
+        return f"{dest_job_id}/{filename}"
+
     def load_manifest(self, job_id: str) -> List[ArtifactRecord]:
         manifest_path = self.root / job_id / "manifest.json"
         if not manifest_path.exists():
@@ -8,3 +8,5 @@ from pathlib import Path
 # Add parent directory (apps/backend) to Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
+# and apps/, for the workers' packages, as in the extractor image
+sys.path.insert(1, str(backend_dir.parent))
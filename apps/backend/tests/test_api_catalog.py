@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from api_catalog import SAMPLE_BODY_CHARS, CatalogBuilder, entry_latency_ms, template_url
+
+
+def _entry(url: str, status: int = 200, body: str = "{}", method: str = "GET", wait: float = 10.0) -> dict:
+    return {
+        "time": 999,
+        "request": {"method": method, "url": url},
+        "response": {
+            "status": status,
+            "content": {"size": len(body), "mimeType": "application/json", "text": body},
+        },
+        "timings": {"blocked": -1, "dns": -1, "connect": -1, "ssl": -1, "send": 1.0, "wait": wait, "receive": 2.0},
+    }
+
+
+def test_template_url_replaces_ids_and_query_values() -> None:
+    assert template_url("https://a.test/api/items/123?ts=1&page=2") == "https://a.test/api/items/{id}?page={page}&ts={ts}"
+    assert template_url("https://a.test/u/3fa85f64-5717-4562-b3fc-2c963f66afa6/avatar") == "https://a.test/u/{id}/avatar"
+    assert template_url("https://a.test/blob/5f2b9c0e1a7d4e3f/raw") == "https://a.test/blob/{id}/raw"
+    assert template_url("https://a.test/t/eyJhbGciOiJIUzI1NiJ9abc") == "https://a.test/t/{id}"
+    # Words stay, however long.
+    assert template_url("https://a.test/blog/a-very-long-article-title-here") == "https://a.test/blog/a-very-long-article-title-here"
+    assert template_url("https://a.test/v2/deadbeefcafebabe") == "https://a.test/v2/deadbeefcafebabe"
+
+
+def test_entry_latency_sums_applicable_timing_phases() -> None:
+    assert entry_latency_ms(_entry("https://a.test/")) == 13.0
+    assert entry_latency_ms({"time": 42, "timings": {}}) == 42.0
+    assert entry_latency_ms({}) is None
+
+
+def test_entries_collapse_into_endpoint_templates(tmp_path: Path) -> None:
+    builder = CatalogBuilder(tmp_path)
+    builder.add(_entry("https://a.test/api/items/1?ts=1", status=500, body='{"error": 1}', wait=10.0))
+    for n in range(2, 5):
+        builder.add(_entry(f"https://a.test/api/items/{n}?ts={n}", body=f'{{"id": {n}}}', wait=10.0 * n))
+    builder.add(_entry("https://a.test/api/items", method="POST", status=201))
+
+    catalog = builder.catalog()
+
+    assert catalog["entries"] == 5
+    assert [(e["method"], e["url"]) for e in catalog["endpoints"]] == [
+        ("GET", "https://a.test/api/items/{id}?ts={ts}"),
+        ("POST", "https://a.test/api/items"),
+    ]
+    items = catalog["endpoints"][0]
+    assert items["count"] == 4
+    assert items["status"] == 200
+    assert items["statuses"] == {"200": 3, "500": 1}
+    assert items["latencyMs"]["count"] == 4
+    assert items["latencyMs"]["max"] == 43.0
+    assert items["responseBytes"]["p50"] == 9.0
+    # The first successful call is the sample.
+    assert items["sampleUrl"] == "https://a.test/api/items/2?ts=2"
+    assert items["sampleResponseBody"] == '{"id": 2}'
+    assert items["sampleTruncated"] is False
+
+
+def test_sample_bodies_are_truncated(tmp_path: Path) -> None:
+    builder = CatalogBuilder(tmp_path)
+    builder.add(_entry("https://a.test/big", body="x" * (SAMPLE_BODY_CHARS + 10)))
+
+    endpoint = builder.catalog()["endpoints"][0]
+
+    assert len(endpoint["sampleResponseBody"]) == SAMPLE_BODY_CHARS
+    assert endpoint["sampleTruncated"] is True
@@ -0,0 +1,79 @@
+import stat
+from pathlib import Path
+
+from auth_state import AuthStateCache, SavedSession, login_step_range
+from storage import LocalFSStorageAdapter
+
+MODEL = {
+    "elements": [
+        {"id": "el_1", "selector": "#user"},
+        {"id": "el_2", "selector": "#pass"},
+        {"id": "el_3", "selector": "button.login"},
+    ],
+    "flows": [
+        {
+            "id": "flow_login",
+            "steps": [
+                {"action": "fill", "target": "el_1"},
+                {"action": "fill", "target": "el_2"},
+                {"action": "click", "target": "el_3"},
+            ],
+        }
+    ],
+}
+
+
+def test_finds_the_login_flow_in_the_test_steps() -> None:
+    steps = [
+        {"action": "goto", "url": "/login"},
+        {"action": "fill", "selector": "#user", "value": "demo"},
+        {"action": "fill", "selector": "#pass", "value": "secret"},
+        {"action": "click", "selector": "button.login"},
+        {"action": "expectText", "selector": "h1", "value": "Welcome"},
+    ]
+
+    assert login_step_range(steps, MODEL) == range(1, 4)
+    # A different click target is not the login flow.
+    assert login_step_range(steps[:3] + [{"action": "click", "selector": "#other"}], MODEL) is None
+    assert login_step_range(steps, {"elements": [], "flows": []}) is None
+    assert login_step_range(steps, None) is None
+
+
+def test_saved_state_expires_and_can_be_invalidated(tmp_path: Path) -> None:
+    now = [1000.0]
+    cache = AuthStateCache(LocalFSStorageAdapter(str(tmp_path)), ttl_seconds=60, clock=lambda: now[0])
+    state = {"cookies": [{"name": "sid", "value": "abc"}], "origins": []}
+
+    assert cache.load("job_a") is None
+    cache.store("job_a", state)
+    assert cache.load("job_a") == state
+    assert stat.S_IMODE((tmp_path / "_cache" / "auth" / "job_a.json").stat().st_mode) == 0o600
+
+    now[0] += 61
+    assert cache.load("job_a") is None
+
+    now[0] = 1000.0
+    cache.invalidate("job_a")
+    assert cache.load("job_a") is None
+    cache.invalidate("job_a")  # already gone
+
+
+def test_saved_session_keeps_the_url_the_login_led_to(tmp_path: Path) -> None:
+    cache = AuthStateCache(LocalFSStorageAdapter(str(tmp_path)), ttl_seconds=60)
+    state = {"cookies": [{"name": "sid", "value": "abc"}], "origins": []}
+
+    cache.store("job_a", state, "http://app.test/dashboard")
+    cache.store("job_b", state)
+
+    assert cache.load_session("job_a") == SavedSession(state, "http://app.test/dashboard")
+    assert cache.load_session("job_b") == SavedSession(state, None)
+    assert cache.load("job_a") == state
+
+
+def test_zero_ttl_turns_reuse_off(tmp_path: Path) -> None:
+    cache = AuthStateCache(LocalFSStorageAdapter(str(tmp_path)), ttl_seconds=0)
+
+    cache.store("job_a", {"cookies": []})
+
+    assert cache.load("job_a") is None
+    assert not (tmp_path / "_cache" / "auth").exists()
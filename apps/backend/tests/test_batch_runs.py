@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+
+from rq import Queue
+
+from batch_runs import aggregate_batch_report, plan_batch
+from config import settings
+from queue_adapter import (
+    JOB_TIMEOUT_MARGIN_SECONDS,
+    OrchestrationQueue,
+    extraction_batch_timeout,
+    run_batch_timeout,
+)
+from run_options import RunOptions
+
+
+class _RecordingQueue:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def enqueue(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return type("RQJob", (), {"id": "rq_1"})()
+
+
+def test_aggregate_report_counts_statuses_and_links_run_reports() -> None:
+    runs = plan_batch("batch_1", [("job_a", "test_a"), ("job_b", "test_b"), ("job_c", "test_c")])
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    report = aggregate_batch_report("batch_1", runs, ["passed", "failed", "error"], started, started)
+
+    assert [run.run_id for run in runs] == ["batch_1_1", "batch_1_2", "batch_1_3"]
+    assert report["status"] == "failed"
+    assert report["counts"] == {"passed": 1, "failed": 1, "error": 1}
+    assert report["runs"][1] == {
+        "jobId": "job_b",
+        "testId": "test_b",
+        "runId": "batch_1_2",
+        "status": "failed",
+        "report": "job_b/test_report_batch_1_2.json",
+    }
+
+
+def test_all_passed_batch_passes() -> None:
+    runs = plan_batch("batch_1", [("job_a", "test_a")])
+    now = datetime.now(timezone.utc)
+
+    assert aggregate_batch_report("batch_1", runs, ["passed"], now, now)["status"] == "passed"
+
+
+def test_enqueued_tasks_receive_job_id() -> None:
+    # RQ treats a bare job_id= as its own job id; it must reach the task instead.
+    adapter = OrchestrationQueue("redis://localhost:6379/0")
+    adapter._run_queue = _RecordingQueue()
+    adapter._job_queue = _RecordingQueue()
+
+    adapter.enqueue_test_run("job_a", "test_a", RunOptions(screenshot_policy="on-failure"), run_id="run_a")
+    adapter.enqueue_extraction("job_a")
+    adapter.enqueue_test_batch("batch_1", plan_batch("batch_1", [("job_a", "test_a")]), shard=2)
+
+    run_call, batch_call = adapter._run_queue.calls
+    [extraction_call] = adapter._job_queue.calls
+    # parse_args returns (..., job_id at index 7, ..., args, kwargs)
+    run = Queue.parse_args(*run_call[0], **run_call[1])
+    extraction = Queue.parse_args(*extraction_call[0], **extraction_call[1])
+    batch = Queue.parse_args(*batch_call[0], **batch_call[1])
+
+    assert run[7] == "run_a"
+    assert run[-1]["job_id"] == "job_a"
+    assert run[-1]["options"]["screenshot_policy"] == "on-failure"
+    assert extraction[-1] == {"job_id": "job_a"}
+    assert batch[7] == "batch_1_shard2"
+    assert batch[-1]["shard"] == 2
+    assert batch[-1]["runs"] == [
+        {"job_id": "job_a", "test_id": "test_a", "run_id": "batch_1_1", "test_profile": None}
+    ]
+
+
+def test_extraction_batch_timeout_covers_every_wave(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "extractor_concurrency", 4)
+    monkeypatch.setattr(settings, "extractor_job_timeout_seconds", 120)
+
+    assert extraction_batch_timeout(4) == 120 + JOB_TIMEOUT_MARGIN_SECONDS
+    assert extraction_batch_timeout(9) == 3 * 120 + JOB_TIMEOUT_MARGIN_SECONDS
+
+    monkeypatch.setattr(settings, "extractor_job_timeout_seconds", 0)
+    assert extraction_batch_timeout(9) == -1
+
+
+def test_run_batch_timeout_spreads_run_limits_over_the_slots(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "runner_concurrency", 2)
+    monkeypatch.setattr(settings, "runner_run_timeout_seconds", 100)
+    runs = plan_batch("batch_1", [("job_a", "t"), ("job_b", "t"), ("job_c", "t")], {"job_c": "fast"})
+
+    # Limits: functional min(180, 100) + 10s step, fast 60 + 5s step.
+    # (110 + 110 + 65) / 2 slots + the longest, 110, rounded up.
+    assert run_batch_timeout(runs, RunOptions()) == 253 + JOB_TIMEOUT_MARGIN_SECONDS
@@ -0,0 +1,16 @@
+from capacity import concurrency_cap
+
+
+def test_configured_value_is_bounded_by_cpu_and_memory() -> None:
+    assert concurrency_cap(16, cpus=4, memory_mb=8000, per_cpu=2, per_slot_mb=200) == 8
+    assert concurrency_cap(16, cpus=8, memory_mb=1000, per_cpu=2, per_slot_mb=200) == 5
+    assert concurrency_cap(3, cpus=8, memory_mb=8000, per_cpu=2, per_slot_mb=200) == 3
+
+
+def test_zero_configured_means_derived_from_resources() -> None:
+    assert concurrency_cap(0, cpus=2, memory_mb=None, per_cpu=3, per_slot_mb=200) == 6
+
+
+def test_never_below_one_slot() -> None:
+    assert concurrency_cap(4, cpus=4, memory_mb=50, per_cpu=2, per_slot_mb=200) == 1
+    assert concurrency_cap(0, cpus=4, memory_mb=None, per_cpu=0, per_slot_mb=0) == 1
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from extraction_cache import CacheEntry, ExtractionCache, ProbeResult, dom_hash
+from storage import ArtifactRecord, LocalFSStorageAdapter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _extracted_job(adapter: LocalFSStorageAdapter, job_id: str) -> None:
+    adapter.save_json(job_id, "dom.json", {"outer_html": "<p>hi</p>"})
+    adapter.save_json(job_id, "accessibility.json", {"role": "WebArea"})
+    adapter.save_json(job_id, "extraction.json", {"profile": "functional"})
+    adapter.save_bytes(job_id, "body-1.json", b'{"ok": true}')
+    har = {"log": {"entries": [{"response": {"content": {"mimeType": "application/json", "_file": "body-1.json"}}}]}}
+    adapter.save_json(job_id, "trace.har", har)
+    adapter.save_manifest(
+        job_id,
+        [
+            ArtifactRecord(name="dom.json", type="dom", path=f"{job_id}/dom.json"),
+            ArtifactRecord(name="accessibility.json", type="accessibility", path=f"{job_id}/accessibility.json"),
+            ArtifactRecord(name="trace.har", type="har", path=f"{job_id}/trace.har"),
+            ArtifactRecord(name="extraction.json", type="extraction", path=f"{job_id}/extraction.json"),
+        ],
+    )
+
+
+def test_lookup_returns_stored_entry_until_it_expires(tmp_path: Path) -> None:
+    adapter = LocalFSStorageAdapter(str(tmp_path))
+    clock = _Clock()
+    cache = ExtractionCache(adapter, ttl_seconds=60, clock=clock)
+    _extracted_job(adapter, "job_1")
+
+    cache.store("job_1", "https://example.com/", "functional", dom_hash("<p>hi</p>"), ProbeResult(200, etag='"v1"'))
+
+    entry = cache.lookup("https://example.com/", "functional")
+    assert entry is not None and entry.job_id == "job_1" and entry.etag == '"v1"'
+    assert cache.lookup("https://example.com/", "fast") is None
+
+    clock.now += 61
+    assert cache.lookup("https://example.com/", "functional") is None
+
+
+def test_lookup_ignores_entries_whose_job_is_gone(tmp_path: Path) -> None:
+    adapter = LocalFSStorageAdapter(str(tmp_path))
+    cache = ExtractionCache(adapter, ttl_seconds=0)
+
+    cache.store("job_1", "https://example.com/", "functional", "hash", None)
+
+    assert cache.lookup("https://example.com/", "functional") is None
+
+
+def test_probe_result_detects_unchanged_pages() -> None:
+    entry = CacheEntry(job_id="job_1", target_url="u", profile="p", dom_hash="h", etag='"v1"')
+
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+    assert ProbeResult(304).unchanged_since(entry)
+    assert ProbeResult(200, etag='"v1"').unchanged_since(entry)
+    assert not ProbeResult(200, etag='"v2"').unchanged_since(entry)
+    assert not ProbeResult(304).unchanged_since(
+        CacheEntry(job_id="job_1", target_url="u", profile="p", dom_hash="h")
+    )
+
+
+def test_reuse_links_artifacts_and_attached_bodies(tmp_path: Path) -> None:
+    adapter = LocalFSStorageAdapter(str(tmp_path))
+    cache = ExtractionCache(adapter, ttl_seconds=0)
+    _extracted_job(adapter, "job_1")
+    adapter.save_json("job_1", "semantic_model.json", {"elements": [], "flows": []})
+    adapter.save_json("job_1", "api_catalog.json", {"entries": 0, "endpoints": []})
+    entry = cache.store("job_1", "https://example.com/", "functional", "hash", None)
+
+    names = cache.reusable_artifacts(entry)
+    records = cache.reuse(entry, "job_2", names)
+
+    # Semantic outputs are rebuilt, never linked.
+    assert names == ["dom.json", "accessibility.json", "trace.har"]
+    assert [(r.name, r.type, r.path) for r in records] == [
+        ("dom.json", "dom", "job_2/dom.json"),
+        ("accessibility.json", "accessibility", "job_2/accessibility.json"),
+        ("trace.har", "har", "job_2/trace.har"),
+    ]
+    assert all(r.details["reusedFrom"] == "job_1" for r in records)
+    assert json.loads((tmp_path / "job_2" / "body-1.json").read_text()) == {"ok": True}
@@ -0,0 +1,70 @@
+from config import Settings
+from extraction_profiles import (
+    BlockedRequestLog,
+    ExtractionProfile,
+    build_extraction_profiles,
+    get_extraction_profile,
+)
+
+TARGET = "http://sample-app:3000/sample-app/login"
+
+
+def test_unknown_profile_falls_back_to_functional() -> None:
+    assert get_extraction_profile("does-not-exist").name == "functional"
+    assert get_extraction_profile(None).name == "functional"
+
+
+def test_functional_profile_blocks_nothing() -> None:
+    profile = get_extraction_profile("functional")
+    assert not profile.blocks_requests
+    assert profile.block_reason("image", "https://cdn.example.com/a.png", TARGET) is None
+
+
+def test_fast_profile_blocks_media_and_third_party() -> None:
+    profile = get_extraction_profile("fast")
+    assert profile.block_reason("image", "http://sample-app:3000/logo.png", TARGET) == "resource_type"
+    assert profile.block_reason("script", "https://tracker.example.net/t.js", TARGET) == "third_party"
+    assert profile.block_reason("script", "http://sample-app:3000/app.js", TARGET) is None
+    assert profile.block_reason("document", TARGET, TARGET) is None
+
+
+def test_request_lists_come_from_settings() -> None:
+    profiles = build_extraction_profiles(
+        Settings(
+            EXTRACTOR_ALLOW_HOSTS="cdn.example.com",
+            EXTRACTOR_DENY_HOSTS=" Ads.example.com, tracker.example.net ,",
+            EXTRACTOR_FAST_BLOCK_RESOURCE_TYPES="media",
+        )
+    )
+    functional, fast = profiles["functional"], profiles["fast"]
+
+    assert functional.deny_hosts == ("ads.example.com", "tracker.example.net")
+    assert functional.blocks_requests
+    assert functional.block_reason("script", "https://x.ads.example.com/a.js", TARGET) == "deny_host"
+    assert fast.block_resource_types == ("media",)
+    assert fast.block_reason("image", "http://sample-app:3000/logo.png", TARGET) is None
+    assert fast.block_reason("font", "https://cdn.example.com/a.woff", TARGET) is None
+
+
+def test_allow_list_wins_over_deny_and_type_rules() -> None:
+    profile = ExtractionProfile(
+        name="custom",
+        block_resource_types=("image",),
+        block_third_party=True,
+        allow_hosts=("cdn.example.com",),
+        deny_hosts=("example.com",),
+    )
+    assert profile.block_reason("image", "https://cdn.example.com/a.png", TARGET) is None
+    assert profile.block_reason("xhr", "https://api.example.com/v1", TARGET) == "deny_host"
+
+
+def test_blocked_request_log_tallies_and_caps_samples() -> None:
+    log = BlockedRequestLog(max_samples=1)
+    log.record("resource_type", "image", "http://sample-app:3000/a.png")
+    log.record("third_party", "script", "https://tracker.example.net/t.js")
+
+    summary = log.to_dict()
+    assert summary["total"] == 2
+    assert summary["byReason"] == {"resource_type": 1, "third_party": 1}
+    assert summary["byHost"]["tracker.example.net"] == 1
+    assert len(summary["samples"]) == 1
@@ -0,0 +1,149 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import har
+from har import (
+    filter_har_bodies,
+    har_origin,
+    has_response_body,
+    is_textual,
+    iter_har_entries,
+    playwright_har_content,
+    read_response_body,
+)
+
+
+def _write_attach_har(directory: Path) -> Path:
+    (directory / "small.json").write_text('{"ok": true}', encoding="utf-8")
+    (directory / "big.json").write_text('{"data": "' + "x" * 100 + '"}', encoding="utf-8")
+    (directory / "logo.png").write_bytes(b"\x89PNG....")
+    har = {
+        "log": {
+            "entries": [
+                {"response": {"content": {"mimeType": "application/json; charset=utf-8", "_file": "small.json"}}},
+                {"response": {"content": {"mimeType": "application/json", "_file": "big.json"}}},
+                {"response": {"content": {"mimeType": "image/png", "_file": "logo.png"}}},
+                {"response": {"content": {"mimeType": "text/html", "size": 0}}},
+            ]
+        }
+    }
+    har_path = directory / "trace.har"
+    har_path.write_text(json.dumps(har), encoding="utf-8")
+    return har_path
+
+
+def test_is_textual_matches_prefixes_suffixes_and_exact_types() -> None:
+    assert is_textual("text/html; charset=utf-8")
+    assert is_textual("application/problem+json")
+    assert is_textual("application/json")
+    assert not is_textual("image/png")
+    assert not is_textual(None)
+
+
+def test_filtered_mode_records_as_attach() -> None:
+    assert playwright_har_content("filtered") == "attach"
+    assert playwright_har_content("omit") == "omit"
+    with pytest.raises(ValueError):
+        playwright_har_content("zip")
+
+
+def test_filter_har_bodies_keeps_small_textual_bodies_only(tmp_path: Path) -> None:
+    raw = _write_attach_har(tmp_path)
+    dest = tmp_path / "filtered.har"
+
+    stats = filter_har_bodies(raw, dest, ("application/json",), max_bytes=50)
+
+    assert stats == {"bodiesKept": 1, "bodiesDropped": 2}
+    entries = json.loads(dest.read_text(encoding="utf-8"))["log"]["entries"]
+    assert entries[0]["response"]["content"]["text"] == '{"ok": true}'
+    assert all("_file" not in e["response"]["content"] for e in entries)
+    assert "text" not in entries[1]["response"]["content"]
+
+
+def test_read_response_body_handles_every_content_mode(tmp_path: Path) -> None:
+    _write_attach_har(tmp_path)
+
+    assert read_response_body({"text": "embedded"}, tmp_path) == "embedded"
+    assert read_response_body({"mimeType": "text/html", "size": 10}, tmp_path) is None
+    assert read_response_body(
+        {"mimeType": "application/json", "_file": "small.json"}, tmp_path
+    ) == '{"ok": true}'
+    assert read_response_body({"mimeType": "image/png", "_file": "logo.png"}, tmp_path) is None
+    assert read_response_body({"mimeType": "image/png", "text": "iVBORw0=", "encoding": "base64"}, tmp_path) is None
+
+
+def test_read_response_body_refuses_paths_outside_har_dir(tmp_path: Path) -> None:
+    har_dir = tmp_path / "job"
+    har_dir.mkdir()
+    (tmp_path / "secret.json").write_text("{}", encoding="utf-8")
+
+    content = {"mimeType": "application/json", "_file": "../secret.json"}
+    assert read_response_body(content, har_dir) is None
+
+
+def test_har_origin_is_that_of_the_first_request(tmp_path: Path) -> None:
+    har_path = tmp_path / "trace.har"
+    har = {
+        "log": {
+            "entries": [
+                {"request": {"url": "data:text/plain,hi"}},
+                {"request": {"url": "https://shop.example.com:8443/login?next=/"}},
+                {"request": {"url": "https://cdn.example.net/app.js"}},
+            ]
+        }
+    }
+    har_path.write_text(json.dumps(har), encoding="utf-8")
+
+    assert har_origin(har_path) == "https://shop.example.com:8443"
+    assert har_origin(tmp_path / "missing.har") is None
+
+
+def test_has_response_body_whatever_its_type_or_size(tmp_path: Path) -> None:
+    _write_attach_har(tmp_path)
+
+    assert has_response_body({"text": ""}, tmp_path)
+    assert has_response_body({"mimeType": "image/png", "_file": "logo.png"}, tmp_path)
+    # `omit` mode, a body `filtered` mode dropped, and a missing attachment.
+    assert not has_response_body({"mimeType": "text/html", "size": 5120}, tmp_path)
+    assert not has_response_body({"mimeType": "text/html", "_file": "gone.html"}, tmp_path)
+    assert not has_response_body(None, tmp_path)
+
+
+def test_iter_har_entries_streams_entries(tmp_path: Path) -> None:
+    har_path = _write_attach_har(tmp_path)
+
+    entries = list(iter_har_entries(har_path))
+
+    assert entries == json.loads(har_path.read_text(encoding="utf-8"))["log"]["entries"]
+    assert list(iter_har_entries(tmp_path / "missing.har")) == []
+
+
+def test_iter_har_entries_stops_at_malformed_json(tmp_path: Path) -> None:
+    har_path = tmp_path / "trace.har"
+    har_path.write_text(
+        '{"log": {"entries": [{"request": {"url": "http://a/"}}, {"request": {"url": ',
+        encoding="utf-8",
+    )
+
+    assert list(iter_har_entries(har_path)) == [{"request": {"url": "http://a/"}}]
+
+
+def test_iter_har_entries_cuts_huge_strings(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(har, "MAX_STRING_BYTES", 64)
+    body = 'é"\\😀 {"a": "\\u00e9"} ' * 500
+    entries = [
+        {"request": {"url": "https://a.test/"}, "response": {"content": {"size": len(body), "text": body}}},
+        {"request": {"url": "https://a.test/next"}, "response": {"content": {"text": "short"}}},
+    ]
+    har_path = tmp_path / "trace.har"
+    har_path.write_text(json.dumps({"log": {"entries": entries}}), encoding="utf-8")
+
+    first, second = iter_har_entries(har_path)
+
+    text = first["response"]["content"]["text"]
+    assert body.startswith(text)
+    assert 0 < len(text) <= 2 * 64
+    assert first["response"]["content"]["size"] == len(body)
+    assert second == entries[1]
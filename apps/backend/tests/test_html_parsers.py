@@ -0,0 +1,86 @@
+"""
+Every HTML parser backend must yield the semantic model bs4's html.parser
+yields, starting with the golden fixtures.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from html_parsers import PARSER_BACKENDS, available_backends, parse_candidates, resolve_backend
+from semantic import _model_from_candidates
+
+GOLDEN_DIR = Path(__file__).parent / "golden" / "semantic"
+
+HTML = """
+<nav><a href="/">Home</a><a href="/empty"></a>
+  <a class=" promo  wide ">Sign<!-- hidden --> <b>up</b><script>track()</script><style>b{}</style></a></nav>
+<form id="login-form">
+  <label for="username">User <em>name</em></label>
+  <label for="username">Ignored</label>
+  <input id="username" name="username" type="text" />
+  <input id="password" name="password" type="password" placeholder="Password" />
+  <input name="q" class="search wide" aria-label="Search" />
+  <button id="login" type="submit">Log<span>in</span></button>
+  <button class="icon close" aria-label="Close"></button>
+</form>
+"""
+
+
+def _model(html: str, backend: str) -> dict:
+    return _model_from_candidates(parse_candidates(html, backend))
+
+
+@pytest.fixture(params=PARSER_BACKENDS)
+def backend(request) -> str:
+    if request.param not in available_backends():
+        pytest.skip(f"{request.param} is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("fixture_path", sorted(GOLDEN_DIR.glob("*.json")), ids=lambda p: p.stem)
+def test_golden_fixtures(backend: str, fixture_path: Path) -> None:
+    fixture = json.loads(fixture_path.read_text(encoding="utf-8"))
+    model = _model(fixture["html_snippet"], backend)
+
+    assert model == _model(fixture["html_snippet"], "html.parser")
+    elements = {e["selector"]: e for e in model["elements"]}
+    for expected in fixture.get("expected_elements", []):
+        element = elements[expected["selector"]]
+        assert element["role"] == expected["role"]
+        assert element["label"] == expected["label"]
+        low, high = expected["confidence_range"]
+        assert low <= element["confidence"] <= high
+    assert len(model["flows"]) >= fixture.get("expected_flow_count_min", 0)
+
+
+def test_text_classes_and_labels_match_html_parser(backend: str) -> None:
+    model = _model(HTML, backend)
+
+    assert model == _model(HTML, "html.parser")
+    by_selector = {e["selector"]: e["label"] for e in model["elements"]}
+    assert by_selector["a.promo.wide"] == "Signup"
+    assert by_selector["#username"] == "Username"
+    assert by_selector["#login"] == "Login"
+
+
+def test_empty_document(backend: str) -> None:
+    assert parse_candidates("  <!-- nothing -->  ", backend) == []
+
+
+def test_resolve_backend() -> None:
+    assert resolve_backend("auto") == available_backends()[0]
+    assert resolve_backend("html.parser") == "html.parser"
+    with pytest.raises(ValueError):
+        resolve_backend("html5lib")
+
+
+def test_labels_resolve_in_one_pass(backend: str) -> None:
+    html = (
+        '<input id="later" /><label for="later">After</label>'
+        '<label for="dup">First</label><input id="dup" /><label for="dup">Second</label>'
+        '<label for="">Blank</label><input id="" name="anon" />'
+    )
+    labels = {c.get("id") or c.get("name"): c.for_label for c in parse_candidates(html, backend)}
+
+    assert labels == {"later": "After", "dup": "First", "anon": ""}
@@ -12,9 +12,11 @@ from datetime import datetime, timezone
 from observability import (
     Phase,
     Status,
+    StepRecorder,
     StructuredLogger,
     TimelineEntry,
     get_logger,
+    rss_mb,
 )
 
 
@@ -332,6 +334,65 @@ class TestErrorHandling:
         assert entries[0]["valid"] == "json"
 
 
+class TestStepRecorder:
+    """Test timed sub-step entries."""
+    
+    def test_step_logs_duration_and_caller_details(self, temp_log_dir):
+        """A step is logged with its name, duration, RSS and caller details."""
+        logger = StructuredLogger("job_1", temp_log_dir)
+        steps = StepRecorder(logger, Phase.EXTRACTION, child_rss_mb=lambda: 123.44)
+        
+        with steps.step("dom") as span:
+            span["bytes_written"] = 2048
+        
+        [entry] = logger.read_timeline()
+        assert entry["phase"] == "extraction"
+        assert entry["status"] == "step"
+        assert entry["details"]["step"] == "dom"
+        assert entry["details"]["bytes_written"] == 2048
+        assert entry["details"]["duration_ms"] >= 0
+        assert entry["details"]["child_rss_mb"] == 123.4
+        assert "rss_mb" in entry["details"]
+        assert steps.timings == {"dom": entry["details"]["duration_ms"]}
+    
+    def test_rss_is_the_current_footprint(self):
+        """rss_mb follows this process's memory down as well as up."""
+        if not Path("/proc/self/statm").exists():
+            pytest.skip("needs /proc")
+        before = rss_mb()
+        ballast = b"\x01" * (64 * 1024 * 1024)
+        grown = rss_mb()
+        del ballast
+        assert grown - before >= 60
+        assert rss_mb() < grown
+    
+    def test_failed_step_is_logged_and_reraised(self, temp_log_dir):
+        """A step that raises is still logged, with the error type."""
+        logger = StructuredLogger("job_1", temp_log_dir)
+        steps = StepRecorder(logger, Phase.EXTRACTION)
+        
+        with pytest.raises(TimeoutError):
+            with steps.step("navigate"):
+                raise TimeoutError("slow")
+        
+        [entry] = logger.read_timeline()
+        assert entry["details"]["error_type"] == "TimeoutError"
+        assert "child_rss_mb" not in entry["details"]
+    
+    def test_steps_do_not_change_phase_status(self, temp_log_dir):
+        """Step entries between started and completed leave the summary intact."""
+        logger = StructuredLogger("job_1", temp_log_dir)
+        steps = StepRecorder(logger, Phase.EXTRACTION)
+        
+        logger.log_extraction_started()
+        with steps.step("navigate"):
+            pass
+        
+        summary = logger.get_timeline_summary()
+        assert summary["phases"]["extraction"]["completed"] is None
+        assert summary["phases"]["extraction"]["failed"] is False
+
+
 class TestTimelineIntegration:
     """Integration tests for full timeline workflow."""
     
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+from run_events import (
+    RunEventPublisher,
+    StepResults,
+    decode_entry,
+    sse_message,
+    sse_stream,
+    stream_key,
+)
+
+
+class _FakeStreamClient:
+    """Answers xread from a scripted list of responses (None means a timeout)."""
+
+    def __init__(self, responses, exists=True) -> None:
+        self.responses = list(responses)
+        self.exists_result = exists
+        self.reads = []
+
+    async def xread(self, streams, count, block):
+        self.reads.append(dict(streams))
+        return self.responses.pop(0) if self.responses else None
+
+    async def exists(self, key):
+        return self.exists_result
+
+
+def _entry(entry_id: str, event_type: str, data: dict):
+    return (entry_id.encode(), {b"type": event_type.encode(), b"data": json.dumps(data).encode()})
+
+
+def _collect(stream) -> list[str]:
+    async def run():
+        return [message async for message in stream]
+
+    return asyncio.run(run())
+
+
+def test_sse_message_and_entry_decoding() -> None:
+    assert sse_message("1-0", "step", {"step": 1}) == 'id: 1-0\nevent: step\ndata: {"step": 1}\n\n'
+    assert decode_entry(_entry("1-0", "step", {"step": 1})[1]) == ("step", {"step": 1})
+
+
+def test_step_results_publish_on_add() -> None:
+    published = []
+    results = StepResults(published.append)
+
+    results.add({"step": 1, "status": "passed"})
+
+    assert len(results) == 1
+    assert results.to_list() == [{"step": 1, "status": "passed"}]
+    assert published == [{"step": 1, "status": "passed"}]
+
+
+def test_stream_relays_until_finished_and_resumes_from_last_id() -> None:
+    key = stream_key("run_1").encode()
+    client = _FakeStreamClient(
+        [
+            [(key, [_entry("1-0", "started", {"steps": 2}), _entry("2-0", "step", {"step": 1})])],
+            None,
+            [(key, [_entry("3-0", "finished", {"status": "passed"}), _entry("4-0", "step", {})])],
+        ]
+    )
+
+    messages = _collect(sse_stream(client, "run_1", last_id="0-5"))
+
+    assert [m.split("\n")[1] for m in messages if m.startswith("id:")] == [
+        "event: started",
+        "event: step",
+        "event: finished",
+    ]
+    assert ": keepalive\n\n" in messages
+    assert [read[stream_key("run_1")] for read in client.reads] == ["0-5", "2-0", "2-0"]
+
+
+def test_stream_ends_when_the_run_stream_expired() -> None:
+    assert _collect(sse_stream(_FakeStreamClient([], exists=False), "run_1")) == []
+
+
+def test_publishing_never_raises() -> None:
+    # Nothing listens on port 1; the event is dropped.
+    publisher = RunEventPublisher("redis://127.0.0.1:1/0", ttl_seconds=60)
+    publisher.publish("run_1", "step", {"step": 1})
+    publisher.publish(None, "step", {"step": 1})
+    assert not RunEventPublisher("redis://127.0.0.1:1/0", ttl_seconds=0).enabled
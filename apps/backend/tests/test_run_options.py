@@ -0,0 +1,59 @@
+import pytest
+
+from run_options import RunDeadline, RunOptions, get_run_timeouts
+
+
+def test_screenshot_policies_pick_passing_steps() -> None:
+    def captured(options: RunOptions, total: int = 5) -> list[int]:
+        return [step for step in range(1, total + 1) if options.screenshot_after(step, total)]
+
+    assert captured(RunOptions()) == [1, 2, 3, 4, 5]
+    assert captured(RunOptions(screenshot_policy="every-n", screenshot_every=2)) == [2, 4]
+    assert captured(RunOptions(screenshot_policy="final-only")) == [5]
+    assert captured(RunOptions(screenshot_policy="on-failure")) == []
+
+
+def test_round_trips_through_enqueued_kwargs_and_ignores_unknown_keys() -> None:
+    options = RunOptions(screenshot_policy="final-only", screenshot_mode="viewport")
+
+    assert RunOptions.from_dict({**options.to_dict(), "future": 1}) == options
+    assert RunOptions.from_dict(None) == RunOptions()
+    assert not options.full_page
+
+
+def test_rejects_unknown_values() -> None:
+    with pytest.raises(ValueError):
+        RunOptions(screenshot_policy="sometimes")
+    with pytest.raises(ValueError):
+        RunOptions(screenshot_mode="element")
+    with pytest.raises(ValueError):
+        RunOptions(screenshot_policy="every-n", screenshot_every=0)
+    with pytest.raises(ValueError):
+        RunOptions(network="proxy")
+    with pytest.raises(ValueError):
+        RunOptions(network="har", har_not_found="retry")
+
+
+def test_profile_fills_only_unset_timeouts() -> None:
+    fast = RunOptions(step_timeout_ms=1234).for_profile("fast")
+
+    assert fast.step_timeout_ms == 1234
+    assert fast.run_timeout_seconds == get_run_timeouts("fast").run_seconds
+    assert fast.navigation_timeout_ms == get_run_timeouts("fast").navigation_ms
+    assert RunOptions().for_profile("unknown") == RunOptions().for_profile(None)
+    assert RunOptions.from_dict(fast.to_dict()) == fast
+    with pytest.raises(ValueError):
+        RunOptions(run_timeout_seconds=0)
+
+
+def test_deadline_caps_step_timeouts_to_the_remaining_budget() -> None:
+    now = [100.0]
+    deadline = RunDeadline(10, clock=lambda: now[0])
+
+    assert deadline.cap(5_000) == 5_000
+    now[0] = 108.0
+    assert deadline.cap(5_000) == 2_000
+    assert not deadline.expired()
+    now[0] = 111.0
+    assert deadline.expired()
+    assert deadline.cap(5_000) == 1.0
@@ -0,0 +1,100 @@
+import json
+import os
+from pathlib import Path
+
+from run_stats import iter_run_reports, navigation_timing, percentile, run_stats, summarize
+
+
+def _report(test_id: str, status: str, wall_s: int, steps: list[dict]) -> dict:
+    return {
+        "testId": test_id,
+        "status": status,
+        "steps": steps,
+        "startedAt": "2024-01-01T00:00:00+00:00",
+        "finishedAt": f"2024-01-01T00:00:{wall_s:02d}+00:00",
+    }
+
+
+def test_percentile_interpolates() -> None:
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.5
+    assert percentile(values, 99) == 99.01
+    assert percentile([7.0], 95) == 7.0
+    assert summarize([]) == {"count": 0}
+
+
+def test_navigation_timing_skips_unreached_phases() -> None:
+    entry = {
+        "startTime": 0,
+        "requestStart": 10.0,
+        "responseStart": 60.5,
+        "responseEnd": 80.5,
+        "domContentLoadedEventEnd": 120.0,
+        "loadEventEnd": 0,
+        "transferSize": 2048,
+    }
+
+    assert navigation_timing(entry) == {
+        "ttfbMs": 50.5,
+        "responseMs": 20.0,
+        "domContentLoadedMs": 120.0,
+        "transferBytes": 2048,
+    }
+    assert navigation_timing(None) is None
+
+
+def test_run_stats_per_test_and_step() -> None:
+    reports = [
+        _report(
+            "test_a",
+            "passed",
+            seconds,
+            [
+                {"step": 1, "status": "passed", "action": "goto", "durationMs": seconds * 100.0,
+                 "navigation": {"ttfbMs": 40.0}},
+                {"step": 2, "status": "passed", "action": "click", "durationMs": 10.0},
+            ],
+        )
+        for seconds in (2, 4, 6)
+    ]
+    reports.append(
+        _report("test_a", "failed", 9, [{"step": 1, "status": "failed", "action": "goto", "durationMs": 9000.0}])
+    )
+
+    [stats] = run_stats(reports)["tests"]
+
+    assert stats["testId"] == "test_a"
+    assert (stats["runs"], stats["failed"]) == (4, 1)
+    assert stats["durationMs"]["count"] == 3
+    assert stats["durationMs"]["p50"] == 4000.0
+    goto, click = stats["steps"]
+    assert goto["action"] == "goto"
+    assert goto["durationMs"]["p50"] == 400.0
+    assert goto["durationMs"]["max"] == 600.0
+    assert goto["navigation"]["ttfbMs"]["p95"] == 40.0
+    assert "navigation" not in click
+
+
+def test_run_stats_limit_and_filter() -> None:
+    reports = [_report("test_a", "passed", s, []) for s in (1, 2, 3)]
+    reports.append(_report("test_b", "passed", 5, []))
+
+    [stats] = run_stats(reports, test_id="test_a", limit=2)["tests"]
+
+    assert stats["runs"] == 2
+    assert stats["durationMs"]["max"] == 2000.0
+
+
+def test_iter_run_reports_newest_first(tmp_path: Path) -> None:
+    job_dir = tmp_path / "job_a"
+    job_dir.mkdir()
+    for index, name in enumerate(("old", "new")):
+        path = job_dir / f"test_report_{name}.json"
+        path.write_text(json.dumps({"runId": name}), encoding="utf-8")
+        os.utime(path, (1_000 + index, 1_000 + index))
+    (job_dir / "test_report_broken.json").write_text("{", encoding="utf-8")
+    os.utime(job_dir / "test_report_broken.json", (500, 500))
+
+    assert [r["runId"] for r in iter_run_reports(tmp_path)] == ["new", "old"]
+    assert list(iter_run_reports(tmp_path, "job_b")) == []
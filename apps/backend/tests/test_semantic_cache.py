@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import semantic
+import semantic_cache
+from semantic_cache import SemanticModelCache, cache_key
+from storage import LocalFSStorageAdapter
+
+HTML = """
+<form>
+  <input id="username" placeholder="Username" />
+  <input id="password" type="password" placeholder="Password" />
+  <button id="login">Login</button>
+</form>
+"""
+
+
+@pytest.fixture
+def storage(tmp_path: Path, monkeypatch) -> LocalFSStorageAdapter:
+    storage = LocalFSStorageAdapter(str(tmp_path))
+    monkeypatch.setattr(semantic.settings, "storage_root", str(tmp_path))
+    monkeypatch.setattr(semantic, "storage_adapter", storage)
+    monkeypatch.setattr(semantic, "semantic_cache", SemanticModelCache(storage, max_entries=8))
+    return storage
+
+
+def test_jobs_with_the_same_dom_share_the_model(storage: LocalFSStorageAdapter, monkeypatch) -> None:
+    storage.save_json("job_1", "dom.json", {"outer_html": HTML})
+    storage.save_json("job_2", "dom.json", {"outer_html": HTML})
+    first = semantic.build_semantic_model("job_1")
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError("cache hit must not parse the DOM")
+
+    monkeypatch.setattr(semantic, "parse_candidates", no_parsing)
+    second = semantic.build_semantic_model("job_2")
+
+    assert second == first
+    assert [f["id"] for f in second["flows"]] == ["flow_login"]
+    saved = json.loads((storage.root / "job_2" / "semantic_model.json").read_text(encoding="utf-8"))
+    assert saved == first
+
+
+def test_rule_changes_invalidate_entries(monkeypatch) -> None:
+    key = cache_key("lxml", b"<a>x</a>")
+    assert cache_key("html.parser", b"<a>x</a>") != key
+
+    monkeypatch.setattr(semantic_cache, "rules_version", lambda: "edited classifier")
+    assert cache_key("lxml", b"<a>x</a>") != key
+
+
+def test_memory_tier_is_lru_backed_by_disk(tmp_path: Path) -> None:
+    storage = LocalFSStorageAdapter(str(tmp_path))
+    cache = SemanticModelCache(storage, max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(name, {"elements": [], "flows": [], "name": name})
+
+    assert list(cache._memory) == ["b", "c"]
+    # Evicted from memory, still on disk (and promoted back).
+    assert cache.get("a")["name"] == "a"
+    assert list(cache._memory) == ["c", "a"]
+    assert SemanticModelCache(storage, max_entries=2).get("b")["name"] == "b"
+
+
+def test_cached_models_are_copies(tmp_path: Path) -> None:
+    cache = SemanticModelCache(LocalFSStorageAdapter(str(tmp_path)), max_entries=2)
+    cache.put("k", {"elements": [], "flows": []})
+    cache.get("k")["elements"].append("mutated")
+
+    assert cache.get("k") == {"elements": [], "flows": []}
+
+
+def test_disabled_cache_stores_nothing(tmp_path: Path) -> None:
+    cache = SemanticModelCache(LocalFSStorageAdapter(str(tmp_path)), max_entries=2, enabled=False)
+    cache.put("k", {"elements": [], "flows": []})
+
+    assert cache.get("k") is None
+    assert not cache.root.exists()
@@ -0,0 +1,48 @@
+"""
+The in-browser candidate list (extractor/semantic_capture.py) must yield the
+same semantic model as parsing dom.json with BeautifulSoup.
+"""
+from bs4 import BeautifulSoup
+
+from html_parsers import candidates_from_soup
+from semantic import _candidates_from_browser, _model_from_candidates
+
+HTML = """
+<nav><a href="/">Home</a><a href="/empty"></a></nav>
+<form id="login-form">
+  <label for="username">Username</label>
+  <input id="username" name="username" type="text" />
+  <input id="password" name="password" type="password" placeholder="Password" />
+  <input name="q" class="search wide" aria-label="Search" />
+  <button id="login" type="submit">Log<span>in</span></button>
+  <button class="icon close" aria-label="Close"></button>
+</form>
+"""
+
+# What COLLECT_CANDIDATES_SCRIPT returns for HTML above.
+BROWSER_CANDIDATES = [
+    {"tag": "a", "text": "Home"},
+    {"tag": "a"},
+    {"tag": "button", "id": "login", "text": "Login"},
+    {"tag": "button", "classes": ["icon", "close"], "ariaLabel": "Close"},
+    {"tag": "input", "id": "username", "name": "username", "label": "Username"},
+    {"tag": "input", "id": "password", "name": "password", "placeholder": "Password"},
+    {"tag": "input", "name": "q", "classes": ["search", "wide"], "ariaLabel": "Search"},
+]
+
+
+def test_browser_candidates_match_soup_model() -> None:
+    soup_model = _model_from_candidates(candidates_from_soup(BeautifulSoup(HTML, "html.parser")))
+    browser_model = _model_from_candidates(_candidates_from_browser(BROWSER_CANDIDATES))
+
+    assert browser_model == soup_model
+
+
+def test_browser_candidates_build_login_flow() -> None:
+    model = _model_from_candidates(_candidates_from_browser(BROWSER_CANDIDATES))
+
+    roles = {e["selector"]: e["role"] for e in model["elements"]}
+    assert roles["#username"] == "username_input"
+    assert roles["#password"] == "password_input"
+    assert roles["#login"] == "login_button"
+    assert [f["id"] for f in model["flows"]] == ["flow_login"]
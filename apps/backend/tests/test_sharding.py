@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+
+from batch_runs import batch_plan, merge_shard_reports, plan_batch
+from sharding import DEFAULT_RUN_MS, estimate_durations, plan_shards, report_duration_ms
+
+
+def _write_report(job_dir: Path, run_id: str, test_id: str, step_ms: list[int]) -> None:
+    job_dir.mkdir(parents=True, exist_ok=True)
+    report = {
+        "runId": run_id,
+        "testId": test_id,
+        "steps": [{"step": i, "status": "passed", "durationMs": ms} for i, ms in enumerate(step_ms, 1)],
+        "startedAt": "2024-01-01T00:00:00+00:00",
+        "finishedAt": "2024-01-01T00:01:00+00:00",
+    }
+    (job_dir / f"test_report_{run_id}.json").write_text(json.dumps(report), encoding="utf-8")
+
+
+def test_report_duration_prefers_step_durations() -> None:
+    report = {
+        "steps": [{"durationMs": 100}, {"durationMs": 250}],
+        "startedAt": "2024-01-01T00:00:00+00:00",
+        "finishedAt": "2024-01-01T00:00:02+00:00",
+    }
+    assert report_duration_ms(report) == 350
+
+    report["steps"] = [{"step": 1}]  # written before steps were timed
+    assert report_duration_ms(report) == 2000
+    assert report_duration_ms({}) is None
+
+
+def test_estimates_use_history_and_fall_back_to_median(tmp_path: Path) -> None:
+    _write_report(tmp_path / "job_a", "r1", "test_a", [1000, 1000])
+    _write_report(tmp_path / "job_a", "r2", "test_a", [3000])
+    _write_report(tmp_path / "job_a", "r3", "test_a", [5000])
+    _write_report(tmp_path / "job_b", "r1", "test_b", [8000])
+
+    durations = estimate_durations(
+        tmp_path,
+        [("job_a", "test_a"), ("job_b", "test_b"), ("job_c", "test_c")],
+    )
+
+    # test_a: median of 2000/3000/5000; test_c has no history.
+    assert durations == [3000, 8000, 5500]
+
+
+def test_estimates_default_without_any_history(tmp_path: Path) -> None:
+    assert estimate_durations(tmp_path, [("job_a", "test_a")]) == [DEFAULT_RUN_MS]
+
+
+def test_plan_shards_balances_makespan() -> None:
+    durations = [7, 5, 4, 4, 3, 3, 2]
+    shards = plan_shards(list("abcdefg"), durations, 3)
+
+    # 28 units over 3 shards cannot finish before 10.
+    assert max(shard.estimated_ms for shard in shards) == 10
+    assert len(shards) == 3
+    assert sorted(item for shard in shards for item in shard.items) == list("abcdefg")
+
+
+def test_plan_shards_never_returns_empty_shards() -> None:
+    shards = plan_shards(["a", "b"], [10, 20], 5)
+
+    assert [shard.items for shard in shards] == [["b"], ["a"]]
+    assert plan_shards([], [], 3) == []
+
+
+def test_merge_shard_reports_waits_for_every_shard() -> None:
+    runs = plan_batch("batch_1", [("job_a", "test_a"), ("job_b", "test_b")])
+    plan = batch_plan("batch_1", plan_shards(runs, [20, 10], 2))
+    shard_report = {
+        "status": "passed",
+        "counts": {"passed": 1},
+        "runs": [{"runId": "batch_1_1", "status": "passed"}],
+        "startedAt": "2024-01-01T00:00:00+00:00",
+        "finishedAt": "2024-01-01T00:00:20+00:00",
+    }
+
+    partial = merge_shard_reports(plan, {1: shard_report})
+    assert partial["status"] == "running"
+    assert partial["finishedAt"] is None
+    assert [shard["status"] for shard in partial["shards"]] == ["passed", "pending"]
+
+    second = dict(
+        shard_report,
+        status="failed",
+        counts={"failed": 1},
+        runs=[{"runId": "batch_1_2", "status": "failed"}],
+        finishedAt="2024-01-01T00:00:10+00:00",
+    )
+    merged = merge_shard_reports(plan, {1: shard_report, 2: second})
+    assert merged["status"] == "failed"
+    assert merged["counts"] == {"passed": 1, "failed": 1}
+    assert merged["total"] == 2
+    assert merged["finishedAt"] == "2024-01-01T00:00:20+00:00"
@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+from storage import ArtifactRecord, LocalFSStorageAdapter
+
+
+def test_manifest_round_trips_encoding_and_details(tmp_path: Path) -> None:
+    adapter = LocalFSStorageAdapter(str(tmp_path))
+    record = ArtifactRecord(
+        name="screenshot.webp",
+        type="screenshot",
+        path="job_1/screenshot.webp",
+        encoding="webp",
+        details={"mode": "viewport", "quality": 70},
+    )
+
+    adapter.save_manifest("job_1", [record])
+
+    assert adapter.load_manifest("job_1") == [record]
+
+
+def test_manifest_written_before_encoding_field_still_loads(tmp_path: Path) -> None:
+    adapter = LocalFSStorageAdapter(str(tmp_path))
+    legacy = [{"name": "screenshot.png", "type": "screenshot", "path": "job_1/screenshot.png"}]
+    (adapter.job_dir("job_1") / "manifest.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    [record] = adapter.load_manifest("job_1")
+
+    assert record.encoding is None
+    assert record.details == {}
+
+
+def test_link_artifact_shares_file_until_either_job_rewrites_it(tmp_path: Path) -> None:
+    adapter = LocalFSStorageAdapter(str(tmp_path))
+    adapter.save_json("job_1", "dom.json", {"outer_html": "<p>v1</p>"})
+
+    assert adapter.link_artifact("job_1", "job_2", "dom.json") == "job_2/dom.json"
+    assert adapter.link_artifact("job_1", "job_2", "missing.json") is None
+
+    adapter.save_json("job_2", "dom.json", {"outer_html": "<p>v2</p>"})
+
+    assert json.loads((tmp_path / "job_1" / "dom.json").read_text())["outer_html"] == "<p>v1</p>"
+    assert json.loads((tmp_path / "job_2" / "dom.json").read_text())["outer_html"] == "<p>v2</p>"
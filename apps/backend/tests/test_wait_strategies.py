@@ -0,0 +1,52 @@
+"""
+`dom_stable` gives up at the profile's deadline, even when the document
+itself is still loading then, and extraction goes on with what is there.
+"""
+import asyncio
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from extraction_profiles import ExtractionProfile
+from extractor.wait_strategies import navigate, navigate_async
+
+PROFILE = ExtractionProfile(name="slow", wait_strategy="dom_stable", wait_deadline_ms=50)
+
+
+class _SlowPage:
+    """A page whose document never arrives: `goto` times out as Playwright's does."""
+
+    def __init__(self) -> None:
+        self.timeouts = []
+
+    def goto(self, url: str, wait_until: str, timeout: float) -> None:
+        self.timeouts.append(timeout)
+        time.sleep(timeout / 1000)
+        raise PlaywrightTimeoutError(f'Timeout {timeout}ms exceeded navigating to "{url}"')
+
+    def evaluate(self, *args):
+        raise AssertionError("nothing to wait for on a page that did not load")
+
+
+class _AsyncSlowPage(_SlowPage):
+    async def goto(self, url: str, wait_until: str, timeout: float) -> None:
+        await asyncio.sleep(timeout / 1000)
+        super().goto(url, wait_until, 0)
+
+
+def test_dom_stable_reports_the_deadline_when_the_page_does_not_load() -> None:
+    page = _SlowPage()
+
+    wait = navigate(page, "http://slow.test/", PROFILE)
+
+    assert page.timeouts == [50]
+    assert wait["strategy"] == "dom_stable"
+    assert wait["outcome"] == "deadline"
+    assert wait["durationMs"] >= 50
+
+
+def test_async_dom_stable_reports_the_deadline_when_the_page_does_not_load() -> None:
+    wait = asyncio.run(navigate_async(_AsyncSlowPage(), "http://slow.test/", PROFILE))
+
+    assert wait["outcome"] == "deadline"
+    assert wait["durationMs"] >= 50
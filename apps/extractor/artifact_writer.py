@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, List
+
+from backend.storage import LocalFSStorageAdapter, storage_adapter
+
+
+class BackgroundArtifactWriter:
+    """
+    Storage-adapter look-alike whose writes run on a worker thread.
+
+    `save_bytes` and `save_json` queue the write and return the artifact's
+    relative path straight away, so page captures keep going while the disk
+    (and JSON serialization of large DOMs) catches up. Call `flush()` before
+    anything reads the files back.
+    """
+
+    def __init__(self, storage: LocalFSStorageAdapter = storage_adapter) -> None:
+        self._storage = storage
+        self._pending: List[asyncio.Future] = []
+        # Bytes per relative path, filled in as writes complete.
+        self.sizes: Dict[str, int] = {}
+
+    def _submit(self, write: Callable[[str, str, Any], str], job_id: str, filename: str, payload: Any) -> str:
+        loop = asyncio.get_running_loop()
+        self._pending.append(
+            loop.run_in_executor(None, self._write, write, job_id, filename, payload)
+        )
+        # Same relative path the storage adapter returns.
+        return f"{job_id}/{filename}"
+
+    def _write(self, write: Callable[[str, str, Any], str], job_id: str, filename: str, payload: Any) -> str:
+        path = write(job_id, filename, payload)
+        self.sizes[path] = (self._storage.root / path).stat().st_size
+        return path
+
+    def save_bytes(self, job_id: str, filename: str, data: bytes) -> str:
+        return self._submit(self._storage.save_bytes, job_id, filename, data)
+
+    def save_json(self, job_id: str, filename: str, obj: object) -> str:
+        return self._submit(self._storage.save_json, job_id, filename, obj)
+
+    async def flush(self) -> None:
+        """Wait for every queued write; re-raises the first write error."""
+        pending, self._pending = self._pending, []
+        await asyncio.gather(*pending)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, List, TypeVar
+
+from playwright.async_api import Route
+from redis import Redis
+from rq.job import Job as RQJob
+
+from backend.config import settings
+from backend.extraction_cache import extraction_cache, probe_async
+from backend.observability import Phase, StepRecorder
+from backend.extraction_profiles import ExtractionProfile, get_extraction_profile
+from backend.storage import ArtifactRecord
+from extractor.artifact_writer import BackgroundArtifactWriter
+from extractor.browser_pool import AsyncBrowserPool
+from extractor.rq_consumer import AsyncQueueConsumer
+from extractor.screenshots import capture_screenshot_async
+from extractor.semantic_capture import capture_semantic_candidates_async
+from extractor.wait_strategies import navigate_async
+from extractor.worker import (
+    _Capture,
+    _bytes_written,
+    _claim_job,
+    _complete_job,
+    _extraction_completed_details,
+    _extraction_steps,
+    _finalize_har,
+    _har_context_options,
+    _timeline,
+)
+
+T = TypeVar("T")
+
+
+async def _timed(steps: StepRecorder, name: str, awaitable: Awaitable[T]) -> T:
+    with steps.step(name):
+        return await awaitable
+
+
+class AsyncExtractionEngine:
+    """
+    Runs several extraction jobs at once in a single worker process.
+
+    Jobs share one pooled browser and each gets its own BrowserContext, so a
+    job waiting on the network no longer blocks the others. `concurrency`
+    caps the number of jobs (and therefore open contexts) in flight, and every
+    job is cancelled once it exceeds `job_timeout_seconds`.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        job_timeout_seconds: float,
+        pool: AsyncBrowserPool | None = None,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.job_timeout_seconds = job_timeout_seconds
+        self.pool = pool or AsyncBrowserPool(
+            max_jobs=settings.extractor_browser_max_jobs,
+            max_rss_mb=settings.extractor_browser_max_rss_mb,
+        )
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    async def capture_artifacts(
+        self,
+        job_id: str,
+        target_url: str,
+        profile: ExtractionProfile | None = None,
+        steps: StepRecorder | None = None,
+    ) -> List[ArtifactRecord]:
+        """Async twin of extractor.worker._capture_artifacts."""
+        profile = profile or get_extraction_profile(None)
+        steps = steps or _extraction_steps(_timeline(job_id))
+        capture = _Capture(job_id, target_url, profile, steps)
+        writer = BackgroundArtifactWriter()
+        if settings.extraction_cache_enabled:
+            with steps.step("cacheProbe") as span:
+                entry = await asyncio.to_thread(extraction_cache.lookup, target_url, profile.name)
+                probed = await probe_async(
+                    target_url,
+                    entry,
+                    settings.extraction_cache_probe_timeout_seconds,
+                )
+                span["status"] = capture.probed_entry(entry, probed)
+            if capture.unchanged():
+                return await asyncio.to_thread(capture.reuse)
+
+        async def _route(route: Route) -> None:
+            request = route.request
+            if capture.allows(request.resource_type, request.url):
+                await route.continue_()
+            else:
+                await route.abort("blockedbyclient")
+
+        context_started = time.perf_counter()
+        async with self.pool.new_context(**_har_context_options(job_id, profile)) as context:
+            if profile.blocks_requests:
+                await context.route("**/*", _route)
+            page = await context.new_page()
+            steps.record("browserContext", context_started)
+
+            with steps.step("navigate") as span:
+                wait = await navigate_async(page, target_url, profile)
+                span["outcome"] = wait["outcome"]
+
+            # The DOM comes first: its hash decides what the cache can supply.
+            with steps.step("dom"):
+                outer_html = await page.evaluate("() => document.documentElement.outerHTML")
+                capture.dom(outer_html, writer.save_json)
+
+            # The remaining captures run concurrently against the loaded page,
+            # and their artifacts are written by the background writer meanwhile.
+            async def _reused(name: str) -> List[ArtifactRecord]:
+                return await asyncio.to_thread(capture.reused, name)
+
+            async def _semantic_candidates() -> List[ArtifactRecord]:
+                reused = await _reused("semantic_candidates.json")
+                return reused or [await capture_semantic_candidates_async(page, job_id, writer)]
+
+            async def _screenshot() -> List[ArtifactRecord]:
+                screenshot_record = await capture_screenshot_async(page, job_id, profile, writer)
+                return [screenshot_record] if screenshot_record is not None else []
+
+            async def _accessibility() -> List[ArtifactRecord]:
+                reused = await _reused("accessibility.json")
+                if reused:
+                    return reused
+                try:
+                    accessibility_tree = await page.accessibility.snapshot()
+                except Exception:
+                    accessibility_tree = None
+                return capture.accessibility(accessibility_tree, writer.save_json)
+
+            captures = []
+            if profile.semantic_source == "browser":
+                captures.append(_timed(steps, "semanticCandidates", _semantic_candidates()))
+            captures.append(_timed(steps, "screenshot", _screenshot()))
+            captures.append(_timed(steps, "accessibility", _accessibility()))
+
+            # gather() keeps argument order, so the manifest order matches the sync path.
+            for captured in await _timed(steps, "capturesTotal", asyncio.gather(*captures)):
+                capture.records.extend(captured)
+
+            har_record = capture.har()
+            har_started = time.perf_counter()
+
+        har = await asyncio.to_thread(_finalize_har, job_id, profile)
+        steps.record("harFlush", har_started, bytes_written=_bytes_written([har_record]))
+        # Captures only queue their writes, so bytes are reported here.
+        with steps.step("artifactWrites") as span:
+            await writer.flush()
+            span["bytes_written"] = sum(writer.sizes.values())
+            span["files"] = {path.rsplit("/", 1)[-1]: size for path, size in writer.sizes.items()}
+        return await asyncio.to_thread(capture.finish, wait, har)
+
+    async def process_job(self, job_id: str) -> str:
+        """
+        Extract one job once a concurrency slot is free.
+
+        Returns "done", "missing" or "timeout". A timed-out job keeps its
+        in-progress status, like a sync job whose extraction raised.
+        """
+        async with self._slots:
+            claimed = await asyncio.to_thread(_claim_job, job_id)
+            if claimed is None:
+                return "missing"
+
+            timeline = _timeline(job_id)
+            profile = get_extraction_profile(claimed.test_profile)
+            timeline.log_extraction_started({"target_url": claimed.target_url, "profile": profile.name})
+            started = time.perf_counter()
+            timeout = self.job_timeout_seconds if self.job_timeout_seconds > 0 else None
+            try:
+                records = await asyncio.wait_for(
+                    self.capture_artifacts(
+                        job_id,
+                        claimed.target_url,
+                        profile,
+                        _extraction_steps(timeline),
+                    ),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                timeline.log_error(
+                    Phase.EXTRACTION,
+                    f"Extraction exceeded {self.job_timeout_seconds}s",
+                    "TimeoutError",
+                )
+                return "timeout"
+            except Exception as exc:
+                timeline.log_error(Phase.EXTRACTION, str(exc), type(exc).__name__)
+                raise
+
+            timeline.log_extraction_completed(_extraction_completed_details(records, started))
+            await asyncio.to_thread(_complete_job, job_id)
+            return "done"
+
+    async def run(self, job_ids: List[str]) -> Dict[str, str]:
+        outcomes = await asyncio.gather(
+            *(self.process_job(job_id) for job_id in job_ids),
+            return_exceptions=True,
+        )
+        return {
+            job_id: outcome if isinstance(outcome, str) else f"error: {outcome}"
+            for job_id, outcome in zip(job_ids, outcomes)
+        }
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+def _default_engine() -> AsyncExtractionEngine:
+    return AsyncExtractionEngine(
+        concurrency=settings.extractor_concurrency,
+        job_timeout_seconds=settings.extractor_job_timeout_seconds,
+    )
+
+
+async def _run_batch(job_ids: List[str]) -> Dict[str, str]:
+    engine = _default_engine()
+    try:
+        return await engine.run(job_ids)
+    finally:
+        await engine.close()
+
+
+def process_jobs(job_ids: List[str]) -> Dict[str, str]:
+    """
+    RQ task entry point for a batch of extraction jobs.
+    Returns the outcome per job id.
+    """
+    return asyncio.run(_run_batch(job_ids))
+
+
+async def _handle_rq_job(engine: AsyncExtractionEngine, rq_job: RQJob) -> Any:
+    if rq_job.func_name == "extractor.worker.process_job":
+        outcome = await engine.process_job(rq_job.kwargs["job_id"])
+        if outcome == "timeout":
+            raise TimeoutError(f"Extraction exceeded {engine.job_timeout_seconds}s")
+        return outcome
+    if rq_job.func_name == "extractor.async_worker.process_jobs":
+        # Within this engine's slots and browser, not a second engine's.
+        return await engine.run(rq_job.kwargs["job_ids"])
+    # Anything else on the queue runs as a plain RQ job in a thread.
+    return await asyncio.to_thread(rq_job.perform)
+
+
+async def serve(queue_name: str = "jobs", poll_seconds: int = 5) -> None:
+    """
+    Consume the extraction queue continuously, keeping up to
+    `settings.extractor_concurrency` jobs in flight.
+    """
+    engine = _default_engine()
+    consumer = AsyncQueueConsumer(
+        queue_name,
+        Redis.from_url(settings.redis_url),
+        lambda rq_job: _handle_rq_job(engine, rq_job),
+        engine.concurrency,
+        poll_seconds,
+    )
+    try:
+        await consumer.serve()
+    finally:
+        await engine.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
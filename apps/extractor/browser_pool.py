@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import os
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from playwright.async_api import Browser as AsyncBrowser
+from playwright.async_api import BrowserContext as AsyncBrowserContext
+from playwright.async_api import Playwright as AsyncPlaywright
+from playwright.async_api import async_playwright
+from playwright.sync_api import Browser, BrowserContext, Error, Playwright, sync_playwright
+
+from backend.config import settings
+
+
+def _child_pids(pid: int) -> List[int]:
+    children_file = Path(f"/proc/{pid}/task/{pid}/children")
+    try:
+        return [int(child) for child in children_file.read_text().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def process_tree_rss_mb(root_pid: int | None = None, include_root: bool = False) -> float:
+    """
+    Resident memory of every descendant of `root_pid` (default: this process).
+
+    The Playwright driver and all Chromium processes are children of the worker,
+    so this is the browser's footprint. Reads /proc and returns 0.0 on platforms
+    without it.
+    """
+    root_pid = root_pid or os.getpid()
+    total_kb = _rss_kb(root_pid) if include_root else 0
+    stack = _child_pids(root_pid)
+    while stack:
+        pid = stack.pop()
+        total_kb += _rss_kb(pid)
+        stack.extend(_child_pids(pid))
+    return total_kb / 1024
+
+
+class _RecyclePolicy:
+    """Shared recycling rules for the sync and async pools."""
+
+    def __init__(self, max_jobs: int, max_rss_mb: int) -> None:
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self._jobs_served = 0
+
+    def _needs_recycle(self) -> bool:
+        if self.max_jobs > 0 and self._jobs_served >= self.max_jobs:
+            return True
+        if self.max_rss_mb > 0 and process_tree_rss_mb() > self.max_rss_mb:
+            return True
+        return False
+
+
+class BrowserPool(_RecyclePolicy):
+    """
+    Long-lived Chromium shared by all jobs handled in this process.
+
+    Each job gets a fresh BrowserContext (its own cookies, storage, cache and
+    HAR recorder), so jobs stay isolated while the browser launch cost is paid
+    once. The browser is recycled after `max_jobs` contexts or when the process
+    tree grows past `max_rss_mb`, and relaunched if it crashed or disconnected.
+
+    The pool only helps when the worker process outlives a single job, so the
+    extractor and the test runner (which imports this pool) run under RQ's
+    non-forking SimpleWorker.
+    """
+
+    def __init__(self, max_jobs: int, max_rss_mb: int) -> None:
+        super().__init__(max_jobs, max_rss_mb)
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+
+    def _launch(self) -> Browser:
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=True)
+        self._jobs_served = 0
+        return self._browser
+
+    def _shutdown_browser(self) -> None:
+        browser, self._browser = self._browser, None
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Error:
+            # Already gone (crashed or disconnected); nothing left to release.
+            pass
+
+    def acquire(self) -> Browser:
+        """Return a healthy browser, relaunching or recycling it as needed."""
+        if self._browser is not None and (
+            not self._browser.is_connected() or self._needs_recycle()
+        ):
+            self._shutdown_browser()
+        if self._browser is None:
+            return self._launch()
+        return self._browser
+
+    @contextmanager
+    def new_context(self, **context_options: Any) -> Iterator[BrowserContext]:
+        """
+        Yield a fresh BrowserContext and close it afterwards.
+
+        Closing the context is what flushes a recorded HAR to disk, so callers
+        must not rely on the HAR file until the block has exited.
+        """
+        browser = self.acquire()
+        try:
+            context = browser.new_context(**context_options)
+        except Error:
+            # The browser died between the health check and now; relaunch once.
+            self._shutdown_browser()
+            context = self._launch().new_context(**context_options)
+
+        try:
+            yield context
+        finally:
+            self._jobs_served += 1
+            try:
+                context.close()
+            except Error:
+                # The browser crashed mid-job; the next acquire() relaunches it.
+                pass
+
+    def close(self) -> None:
+        self._shutdown_browser()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+class AsyncBrowserPool(_RecyclePolicy):
+    """
+    asyncio counterpart of BrowserPool for engines that run several jobs at once.
+
+    Many contexts share one browser concurrently, so recycling cannot close the
+    browser under running jobs: a browser due for recycling is retired, new
+    contexts go to a fresh launch, and the retired one is closed when its last
+    context finishes.
+    """
+
+    def __init__(self, max_jobs: int, max_rss_mb: int) -> None:
+        super().__init__(max_jobs, max_rss_mb)
+        self._playwright: AsyncPlaywright | None = None
+        self._browser: AsyncBrowser | None = None
+        self._in_flight: Dict[AsyncBrowser, int] = {}
+        self._retired: set[AsyncBrowser] = set()
+        self._lock = asyncio.Lock()
+
+    async def _launch(self) -> AsyncBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._in_flight[self._browser] = 0
+        self._jobs_served = 0
+        return self._browser
+
+    async def _close_browser(self, browser: AsyncBrowser) -> None:
+        self._in_flight.pop(browser, None)
+        self._retired.discard(browser)
+        try:
+            await browser.close()
+        except Error:
+            pass
+
+    async def _retire_current(self) -> None:
+        browser, self._browser = self._browser, None
+        if browser is None:
+            return
+        if self._in_flight.get(browser, 0) == 0 or not browser.is_connected():
+            await self._close_browser(browser)
+        else:
+            self._retired.add(browser)
+
+    async def _acquire(self) -> AsyncBrowser:
+        # Claim a slot under the lock so a concurrent recycle cannot close the
+        # browser between handing it out and opening the context.
+        async with self._lock:
+            if self._browser is not None and (
+                not self._browser.is_connected() or self._needs_recycle()
+            ):
+                await self._retire_current()
+            browser = self._browser or await self._launch()
+            self._in_flight[browser] = self._in_flight.get(browser, 0) + 1
+            return browser
+
+    async def _release(self, browser: AsyncBrowser) -> None:
+        if browser not in self._in_flight:
+            # Already closed after a crash.
+            return
+        self._in_flight[browser] -= 1
+        if browser in self._retired and self._in_flight[browser] <= 0:
+            await self._close_browser(browser)
+
+    @asynccontextmanager
+    async def new_context(self, **context_options: Any) -> AsyncIterator[AsyncBrowserContext]:
+        browser = await self._acquire()
+        try:
+            context = await browser.new_context(**context_options)
+        except Error:
+            # Same recovery as the sync pool: drop the dead browser, retry once.
+            await self._release(browser)
+            async with self._lock:
+                if self._browser is browser:
+                    await self._retire_current()
+            browser = await self._acquire()
+            try:
+                context = await browser.new_context(**context_options)
+            except Error:
+                await self._release(browser)
+                raise
+
+        try:
+            yield context
+        finally:
+            self._jobs_served += 1
+            try:
+                await context.close()
+            except Error:
+                pass
+            await self._release(browser)
+
+    async def close(self) -> None:
+        browsers = set(self._in_flight) | self._retired
+        self._browser = None
+        for browser in browsers:
+            await self._close_browser(browser)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+browser_pool = BrowserPool(
+    max_jobs=settings.extractor_browser_max_jobs,
+    max_rss_mb=settings.extractor_browser_max_rss_mb,
+)
+atexit.register(browser_pool.close)
@@ -0,0 +1,110 @@
+"""
+Concurrent consumption of an RQ queue by the async engines
+(extractor/async_worker.py, runner/async_worker.py).
+
+`rq worker` performs one job at a time, so the engines dequeue themselves
+and keep several jobs in flight. Each job is still booked the way a Worker
+books it, through a registered `rq.Worker` standing for this process:
+
+- while it runs, it is in the queue's StartedJobRegistry and heartbeats;
+- on success, it moves to the FinishedJobRegistry;
+- on failure, it moves to the FailedJobRegistry with its traceback.
+
+A process that dies leaves its jobs in the started registry. RQ's registry
+cleanup moves them to failed once their heartbeats stop. A job enqueued
+with a `job_timeout` is cancelled when that time runs out, and fails.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable
+
+from redis import Redis
+from rq import Queue, Worker
+from rq.exceptions import DequeueTimeout
+from rq.job import Job as RQJob
+from rq.utils import utcnow
+
+JobHandler = Callable[[RQJob], Awaitable[Any]]
+
+
+class AsyncQueueConsumer:
+    def __init__(
+        self,
+        queue_name: str,
+        connection: Redis,
+        handle: JobHandler,
+        concurrency: int,
+        poll_seconds: int = 5,
+    ) -> None:
+        self.queue = Queue(queue_name, connection=connection)
+        self.worker = Worker([self.queue], connection=connection)
+        self.handle = handle
+        self.concurrency = max(1, concurrency)
+        self.poll_seconds = poll_seconds
+
+    async def _heartbeats(self, rq_job: RQJob) -> None:
+        while True:
+            await asyncio.sleep(self.worker.job_monitoring_interval)
+            await asyncio.to_thread(self.worker.maintain_heartbeats, rq_job)
+
+    async def _perform(self, rq_job: RQJob) -> Any:
+        if rq_job.timeout and rq_job.timeout > 0:
+            return await asyncio.wait_for(self.handle(rq_job), timeout=rq_job.timeout)
+        return await self.handle(rq_job)
+
+    async def run_job(self, rq_job: RQJob) -> None:
+        await asyncio.to_thread(self.worker.prepare_job_execution, rq_job)
+        heartbeats = asyncio.create_task(self._heartbeats(rq_job))
+        try:
+            # Where Worker.perform_job keeps the return value for the Result it saves.
+            rq_job._result = await self._perform(rq_job)
+        except Exception:  # noqa: BLE001
+            rq_job.ended_at = utcnow()
+            await asyncio.to_thread(
+                self.worker.handle_job_failure,
+                rq_job,
+                self.queue,
+                exc_string=traceback.format_exc(),
+            )
+        else:
+            rq_job.ended_at = utcnow()
+            await asyncio.to_thread(
+                self.worker.handle_job_success,
+                rq_job,
+                self.queue,
+                self.queue.started_job_registry,
+            )
+        finally:
+            heartbeats.cancel()
+
+    async def serve(self) -> None:
+        """Dequeue and run jobs, up to `concurrency` at once, until cancelled."""
+        await asyncio.to_thread(self.worker.register_birth)
+        in_flight: set[asyncio.Task] = set()
+        try:
+            while True:
+                in_flight = {task for task in in_flight if not task.done()}
+                if len(in_flight) >= self.concurrency:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                await asyncio.to_thread(self.worker.heartbeat)
+                try:
+                    dequeued = await asyncio.to_thread(
+                        Queue.dequeue_any,
+                        [self.queue],
+                        self.poll_seconds,
+                        connection=self.queue.connection,
+                    )
+                except DequeueTimeout:
+                    dequeued = None
+                if dequeued is not None:
+                    rq_job, _ = dequeued
+                    in_flight.add(asyncio.create_task(self.run_job(rq_job)))
+        finally:
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            await asyncio.to_thread(self.worker.register_death)
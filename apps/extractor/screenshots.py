@@ -0,0 +1,134 @@
+"""
+Screenshot capture driven by the extraction profile.
+
+PNG and JPEG go through Playwright's `page.screenshot`. Playwright cannot
+encode WebP, so WebP is captured through the Chrome DevTools Protocol
+(`Page.captureScreenshot`), which Chromium supports natively.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Dict, Tuple
+
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Page
+
+from backend.extraction_profiles import ExtractionProfile
+from backend.storage import ArtifactRecord, ArtifactSaver, storage_adapter
+
+SCREENSHOT_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+PAGE_DIMENSIONS_SCRIPT = """
+() => ({
+  pageWidth: document.documentElement.scrollWidth,
+  pageHeight: document.documentElement.scrollHeight,
+  viewportWidth: window.innerWidth,
+  viewportHeight: window.innerHeight,
+})
+"""
+
+
+def _needs_dimensions(profile: ExtractionProfile) -> bool:
+    return profile.screenshot_format == "webp" or profile.screenshot_max_height > 0
+
+
+def _clip(profile: ExtractionProfile, dims: Dict[str, int] | None) -> Tuple[Dict[str, int] | None, bool]:
+    """Return the capture rectangle (None for Playwright's default) and whether it was cut short."""
+    if dims is None:
+        return None, False
+    full_page = profile.screenshot == "full_page"
+    width = dims["pageWidth"] if full_page else dims["viewportWidth"]
+    height = dims["pageHeight"] if full_page else dims["viewportHeight"]
+    clipped = 0 < profile.screenshot_max_height < height
+    if clipped:
+        height = profile.screenshot_max_height
+    return {"x": 0, "y": 0, "width": width, "height": height}, clipped
+
+
+def _playwright_options(profile: ExtractionProfile, clip: Dict[str, int] | None) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "type": profile.screenshot_format,
+        "full_page": profile.screenshot == "full_page",
+    }
+    if profile.screenshot_format == "jpeg":
+        options["quality"] = profile.screenshot_quality
+    if clip is not None:
+        options["clip"] = clip
+    return options
+
+
+def _cdp_params(profile: ExtractionProfile, clip: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "format": "webp",
+        "quality": profile.screenshot_quality,
+        "captureBeyondViewport": profile.screenshot == "full_page",
+        "clip": {**clip, "scale": 1},
+    }
+
+
+def _save(
+    job_id: str,
+    profile: ExtractionProfile,
+    data: bytes,
+    clipped: bool,
+    storage: ArtifactSaver,
+) -> ArtifactRecord:
+    filename = f"screenshot.{SCREENSHOT_EXTENSIONS[profile.screenshot_format]}"
+    path = storage.save_bytes(job_id, filename, data)
+    details: Dict[str, Any] = {"mode": profile.screenshot, "clipped": clipped, "bytes": len(data)}
+    if profile.screenshot_format != "png":
+        details["quality"] = profile.screenshot_quality
+    return ArtifactRecord(
+        name=filename,
+        type="screenshot",
+        path=path,
+        encoding=profile.screenshot_format,
+        details=details,
+    )
+
+
+def capture_screenshot(
+    page: Page,
+    job_id: str,
+    profile: ExtractionProfile,
+    storage: ArtifactSaver = storage_adapter,
+) -> ArtifactRecord | None:
+    if profile.screenshot == "off":
+        return None
+
+    dims = page.evaluate(PAGE_DIMENSIONS_SCRIPT) if _needs_dimensions(profile) else None
+    clip, clipped = _clip(profile, dims)
+    if profile.screenshot_format == "webp":
+        session = page.context.new_cdp_session(page)
+        try:
+            result = session.send("Page.captureScreenshot", _cdp_params(profile, clip))
+        finally:
+            session.detach()
+        data = base64.b64decode(result["data"])
+    else:
+        data = page.screenshot(**_playwright_options(profile, clip))
+    return _save(job_id, profile, data, clipped, storage)
+
+
+async def capture_screenshot_async(
+    page: AsyncPage,
+    job_id: str,
+    profile: ExtractionProfile,
+    storage: ArtifactSaver = storage_adapter,
+) -> ArtifactRecord | None:
+    if profile.screenshot == "off":
+        return None
+
+    dims = await page.evaluate(PAGE_DIMENSIONS_SCRIPT) if _needs_dimensions(profile) else None
+    clip, clipped = _clip(profile, dims)
+    if profile.screenshot_format == "webp":
+        session = await page.context.new_cdp_session(page)
+        try:
+            result = await session.send("Page.captureScreenshot", _cdp_params(profile, clip))
+        finally:
+            await session.detach()
+        data = base64.b64decode(result["data"])
+    else:
+        data = await page.screenshot(**_playwright_options(profile, clip))
+    return _save(job_id, profile, data, clipped, storage)
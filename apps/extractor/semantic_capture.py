@@ -0,0 +1,103 @@
+"""
+In-browser collection of semantic candidate elements.
+
+The page has already parsed its DOM, so instead of re-parsing `dom.json` in
+Python the extractor can ask the browser for the few elements the semantic
+builder looks at. The output mirrors what `html_parsers.candidates_from_soup`
+derives with BeautifulSoup (same order, same text and label rules) and is
+consumed by `semantic.build_semantic_model` when present.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Page
+
+from backend.storage import ArtifactRecord, ArtifactSaver, storage_adapter
+
+SEMANTIC_CANDIDATES_FILE = "semantic_candidates.json"
+
+# Text follows bs4's get_text(strip=True): every text node trimmed and
+# concatenated, skipping <script>/<style> contents. Empty attributes are
+# dropped, since the builder only tests them for truthiness.
+COLLECT_CANDIDATES_SCRIPT = """
+() => {
+  const skipText = new Set(["SCRIPT", "STYLE"]);
+  const textOf = (el) => {
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    let text = "";
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+      if (node.parentElement && skipText.has(node.parentElement.tagName)) continue;
+      text += node.data.trim();
+    }
+    return text;
+  };
+  const labelFor = new Map();
+  for (const label of document.querySelectorAll("label[for]")) {
+    const target = label.getAttribute("for");
+    if (!labelFor.has(target)) labelFor.set(target, textOf(label));
+  }
+  const describe = (el) => {
+    const item = { tag: el.tagName.toLowerCase() };
+    const id = el.getAttribute("id");
+    const name = el.getAttribute("name");
+    const classes = (el.getAttribute("class") || "").split(/\\s+/).filter(Boolean);
+    const ariaLabel = el.getAttribute("aria-label");
+    const placeholder = el.getAttribute("placeholder");
+    if (id) item.id = id;
+    if (name) item.name = name;
+    if (classes.length) item.classes = classes;
+    if (ariaLabel) item.ariaLabel = ariaLabel;
+    if (placeholder) item.placeholder = placeholder;
+    return item;
+  };
+  const candidates = [];
+  for (const tag of ["a", "button"]) {
+    for (const el of document.getElementsByTagName(tag)) {
+      const item = describe(el);
+      const text = textOf(el);
+      if (text) item.text = text;
+      candidates.push(item);
+    }
+  }
+  for (const el of document.getElementsByTagName("input")) {
+    const item = describe(el);
+    const label = item.id ? labelFor.get(item.id) : "";
+    if (label) item.label = label;
+    candidates.push(item);
+  }
+  return candidates;
+}
+"""
+
+
+def _save(
+    job_id: str,
+    candidates: List[Dict[str, Any]],
+    storage: ArtifactSaver,
+) -> ArtifactRecord:
+    path = storage.save_json(job_id, SEMANTIC_CANDIDATES_FILE, {"candidates": candidates})
+    return ArtifactRecord(
+        name=SEMANTIC_CANDIDATES_FILE,
+        type="semantic_candidates",
+        path=path,
+        details={"count": len(candidates)},
+    )
+
+
+def capture_semantic_candidates(
+    page: Page,
+    job_id: str,
+    storage: ArtifactSaver = storage_adapter,
+) -> ArtifactRecord:
+    return _save(job_id, page.evaluate(COLLECT_CANDIDATES_SCRIPT), storage)
+
+
+async def capture_semantic_candidates_async(
+    page: AsyncPage,
+    job_id: str,
+    storage: ArtifactSaver = storage_adapter,
+) -> ArtifactRecord:
+    return _save(job_id, await page.evaluate(COLLECT_CANDIDATES_SCRIPT), storage)
@@ -0,0 +1,139 @@
+"""
+Page-readiness strategies for the extractor.
+
+A strategy navigates to the target URL and returns once the page is ready to
+snapshot, reporting which condition fired and how long it took. Sync and
+async variants are registered under the same names so both engines select
+them from `ExtractionProfile.wait_strategy`.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from playwright.async_api import Page as AsyncPage
+from playwright.async_api import TimeoutError as AsyncPlaywrightTimeoutError
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from backend.extraction_profiles import ExtractionProfile
+
+# Resolves once the DOM has gone `quietMs` without mutations, or at `deadlineMs`.
+DOM_QUIET_SCRIPT = """
+({ quietMs, deadlineMs }) => new Promise((resolve) => {
+  const start = performance.now();
+  let mutations = 0;
+  let quietTimer = null;
+  let deadlineTimer = null;
+  let observer = null;
+  const finish = (outcome) => {
+    if (observer) observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(deadlineTimer);
+    resolve({ outcome, mutations, waitedMs: Math.round(performance.now() - start) });
+  };
+  observer = new MutationObserver((records) => {
+    mutations += records.length;
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(() => finish("quiet"), quietMs);
+  });
+  observer.observe(document, {
+    subtree: true,
+    childList: true,
+    attributes: true,
+    characterData: true,
+  });
+  quietTimer = setTimeout(() => finish("quiet"), quietMs);
+  deadlineTimer = setTimeout(() => finish("deadline"), Math.max(deadlineMs, 0));
+})
+"""
+
+WaitResult = Dict[str, Any]
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+def _dom_quiet_args(profile: ExtractionProfile, started: float) -> Dict[str, int]:
+    return {
+        "quietMs": profile.dom_quiet_ms,
+        "deadlineMs": profile.wait_deadline_ms - _elapsed_ms(started),
+    }
+
+
+def _load_deadline(started: float) -> WaitResult:
+    # The document itself did not load in time; capture whatever is there.
+    return {
+        "strategy": "dom_stable",
+        "outcome": "deadline",
+        "mutations": 0,
+        "durationMs": _elapsed_ms(started),
+    }
+
+
+def wait_networkidle(page: Page, url: str, profile: ExtractionProfile) -> WaitResult:
+    started = time.perf_counter()
+    page.goto(url, wait_until="networkidle")
+    return {"strategy": "networkidle", "outcome": "networkidle", "durationMs": _elapsed_ms(started)}
+
+
+def wait_dom_stable(page: Page, url: str, profile: ExtractionProfile) -> WaitResult:
+    started = time.perf_counter()
+    try:
+        page.goto(url, wait_until="domcontentloaded", timeout=profile.wait_deadline_ms)
+    except PlaywrightTimeoutError:
+        return _load_deadline(started)
+    result = page.evaluate(DOM_QUIET_SCRIPT, _dom_quiet_args(profile, started))
+    return {
+        "strategy": "dom_stable",
+        "outcome": result["outcome"],
+        "mutations": result["mutations"],
+        "durationMs": _elapsed_ms(started),
+    }
+
+
+async def wait_networkidle_async(page: AsyncPage, url: str, profile: ExtractionProfile) -> WaitResult:
+    started = time.perf_counter()
+    await page.goto(url, wait_until="networkidle")
+    return {"strategy": "networkidle", "outcome": "networkidle", "durationMs": _elapsed_ms(started)}
+
+
+async def wait_dom_stable_async(page: AsyncPage, url: str, profile: ExtractionProfile) -> WaitResult:
+    started = time.perf_counter()
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=profile.wait_deadline_ms)
+    except AsyncPlaywrightTimeoutError:
+        return _load_deadline(started)
+    result = await page.evaluate(DOM_QUIET_SCRIPT, _dom_quiet_args(profile, started))
+    return {
+        "strategy": "dom_stable",
+        "outcome": result["outcome"],
+        "mutations": result["mutations"],
+        "durationMs": _elapsed_ms(started),
+    }
+
+
+WAIT_STRATEGIES: Dict[str, Callable[[Page, str, ExtractionProfile], WaitResult]] = {
+    "networkidle": wait_networkidle,
+    "dom_stable": wait_dom_stable,
+}
+
+ASYNC_WAIT_STRATEGIES: Dict[
+    str, Callable[[AsyncPage, str, ExtractionProfile], Awaitable[WaitResult]]
+] = {
+    "networkidle": wait_networkidle_async,
+    "dom_stable": wait_dom_stable_async,
+}
+
+
+def navigate(page: Page, url: str, profile: ExtractionProfile) -> WaitResult:
+    """Load `url` using the profile's wait strategy (unknown names use networkidle)."""
+    strategy = WAIT_STRATEGIES.get(profile.wait_strategy, wait_networkidle)
+    return strategy(page, url, profile)
+
+
+async def navigate_async(page: AsyncPage, url: str, profile: ExtractionProfile) -> WaitResult:
+    strategy = ASYNC_WAIT_STRATEGIES.get(profile.wait_strategy, wait_networkidle_async)
+    return await strategy(page, url, profile)
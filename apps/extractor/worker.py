@@ -1,105 +1,359 @@
 from __future__ import annotations
 
+import shutil
+import time
 from datetime import datetime
-from typing import List
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import Route
 
 from backend.config import settings
 from backend.db import Job, JobStatus, SessionLocal
+from backend.extraction_cache import (
+    DOM_DERIVED_ARTIFACTS,
+    CacheEntry,
+    cache_key,
+    dom_hash,
+    ProbeResult,
+    extraction_cache,
+    probe,
+)
+from backend.extraction_profiles import (
+    BlockedRequestLog,
+    ExtractionProfile,
+    get_extraction_profile,
+)
+from backend.har import filter_har_bodies, playwright_har_content
+from backend.observability import Phase, StepRecorder, StructuredLogger, rss_mb
 from backend.storage import ArtifactRecord, storage_adapter
+from extractor.browser_pool import browser_pool, process_tree_rss_mb
+from extractor.screenshots import capture_screenshot
+from extractor.semantic_capture import capture_semantic_candidates
+from extractor.wait_strategies import navigate
 
 
-def _capture_artifacts(job_id: str, target_url: str) -> List[ArtifactRecord]:
-    records: List[ArtifactRecord] = []
+# save_json(job_id, name, data) -> path, of the storage adapter or a writer.
+SaveJson = Callable[[str, str, Any], str]
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        har_path = storage_adapter.job_dir(job_id) / "trace.har"
-        context = browser.new_context(record_har_path=str(har_path), record_har_content="embed")
-        page = context.new_page()
 
-        page.goto(target_url, wait_until="networkidle")
+class ClaimedJob(NamedTuple):
+    target_url: str
+    test_profile: str
 
-        # DOM snapshot
-        outer_html = page.evaluate("() => document.documentElement.outerHTML")
-        dom_record_path = storage_adapter.save_json(
-            job_id,
-            "dom.json",
-            {"outer_html": outer_html},
+
+def _save_extraction_summary(job_id: str, summary: Dict[str, Any]) -> ArtifactRecord:
+    """Persist how the page was loaded (profile, blocked requests, ...)."""
+    path = storage_adapter.save_json(job_id, "extraction.json", summary)
+    return ArtifactRecord(name="extraction.json", type="extraction", path=path)
+
+
+def _har_record_path(job_id: str, profile: ExtractionProfile) -> Path:
+    job_dir = storage_adapter.job_dir(job_id)
+    if profile.har_content == "filtered":
+        # Bodies land next to the raw HAR; keep them out of the job directory.
+        raw_dir = job_dir / ".har_raw"
+        raw_dir.mkdir(exist_ok=True)
+        return raw_dir / "trace.har"
+    return job_dir / "trace.har"
+
+
+def _har_context_options(job_id: str, profile: ExtractionProfile) -> Dict[str, Any]:
+    return {
+        "record_har_path": str(_har_record_path(job_id, profile)),
+        "record_har_content": playwright_har_content(profile.har_content),
+    }
+
+
+def _finalize_har(job_id: str, profile: ExtractionProfile) -> Dict[str, Any]:
+    """
+    Post-process the HAR once the context has flushed it and describe how it
+    was captured for extraction.json.
+    """
+    summary: Dict[str, Any] = {"content": profile.har_content}
+    if profile.har_content != "filtered":
+        return summary
+
+    raw_har = _har_record_path(job_id, profile)
+    summary.update(
+        filter_har_bodies(
+            raw_har,
+            storage_adapter.job_dir(job_id) / "trace.har",
+            profile.har_body_content_types,
+            profile.har_body_max_bytes,
         )
-        records.append(
-            ArtifactRecord(
-                name="dom.json",
-                type="dom",
-                path=dom_record_path,
+    )
+    shutil.rmtree(raw_har.parent, ignore_errors=True)
+    summary["bodyMaxBytes"] = profile.har_body_max_bytes
+    return summary
+
+
+def _cache_summary(target_url: str, profile: ExtractionProfile) -> Dict[str, Any]:
+    if not settings.extraction_cache_enabled:
+        return {"outcome": "disabled"}
+    return {"key": cache_key(target_url, profile.name), "outcome": "miss"}
+
+
+def _reuse_extraction(
+    job_id: str,
+    profile: ExtractionProfile,
+    entry: CacheEntry,
+    cache: Dict[str, Any],
+) -> List[ArtifactRecord]:
+    """The page answered "not modified": link every artifact of the cached job."""
+    cache.update(outcome="not_modified", reusedFrom=entry.job_id)
+    records = extraction_cache.reuse(entry, job_id, extraction_cache.reusable_artifacts(entry))
+    records.append(_save_extraction_summary(job_id, {"profile": profile.name, "cache": cache}))
+    storage_adapter.save_manifest(job_id, records)
+    return records
+
+
+def _reuse_dom_derived(entry: CacheEntry | None, job_id: str, name: str) -> List[ArtifactRecord]:
+    """Link `name` from the cached job after a DOM match; [] means capture it."""
+    if entry is None or name not in DOM_DERIVED_ARTIFACTS:
+        return []
+    return extraction_cache.reuse(entry, job_id, [name])
+
+
+def _timeline(job_id: str) -> StructuredLogger:
+    return StructuredLogger(job_id, settings.timeline_dir)
+
+
+def _extraction_steps(timeline: StructuredLogger) -> StepRecorder:
+    # Child RSS is the Playwright driver plus Chromium.
+    return StepRecorder(timeline, Phase.EXTRACTION, child_rss_mb=process_tree_rss_mb)
+
+
+def _bytes_written(records: Iterable[ArtifactRecord | None]) -> int:
+    """Bytes of the given artifacts this job wrote itself (links from the cache are free)."""
+    total = 0
+    for record in records:
+        if record is None or "reusedFrom" in record.details:
+            continue
+        try:
+            total += (storage_adapter.root / record.path).stat().st_size
+        except OSError:
+            pass
+    return total
+
+
+class _Capture:
+    """
+    The decisions and records of one extraction, shared by the sync
+    (`_capture_artifacts`) and async (`AsyncExtractionEngine.capture_artifacts`)
+    paths: those only make the Playwright calls and hand the results here.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        target_url: str,
+        profile: ExtractionProfile,
+        steps: StepRecorder,
+    ) -> None:
+        self.job_id = job_id
+        self.target_url = target_url
+        self.profile = profile
+        self.steps = steps
+        self.records: List[ArtifactRecord] = []
+        self.blocked = BlockedRequestLog()
+        self.cache = _cache_summary(target_url, profile)
+        self.entry: CacheEntry | None = None
+        self.probed: ProbeResult | None = None
+        self.fingerprint = ""
+        self.dom_match: CacheEntry | None = None
+
+    def probed_entry(self, entry: CacheEntry | None, probed: ProbeResult | None) -> int | None:
+        """Keep the cache lookup and probe results; returns the probe's status for the step."""
+        self.entry = entry
+        self.probed = probed
+        return probed.status if probed else None
+
+    def unchanged(self) -> bool:
+        """Whether the page answered "not modified", so the cached job can be reused whole."""
+        return self.entry is not None and self.probed is not None and self.probed.unchanged_since(self.entry)
+
+    def reuse(self) -> List[ArtifactRecord]:
+        with self.steps.step("reuse") as span:
+            self.records = _reuse_extraction(self.job_id, self.profile, self.entry, self.cache)
+            span["artifacts"] = len(self.records)
+        return self.records
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        """Whether a routed request may go through; blocked ones are logged."""
+        reason = self.profile.block_reason(resource_type, url, self.target_url)
+        if reason is None:
+            return True
+        self.blocked.record(reason, resource_type, url)
+        return False
+
+    def dom(self, outer_html: str, save_json: SaveJson) -> ArtifactRecord:
+        """Record the DOM snapshot; its hash decides what the cache can supply."""
+        self.fingerprint = dom_hash(outer_html)
+        if self.entry is not None and self.entry.dom_hash == self.fingerprint:
+            self.dom_match = self.entry
+        path = save_json(self.job_id, "dom.json", {"outer_html": outer_html})
+        record = ArtifactRecord(name="dom.json", type="dom", path=path)
+        self.records.append(record)
+        return record
+
+    def reused(self, name: str) -> List[ArtifactRecord]:
+        return _reuse_dom_derived(self.dom_match, self.job_id, name)
+
+    def accessibility(self, tree: Dict[str, Any] | None, save_json: SaveJson) -> List[ArtifactRecord]:
+        if tree is None:
+            return []
+        path = save_json(self.job_id, "accessibility.json", tree)
+        return [ArtifactRecord(name="accessibility.json", type="accessibility", path=path)]
+
+    def har(self) -> ArtifactRecord:
+        # Recorded via record_har_path; closing the context writes it.
+        record = ArtifactRecord(name="trace.har", type="har", path=f"{self.job_id}/trace.har")
+        self.records.append(record)
+        return record
+
+    def finish(self, wait: Dict[str, Any], har: Dict[str, Any]) -> List[ArtifactRecord]:
+        """Save extraction.json and the manifest, and remember the page in the cache."""
+        if self.dom_match is not None:
+            self.cache.update(outcome="dom_match", reusedFrom=self.dom_match.job_id)
+        self.records.append(
+            _save_extraction_summary(
+                self.job_id,
+                {
+                    "profile": self.profile.name,
+                    "wait": wait,
+                    "blocked": self.blocked.to_dict(),
+                    "har": har,
+                    "captureTimings": self.steps.timings,
+                    "cache": self.cache,
+                },
             )
         )
+        storage_adapter.save_manifest(self.job_id, self.records)
+        if settings.extraction_cache_enabled:
+            extraction_cache.store(
+                self.job_id,
+                self.target_url,
+                self.profile.name,
+                self.fingerprint,
+                self.probed,
+            )
+        return self.records
+
+
+def _capture_artifacts(
+    job_id: str,
+    target_url: str,
+    profile: ExtractionProfile | None = None,
+    steps: StepRecorder | None = None,
+) -> List[ArtifactRecord]:
+    profile = profile or get_extraction_profile(None)
+    steps = steps or _extraction_steps(_timeline(job_id))
+    capture = _Capture(job_id, target_url, profile, steps)
+    if settings.extraction_cache_enabled:
+        with steps.step("cacheProbe") as span:
+            entry = extraction_cache.lookup(target_url, profile.name)
+            probed = probe(target_url, entry, settings.extraction_cache_probe_timeout_seconds)
+            span["status"] = capture.probed_entry(entry, probed)
+        if capture.unchanged():
+            return capture.reuse()
+
+    def _route(route: Route) -> None:
+        request = route.request
+        if capture.allows(request.resource_type, request.url):
+            route.continue_()
+        else:
+            route.abort("blockedbyclient")
+
+    # Covers a browser (re)launch when the pool needs one.
+    context_started = time.perf_counter()
+    with browser_pool.new_context(**_har_context_options(job_id, profile)) as context:
+        # Routing disables the HTTP cache, so only install it when needed.
+        if profile.blocks_requests:
+            context.route("**/*", _route)
+        page = context.new_page()
+        steps.record("browserContext", context_started)
+
+        with steps.step("navigate") as span:
+            wait = navigate(page, target_url, profile)
+            span["outcome"] = wait["outcome"]
+
+        # DOM snapshot
+        with steps.step("dom") as span:
+            outer_html = page.evaluate("() => document.documentElement.outerHTML")
+            dom_record = capture.dom(outer_html, storage_adapter.save_json)
+            span["bytes_written"] = _bytes_written([dom_record])
+
+        # Semantic candidates, collected from the live DOM
+        if profile.semantic_source == "browser":
+            with steps.step("semanticCandidates") as span:
+                captured = capture.reused("semantic_candidates.json") or [
+                    capture_semantic_candidates(page, job_id)
+                ]
+                span["bytes_written"] = _bytes_written(captured)
+            capture.records.extend(captured)
 
         # Screenshot
-        screenshot_file = storage_adapter.job_dir(job_id) / "screenshot.png"
-        page.screenshot(path=str(screenshot_file), full_page=True)
-        records.append(
-            ArtifactRecord(
-                name="screenshot.png",
-                type="screenshot",
-                path=f"{job_id}/screenshot.png",
-            )
-        )
+        with steps.step("screenshot") as span:
+            screenshot_record = capture_screenshot(page, job_id, profile)
+            span["bytes_written"] = _bytes_written([screenshot_record])
+        if screenshot_record is not None:
+            capture.records.append(screenshot_record)
 
         # Accessibility tree (if available)
-        try:
-            accessibility_tree = page.accessibility.snapshot()
-        except Exception:
-            accessibility_tree = None
-
-        if accessibility_tree is not None:
-            acc_path = storage_adapter.save_json(
-                job_id,
-                "accessibility.json",
-                accessibility_tree,
-            )
-            records.append(
-                ArtifactRecord(
-                    name="accessibility.json",
-                    type="accessibility",
-                    path=acc_path,
-                )
-            )
+        with steps.step("accessibility") as span:
+            captured = capture.reused("accessibility.json")
+            if not captured:
+                try:
+                    accessibility_tree = page.accessibility.snapshot()
+                except Exception:
+                    accessibility_tree = None
+                captured = capture.accessibility(accessibility_tree, storage_adapter.save_json)
+            span["bytes_written"] = _bytes_written(captured)
+        capture.records.extend(captured)
 
-        # HAR is already being recorded via record_har_path
-        records.append(
-            ArtifactRecord(
-                name="trace.har",
-                type="har",
-                path=f"{job_id}/trace.har",
-            )
-        )
+        har_record = capture.har()
+        har_started = time.perf_counter()
 
-        context.close()
-        browser.close()
+    har = _finalize_har(job_id, profile)
+    steps.record("harFlush", har_started, bytes_written=_bytes_written([har_record]))
+    return capture.finish(wait, har)
 
-    # Save manifest
-    storage_adapter.save_manifest(job_id, records)
-    return records
 
+def _extraction_completed_details(records: List[ArtifactRecord], started: float) -> Dict[str, Any]:
+    return {
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+        "artifacts": len(records),
+        "bytes_written": _bytes_written(records),
+        "rss_mb": rss_mb(),
+    }
 
-def process_job(job_id: str) -> None:
+
+def _claim_job(job_id: str) -> ClaimedJob | None:
     """
-    RQ task entry point.
-    Picks up a job, runs Playwright extraction, saves artifacts, and updates job status.
+    Mark a job as in progress and return what extraction needs from it,
+    or None if the job no longer exists.
     """
     db = SessionLocal()
     try:
         job: Job | None = db.query(Job).filter(Job.id == job_id).first()
         if not job:
-            return
+            return None
 
         # Mark as extracting (reuse PENDING for demo as \"in progress\")
         job.status = JobStatus.PENDING
         db.commit()
+        return ClaimedJob(target_url=job.target_url, test_profile=job.test_profile)
+    finally:
+        db.close()
+
 
-        _capture_artifacts(job.id, job.target_url)
+def _complete_job(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        job: Job | None = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            return
 
         # Update basic metadata and mark as queued for next phase
         job.status = JobStatus.QUEUED
@@ -108,3 +362,29 @@ def process_job(job_id: str) -> None:
     finally:
         db.close()
 
+
+def process_job(job_id: str) -> None:
+    """
+    RQ task entry point.
+    Picks up a job, runs Playwright extraction, saves artifacts, and updates job status.
+    """
+    claimed = _claim_job(job_id)
+    if claimed is None:
+        return
+
+    timeline = _timeline(job_id)
+    profile = get_extraction_profile(claimed.test_profile)
+    timeline.log_extraction_started({"target_url": claimed.target_url, "profile": profile.name})
+    started = time.perf_counter()
+    try:
+        records = _capture_artifacts(
+            job_id,
+            claimed.target_url,
+            profile,
+            _extraction_steps(timeline),
+        )
+    except Exception as exc:
+        timeline.log_error(Phase.EXTRACTION, str(exc), type(exc).__name__)
+        raise
+    timeline.log_extraction_completed(_extraction_completed_details(records, started))
+    _complete_job(job_id)
@@ -80,3 +80,22 @@ export async function getReport(jobId: string) {
   }>(`/jobs/${jobId}/report`);
 }
 
+
+export type RunEvent = {
+  type: "queued" | "started" | "step" | "finished";
+  data: any;
+};
+
+// Follow a run live over Server-Sent Events instead of polling its report.
+// Returns a function that stops listening.
+export function streamRunEvents(runId: string, onEvent: (event: RunEvent) => void): () => void {
+  const source = new EventSource(`${API_BASE}/tests/runs/${runId}/events`);
+  const types: RunEvent["type"][] = ["queued", "started", "step", "finished"];
+  for (const type of types) {
+    source.addEventListener(type, (e) => {
+      onEvent({ type, data: JSON.parse((e as MessageEvent).data) });
+      if (type === "finished") source.close();
+    });
+  }
+  return () => source.close();
+}
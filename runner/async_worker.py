@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from playwright.async_api import Page
+from redis import Redis
+from rq.job import Job as RQJob
+
+from backend.batch_runs import (
+    BATCH_DIR,
+    BatchRun,
+    aggregate_batch_report,
+    batch_report_name,
+)
+from backend.capacity import available_cpus, available_memory_mb, concurrency_cap
+from backend.config import settings
+from backend.run_events import run_events
+from backend.run_options import RunOptions
+from backend.run_stats import NAVIGATION_TIMING_SCRIPT, navigation_timing
+from backend.storage import storage_adapter
+from extractor.browser_pool import AsyncBrowserPool
+from extractor.rq_consumer import AsyncQueueConsumer
+from runner.worker import (
+    _Run,
+    _build_url,
+    _check_text,
+    _local_run_id,
+    _start_run,
+)
+
+# Run events go out from one thread, off the event loop and in order.
+_events_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-events")
+
+
+def _publish(run_id: str | None, event_type: str, data: Dict[str, Any]) -> None:
+    _events_executor.submit(run_events.publish, run_id, event_type, data)
+
+
+async def _perform_step(
+    page: Page,
+    step: Dict[str, Any],
+    step_timeout_ms: float,
+    navigation_timeout_ms: float,
+    base_url: str | None = None,
+) -> Dict[str, Any] | None:
+    """Async twin of runner.worker._perform_step."""
+    action = step.get("action")
+    if action == "goto":
+        url = _build_url(step["url"], base_url)
+        await page.goto(url, wait_until="networkidle", timeout=navigation_timeout_ms)
+        return await _navigation_timing(page)
+    elif action == "fill":
+        await page.fill(step["selector"], step["value"], timeout=step_timeout_ms)
+    elif action == "click":
+        await page.click(step["selector"], timeout=step_timeout_ms)
+    elif action == "expectText":
+        locator = page.locator(step["selector"])
+        await locator.wait_for(state="visible", timeout=step_timeout_ms)
+        text_content = await locator.inner_text()
+        _check_text(step, text_content)
+    else:
+        raise RuntimeError(f"Unsupported action at runtime: {action}")
+    return None
+
+
+async def _navigation_timing(page: Page) -> Dict[str, Any] | None:
+    try:
+        return navigation_timing(await page.evaluate(NAVIGATION_TIMING_SCRIPT))
+    except Exception:  # noqa: BLE001
+        return None
+
+
+async def _failure_screenshot(page: Page, run: _Run, idx: int) -> str | None:
+    screenshot_name = run.screenshot_name(idx)
+    try:
+        await page.screenshot(path=run.path(screenshot_name), full_page=run.options.full_page)
+    except Exception:  # noqa: BLE001
+        return None
+    return screenshot_name
+
+
+def default_concurrency() -> int:
+    """RUNNER_CONCURRENCY, bounded by the CPUs and memory this worker has."""
+    return concurrency_cap(
+        settings.runner_concurrency,
+        available_cpus(),
+        available_memory_mb(),
+        settings.runner_contexts_per_cpu,
+        settings.runner_context_memory_mb,
+    )
+
+
+class AsyncRunEngine:
+    """
+    Runs many generated tests at once in a single runner process.
+
+    Every run gets its own BrowserContext of one pooled browser, so runs stay
+    isolated while sharing the launch cost. `concurrency` caps the runs in
+    flight. A run gets its options' time budget, never more than
+    `run_timeout_seconds` (0 means no ceiling); out of time it is recorded
+    as "timeout" and its slot is released.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        run_timeout_seconds: float,
+        pool: AsyncBrowserPool | None = None,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.run_timeout_seconds = run_timeout_seconds
+        self.pool = pool or AsyncBrowserPool(
+            max_jobs=settings.runner_browser_max_runs,
+            max_rss_mb=settings.runner_browser_max_rss_mb,
+        )
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    async def _execute(self, run: _Run) -> None:
+        async with self.pool.new_context(**run.auth.context_options) as context:
+            if run.replay:
+                await context.route_from_har(run.replay.path, not_found=run.options.har_not_found)
+            page = await context.new_page()
+            page.set_default_timeout(run.options.step_timeout_ms)
+            for idx, step in run.steps():
+                step_started = time.perf_counter()
+                try:
+                    navigation = await _perform_step(
+                        page,
+                        step,
+                        run.step_timeout_ms(),
+                        run.navigation_timeout_ms(),
+                        run.base_url,
+                    )
+
+                    screenshot_name = run.passed_screenshot(idx)
+                    if screenshot_name:
+                        await page.screenshot(
+                            path=run.path(screenshot_name),
+                            full_page=run.options.full_page,
+                        )
+                    run.passed(idx, step, step_started, navigation, screenshot_name)
+                    if run.auth.captures_after(idx):
+                        state = await context.storage_state()
+                        await asyncio.to_thread(run.auth_captured, state, page.url)
+                except Exception as exc:  # noqa: BLE001
+                    run.failure_status(exc)
+                    screenshot_name = await _failure_screenshot(page, run, idx)
+                    run.failed(idx, step, step_started, exc, screenshot_name)
+                    return
+
+    async def _execute_within_budget(self, run: _Run) -> None:
+        try:
+            # Steps already stop at the deadline; this backstop (one step
+            # timeout later, leaving room for the failure screenshot)
+            # catches anything that ignores its own timeout.
+            await asyncio.wait_for(
+                self._execute(run),
+                timeout=run.deadline.seconds + run.options.step_timeout_ms / 1000,
+            )
+        except asyncio.TimeoutError:
+            run.budget_exceeded(len(run.step_results) + 1)
+
+    async def run_test(
+        self,
+        job_id: str,
+        test_id: str,
+        run_id: str | None = None,
+        options: RunOptions | None = None,
+    ) -> str:
+        """Execute one test once a slot is free; returns "passed", "failed" or "timeout"."""
+        options = (options or RunOptions()).for_profile(None)
+        run_id = run_id or _local_run_id(test_id)
+        async with self._slots:
+            run = await asyncio.to_thread(
+                _start_run,
+                job_id,
+                test_id,
+                run_id,
+                options,
+                _publish,
+                self.run_timeout_seconds,
+            )
+            if run.status == "passed":
+                await self._execute_within_budget(run)
+            await asyncio.to_thread(run.finish)
+            return run.status
+
+    async def run_batch(
+        self,
+        batch_id: str,
+        runs: List[BatchRun],
+        options: RunOptions | None = None,
+        shard: int | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute the batch's (or one shard's) runs concurrently, up to
+        `concurrency`, and save the aggregated report next to the per-run
+        reports. The report is saved even if the batch is cancelled (e.g.
+        by its RQ job timeout), with the unfinished runs "interrupted".
+        """
+        started_at = datetime.now(timezone.utc)
+        statuses: List[str] = ["interrupted"] * len(runs)
+
+        async def run_one(index: int, run: BatchRun) -> None:
+            try:
+                statuses[index] = await self.run_test(
+                    run.job_id,
+                    run.test_id,
+                    run_id=run.run_id,
+                    options=(options or RunOptions()).for_profile(run.test_profile),
+                )
+            except Exception:  # noqa: BLE001
+                statuses[index] = "error"
+
+        try:
+            await asyncio.gather(*(run_one(index, run) for index, run in enumerate(runs)))
+        finally:
+            report = aggregate_batch_report(
+                batch_id,
+                runs,
+                statuses,
+                started_at,
+                datetime.now(timezone.utc),
+            )
+            # Saved without awaiting, as this also runs while being cancelled.
+            storage_adapter.save_json(BATCH_DIR, batch_report_name(batch_id, shard), report)
+        return report
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+def _default_engine() -> AsyncRunEngine:
+    return AsyncRunEngine(
+        concurrency=default_concurrency(),
+        run_timeout_seconds=settings.runner_run_timeout_seconds,
+    )
+
+
+def _batch_args(
+    kwargs: Dict[str, Any],
+) -> tuple[str, List[BatchRun], RunOptions, int | None]:
+    return (
+        kwargs["batch_id"],
+        [BatchRun(**run) for run in kwargs["runs"]],
+        RunOptions.from_dict(kwargs.get("options")),
+        kwargs.get("shard"),
+    )
+
+
+async def _run_batch(
+    batch_id: str,
+    runs: List[BatchRun],
+    options: RunOptions,
+    shard: int | None,
+) -> Dict[str, Any]:
+    engine = _default_engine()
+    try:
+        return await engine.run_batch(batch_id, runs, options, shard)
+    finally:
+        await engine.close()
+
+
+def run_batch(
+    batch_id: str,
+    runs: List[Dict[str, str]],
+    options: Dict[str, Any] | None = None,
+    shard: int | None = None,
+) -> Dict[str, Any]:
+    """
+    RQ task entry point for a batch (or one shard of it) of test runs.
+    Returns the batch report.
+    """
+    return asyncio.run(
+        _run_batch(
+            *_batch_args(
+                {"batch_id": batch_id, "runs": runs, "options": options, "shard": shard}
+            )
+        )
+    )
+
+
+async def _handle_rq_job(engine: AsyncRunEngine, rq_job: RQJob) -> Any:
+    # A failing test is a finished run; only infrastructure errors fail the RQ job.
+    if rq_job.func_name == "runner.worker.run_test":
+        return await engine.run_test(
+            rq_job.kwargs["job_id"],
+            rq_job.kwargs["test_id"],
+            run_id=rq_job.id,
+            options=RunOptions.from_dict(rq_job.kwargs.get("options")),
+        )
+    if rq_job.func_name == "runner.async_worker.run_batch":
+        return await engine.run_batch(*_batch_args(rq_job.kwargs))
+    return await asyncio.to_thread(rq_job.perform)
+
+
+async def serve(queue_name: str = "runs", poll_seconds: int = 5) -> None:
+    """
+    Consume the runs queue continuously, keeping up to the engine's
+    concurrency of tests in flight.
+    """
+    engine = _default_engine()
+    consumer = AsyncQueueConsumer(
+        queue_name,
+        Redis.from_url(settings.redis_url),
+        lambda rq_job: _handle_rq_job(engine, rq_job),
+        engine.concurrency,
+        poll_seconds,
+    )
+    try:
+        await consumer.serve()
+    finally:
+        await engine.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+import atexit
 import json
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Tuple
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from rq import get_current_job
 
+from backend.auth_state import auth_state_cache, load_semantic_model, login_step_range
 from backend.config import settings
+from backend.har import har_navigation, har_origin, has_response_body
+from backend.run_events import StepResults, run_events
+from backend.run_options import RunDeadline, RunOptions
+from backend.run_stats import NAVIGATION_TIMING_SCRIPT, navigation_timing
 from backend.storage import storage_adapter
+from extractor.browser_pool import BrowserPool
+
+# One warm Chromium per runner process; every run gets its own context.
+browser_pool = BrowserPool(
+    max_jobs=settings.runner_browser_max_runs,
+    max_rss_mb=settings.runner_browser_max_rss_mb,
+)
+atexit.register(browser_pool.close)
 
 
 def _load_test(job_id: str, test_id: str) -> Dict[str, Any]:
@@ -23,8 +40,8 @@ def _load_test(job_id: str, test_id: str) -> Dict[str, Any]:
     return data
 
 
-def _build_url(relative: str) -> str:
-    base = getattr(settings, "test_base_url", None) or "http://sample-app:3000"
+def _build_url(relative: str, base: str | None = None) -> str:
+    base = base or getattr(settings, "test_base_url", None) or "http://sample-app:3000"
     if relative.startswith("http://") or relative.startswith("https://"):
         return relative
     if not relative.startswith("/"):
@@ -32,80 +49,243 @@ def _build_url(relative: str) -> str:
     return base.rstrip("/") + relative
 
 
-def run_test(job_id: str, test_id: str) -> None:
+def _perform_step(
+    page: Page,
+    step: Dict[str, Any],
+    step_timeout_ms: float,
+    navigation_timeout_ms: float,
+    base_url: str | None = None,
+) -> Dict[str, Any] | None:
+    """Run one step; a `goto` returns the page's navigation timing."""
+    action = step.get("action")
+    if action == "goto":
+        url = _build_url(step["url"], base_url)
+        page.goto(url, wait_until="networkidle", timeout=navigation_timeout_ms)
+        return _navigation_timing(page)
+    elif action == "fill":
+        page.fill(step["selector"], step["value"], timeout=step_timeout_ms)
+    elif action == "click":
+        page.click(step["selector"], timeout=step_timeout_ms)
+    elif action == "expectText":
+        locator = page.locator(step["selector"])
+        locator.wait_for(state="visible", timeout=step_timeout_ms)
+        text_content = locator.inner_text()
+        _check_text(step, text_content)
+    else:
+        # Unsupported action should not happen if validator ran.
+        raise RuntimeError(f"Unsupported action at runtime: {action}")
+    return None
+
+
+def _navigation_timing(page: Page) -> Dict[str, Any] | None:
+    # Timing is best effort; it never fails the step.
+    try:
+        return navigation_timing(page.evaluate(NAVIGATION_TIMING_SCRIPT))
+    except Exception:  # noqa: BLE001
+        return None
+
+
+class _HarReplay(NamedTuple):
+    path: Path
+    origin: str  # relative `goto` URLs resolve against the recorded page
+
+
+def _har_replay(job_id: str, options: RunOptions) -> _HarReplay | None:
     """
-    RQ task that executes a generated Playwright JSON test in an isolated
-    container and stores a structured report.
+    The HAR a `network="har"` run is served from; None for live runs.
+    Raises FileNotFoundError when there is nothing to replay: no HAR, or
+    one recorded without the page's body (`har_content` "omit", or
+    "filtered" having dropped the document), which would replay a blank page.
     """
-    test_def = _load_test(job_id, test_id)
-    steps_def: List[Dict[str, Any]] = test_def.get("steps", [])
+    if options.network != "har":
+        return None
+    har_path = storage_adapter.root / job_id / "trace.har"
+    navigation = har_navigation(har_path)
+    if navigation is None:
+        raise FileNotFoundError(f"No recorded traffic to replay for job {job_id}")
+    if not has_response_body(navigation.get("response", {}).get("content"), har_path.parent):
+        raise FileNotFoundError(
+            f"The HAR of job {job_id} has no body for {navigation['request']['url']}; "
+            "re-extract it with har_content embed, attach or filtered keeping the document, "
+            "or run live"
+        )
+    return _HarReplay(har_path, har_origin(har_path))
 
-    started_at = datetime.now(timezone.utc)
-    step_results: List[Dict[str, Any]] = []
-    artifacts: List[str] = []
-    status = "passed"
 
-    root = storage_adapter.job_dir(job_id)
+def _run_deadline(options: RunOptions, ceiling_seconds: float) -> RunDeadline:
+    """The run's budget, never above the worker-wide ceiling (0 means none)."""
+    budget = options.run_timeout_seconds
+    if ceiling_seconds > 0:
+        budget = min(budget, ceiling_seconds)
+    return RunDeadline(budget)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
 
-        try:
-            for idx, step in enumerate(steps_def, start=1):
-                action = step.get("action")
-                try:
-                    if action == "goto":
-                        url = _build_url(step["url"])
-                        page.goto(url, wait_until="networkidle")
-                    elif action == "fill":
-                        page.fill(step["selector"], step["value"])
-                    elif action == "click":
-                        page.click(step["selector"])
-                    elif action == "expectText":
-                        locator = page.locator(step["selector"])
-                        locator.wait_for(state="visible", timeout=5000)
-                        text_content = locator.inner_text()
-                        if step["value"] not in text_content:
-                            raise AssertionError(
-                                f'Expected "{step["value"]}" in "{text_content}"'
-                            )
-                    else:
-                        # Unsupported action should not happen if validator ran.
-                        raise RuntimeError(f"Unsupported action at runtime: {action}")
-
-                    # Optionally capture a screenshot per step for debugging
-                    screenshot_name = f"run_{test_id}_step_{idx}.png"
-                    screenshot_path = root / screenshot_name
-                    page.screenshot(path=str(screenshot_path), full_page=True)
-                    artifacts.append(f"{job_id}/{screenshot_name}")
-
-                    step_results.append(
-                        {
-                            "step": idx,
-                            "status": "passed",
-                            "screenshot": f"{job_id}/{screenshot_name}",
-                        }
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    status = "failed"
-                    step_results.append(
-                        {
-                            "step": idx,
-                            "status": "failed",
-                            "error": str(exc),
-                        }
-                    )
-                    break
-        finally:
-            context.close()
-            browser.close()
+def _budget_exceeded(deadline: RunDeadline) -> TimeoutError:
+    return TimeoutError(f"Run exceeded its {deadline.seconds:g}s budget")
 
-    finished_at = datetime.now(timezone.utc)
 
-    rq_job = get_current_job()
-    run_id = rq_job.id if rq_job else f"run_{test_id}_{int(finished_at.timestamp())}"
+def _failure_status(exc: Exception, deadline: RunDeadline) -> str:
+    """
+    "timeout" only when the run's budget ran out. A step's timeouts are
+    capped to what is left of the budget, so one that fired at the cap finds
+    the deadline expired; a step exceeding its own timeout has "failed".
+    """
+    if isinstance(exc, (PlaywrightTimeoutError, TimeoutError)) and deadline.expired():
+        return "timeout"
+    return "failed"
+
+
+def _check_text(step: Dict[str, Any], text_content: str) -> None:
+    if step["value"] not in text_content:
+        raise AssertionError(
+            f'Expected "{step["value"]}" in "{text_content}"'
+        )
+
+
+def _screenshot_name(test_id: str, run_id: str, idx: int) -> str:
+    # The run id keeps runs of the same test from overwriting each other's.
+    return f"run_{test_id}_{run_id}_step_{idx}.png"
+
+
+def _local_run_id(test_id: str) -> str:
+    """Id of a run executed outside RQ, which has no job id to use."""
+    return f"run_{test_id}_{int(datetime.now(timezone.utc).timestamp())}"
+
+
+def _step_details(
+    step: Dict[str, Any],
+    started: float,
+    navigation: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """
+    Action and wall time (ms, from `time.perf_counter`) of a step, feeding
+    the run stats (backend/run_stats.py) and batch sharding.
+    """
+    details: Dict[str, Any] = {
+        "action": step.get("action"),
+        "durationMs": round((time.perf_counter() - started) * 1000, 3),
+    }
+    if navigation:
+        details["navigation"] = navigation
+    return details
+
+
+def _passed_step(
+    job_id: str,
+    idx: int,
+    screenshot_name: str | None,
+    details: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"step": idx, "status": "passed", **(details or {})}
+    if screenshot_name:
+        result["screenshot"] = f"{job_id}/{screenshot_name}"
+    return result
+
+
+def _failed_step(
+    idx: int,
+    exc: Exception,
+    job_id: str | None = None,
+    screenshot_name: str | None = None,
+    details: Dict[str, Any] | None = None,
+    status: str = "failed",
+) -> Dict[str, Any]:
+    """A step that raised; `status` is "timeout" when it ran out of time."""
+    result: Dict[str, Any] = {
+        "step": idx,
+        "status": status,
+        "error": str(exc),
+        **(details or {}),
+    }
+    if screenshot_name:
+        result["screenshot"] = f"{job_id}/{screenshot_name}"
+    return result
+
+
+def _skipped_step(idx: int, step: Dict[str, Any]) -> Dict[str, Any]:
+    """A login step not performed because the run started from a saved session."""
+    return {
+        "step": idx,
+        "status": "skipped",
+        "action": step.get("action"),
+        "durationMs": 0.0,
+        "reason": "authState",
+    }
+
+
+@dataclass
+class _AuthSession:
+    """How a run uses the job's saved login session (backend/auth_state.py)."""
+
+    login: range | None = None
+    state: Dict[str, Any] | None = None
+    url: str | None = None  # where the saved session's login led
+    outcome: str = "none"  # "reused", "captured" or "none"
+
+    @property
+    def context_options(self) -> Dict[str, Any]:
+        return {"storage_state": self.state} if self.state else {}
+
+    def skips(self, idx: int) -> bool:
+        return self.state is not None and self.login is not None and idx - 1 in self.login
+
+    def resumes_at(self, idx: int) -> bool:
+        """
+        Whether skipped step `idx`, the login's last, is replaced by going to
+        the page the saved session's login led to.
+        """
+        return self.skips(idx) and idx == self.login.stop and self.url is not None
+
+    def captures_after(self, idx: int) -> bool:
+        return self.state is None and self.login is not None and idx == self.login.stop
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "loginSteps": [self.login.start + 1, self.login.stop] if self.login else None,
+            "state": self.outcome,
+        }
+
+
+def _auth_session(job_id: str, steps_def: List[Dict[str, Any]], options: RunOptions) -> _AuthSession:
+    login = login_step_range(steps_def, load_semantic_model(storage_adapter, job_id))
+    session = auth_state_cache.load_session(job_id) if login and options.start_authenticated else None
+    if session and session.url is None and not _navigates(steps_def, login.stop):
+        # Saved without the URL the login led to: skipping the login would
+        # leave the page on the login form, unless the test navigates next.
+        session = None
+    if session is None:
+        return _AuthSession(login=login)
+    return _AuthSession(login=login, state=session.storage_state, url=session.url, outcome="reused")
+
+
+def _navigates(steps_def: List[Dict[str, Any]], index: int) -> bool:
+    return index < len(steps_def) and steps_def[index].get("action") == "goto"
+
+
+def _started_event(job_id: str, test_id: str, steps_def: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"jobId": job_id, "testId": test_id, "steps": len(steps_def)}
+
+
+def _finished_event(job_id: str, report: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": report["status"],
+        "report": f"{job_id}/test_report_{report['runId']}.json",
+        "finishedAt": report["finishedAt"],
+    }
+
+
+def _save_report(
+    job_id: str,
+    test_id: str,
+    run_id: str,
+    status: str,
+    step_results: List[Dict[str, Any]],
+    artifacts: List[str],
+    started_at: datetime,
+    options: RunOptions,
+    auth: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    finished_at = datetime.now(timezone.utc)
 
     report = {
         "runId": run_id,
@@ -113,6 +293,19 @@ def run_test(job_id: str, test_id: str) -> None:
         "status": status,
         "steps": step_results,
         "artifacts": artifacts,
+        "screenshots": {
+            "policy": options.screenshot_policy,
+            "every": options.screenshot_every,
+            "mode": options.screenshot_mode,
+            "captured": len(artifacts),
+        },
+        "timeouts": {
+            "runSeconds": options.run_timeout_seconds,
+            "stepMs": options.step_timeout_ms,
+            "navigationMs": options.navigation_timeout_ms,
+        },
+        "auth": auth,
+        "network": {"mode": options.network, "harNotFound": options.har_not_found},
         "startedAt": started_at.isoformat(),
         "finishedAt": finished_at.isoformat(),
     }
@@ -121,4 +314,267 @@ def run_test(job_id: str, test_id: str) -> None:
     report_name = f"test_report_{run_id}.json"
     storage_adapter.save_json(job_id, report_name, report)
     storage_adapter.save_json(job_id, "last_run.json", report)
+    return report
+
+
+# publish(run_id, event_type, data), e.g. run_events.publish.
+Publish = Callable[[str, str, Dict[str, Any]], None]
+
+
+class _Run:
+    """
+    The bookkeeping of one test run, shared by `run_test` and
+    `AsyncRunEngine.run_test`: its step results and events, login session,
+    budget, status, screenshots and report. Those only drive the page and
+    hand each step's outcome here. Built by `_start_run`.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        test_id: str,
+        run_id: str,
+        options: RunOptions,
+        steps_def: List[Dict[str, Any]],
+        publish: Publish,
+        deadline: RunDeadline,
+    ) -> None:
+        self.job_id = job_id
+        self.test_id = test_id
+        self.run_id = run_id
+        self.options = options
+        self.steps_def = steps_def
+        self.deadline = deadline
+        self.started_at = datetime.now(timezone.utc)
+        self.status = "passed"
+        self.artifacts: List[str] = []
+        self.root = storage_adapter.job_dir(job_id)
+        self.auth = _AuthSession()
+        self.replay: _HarReplay | None = None
+        self._publish = publish
+        self.step_results = StepResults(lambda result: publish(run_id, "step", result))
+
+    @property
+    def base_url(self) -> str | None:
+        return self.replay.origin if self.replay else None
+
+    def step_timeout_ms(self) -> float:
+        return self.deadline.cap(self.options.step_timeout_ms)
+
+    def navigation_timeout_ms(self) -> float:
+        return self.deadline.cap(self.options.navigation_timeout_ms)
+
+    def steps(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        The steps to perform, numbered from 1. Login steps a saved session
+        makes unnecessary are recorded as skipped, the last one replaced by
+        a `goto` to where that session's login led. The run stops with
+        "timeout" once its budget is spent.
+        """
+        for idx, step in enumerate(self.steps_def, start=1):
+            if self.deadline.expired():
+                self.budget_exceeded(idx)
+                return
+            if self.auth.resumes_at(idx):
+                yield idx, {"action": "goto", "url": self.auth.url}
+            elif self.auth.skips(idx):
+                self.step_results.add(_skipped_step(idx, step))
+            else:
+                yield idx, step
+
+    def budget_exceeded(self, idx: int) -> None:
+        self.status = "timeout"
+        self.step_results.add(_failed_step(idx, _budget_exceeded(self.deadline), status=self.status))
+
+    def screenshot_name(self, idx: int) -> str:
+        return _screenshot_name(self.test_id, self.run_id, idx)
+
+    def path(self, name: str) -> str:
+        return str(self.root / name)
+
+    def passed_screenshot(self, idx: int) -> str | None:
+        """The screenshot to take after step `idx` passed, if the run's policy wants one."""
+        if not self.options.screenshot_after(idx, len(self.steps_def)):
+            return None
+        return self.screenshot_name(idx)
+
+    def passed(
+        self,
+        idx: int,
+        step: Dict[str, Any],
+        started: float,
+        navigation: Dict[str, Any] | None,
+        screenshot_name: str | None,
+    ) -> None:
+        if screenshot_name:
+            self.artifacts.append(f"{self.job_id}/{screenshot_name}")
+        result = _passed_step(
+            self.job_id,
+            idx,
+            screenshot_name,
+            _step_details(step, started, navigation),
+        )
+        if self.auth.resumes_at(idx):
+            # Still the login's last step, skipped; its time is the `goto`'s.
+            result.update(
+                _skipped_step(idx, self.steps_def[idx - 1]),
+                durationMs=result["durationMs"],
+                resumedAt=step["url"],
+            )
+        self.step_results.add(result)
+
+    def auth_captured(self, state: Dict[str, Any], url: str) -> None:
+        """Save the session the login steps just set up, and the page they led to."""
+        auth_state_cache.store(self.job_id, state, url)
+        self.auth.outcome = "captured"
 
+    def failure_status(self, exc: Exception) -> str:
+        """Set the run's status from the exception a step raised."""
+        self.status = _failure_status(exc, self.deadline)
+        return self.status
+
+    def failed(
+        self,
+        idx: int,
+        step: Dict[str, Any],
+        started: float,
+        exc: Exception,
+        screenshot_name: str | None,
+    ) -> None:
+        """Record step `idx` as failed, with the status `failure_status` set."""
+        if screenshot_name:
+            self.artifacts.append(f"{self.job_id}/{screenshot_name}")
+        self.step_results.add(
+            _failed_step(
+                idx,
+                exc,
+                self.job_id,
+                screenshot_name,
+                _step_details(step, started),
+                self.status,
+            )
+        )
+
+    def finish(self) -> Dict[str, Any]:
+        """Save the report and publish the run's `finished` event."""
+        if self.status != "passed" and self.auth.outcome == "reused":
+            # The saved session may have expired server-side; log in next time.
+            auth_state_cache.invalidate(self.job_id)
+
+        report = _save_report(
+            self.job_id,
+            self.test_id,
+            self.run_id,
+            self.status,
+            self.step_results.to_list(),
+            self.artifacts,
+            self.started_at,
+            self.options,
+            self.auth.to_dict(),
+        )
+        self._publish(self.run_id, "finished", _finished_event(self.job_id, report))
+        return report
+
+
+def _start_run(
+    job_id: str,
+    test_id: str,
+    run_id: str,
+    options: RunOptions,
+    publish: Publish,
+    ceiling_seconds: float,
+) -> _Run:
+    """
+    Load the test, publish the run's `started` event and decide how it
+    starts: from a saved login session, and live or from the job's HAR. A
+    HAR that cannot be replayed fails the run before any step.
+    """
+    test_def = _load_test(job_id, test_id)
+    steps_def: List[Dict[str, Any]] = test_def.get("steps", [])
+    run = _Run(
+        job_id,
+        test_id,
+        run_id,
+        options,
+        steps_def,
+        publish,
+        _run_deadline(options, ceiling_seconds),
+    )
+    publish(run_id, "started", _started_event(job_id, test_id, steps_def))
+    run.auth = _auth_session(job_id, steps_def, options)
+    try:
+        run.replay = _har_replay(job_id, options)
+    except FileNotFoundError as exc:
+        run.status = "failed"
+        run.step_results.add(_failed_step(1, exc))
+    return run
+
+
+def _failure_screenshot(page: Page, run: _Run, idx: int) -> str | None:
+    """Capture the page as the step failed; None if the page can no longer be captured."""
+    screenshot_name = run.screenshot_name(idx)
+    try:
+        page.screenshot(path=run.path(screenshot_name), full_page=run.options.full_page)
+    except Exception:  # noqa: BLE001
+        return None
+    return screenshot_name
+
+
+def _execute(run: _Run) -> None:
+    # A fresh context per run keeps cookies, storage and cache isolated;
+    # a saved login session is the only state it may start from.
+    with browser_pool.new_context(**run.auth.context_options) as context:
+        if run.replay:
+            context.route_from_har(run.replay.path, not_found=run.options.har_not_found)
+        page = context.new_page()
+        # Bounds anything not given its own timeout, e.g. screenshots.
+        page.set_default_timeout(run.options.step_timeout_ms)
+
+        for idx, step in run.steps():
+            step_started = time.perf_counter()
+            try:
+                navigation = _perform_step(
+                    page,
+                    step,
+                    run.step_timeout_ms(),
+                    run.navigation_timeout_ms(),
+                    run.base_url,
+                )
+
+                # Screenshots of passing steps follow the run's policy
+                screenshot_name = run.passed_screenshot(idx)
+                if screenshot_name:
+                    page.screenshot(path=run.path(screenshot_name), full_page=run.options.full_page)
+                run.passed(idx, step, step_started, navigation, screenshot_name)
+                if run.auth.captures_after(idx):
+                    run.auth_captured(context.storage_state(), page.url)
+            except Exception as exc:  # noqa: BLE001
+                run.failure_status(exc)
+                run.failed(idx, step, step_started, exc, _failure_screenshot(page, run, idx))
+                break
+
+
+def run_test(job_id: str, test_id: str, options: Dict[str, Any] | None = None) -> None:
+    """
+    RQ task that executes a generated Playwright JSON test in an isolated
+    container and stores a structured report.
+
+    Steps run under their own timeouts, each cut down to what is left of
+    the run's budget; a run out of time stops with status "timeout".
+    Step results are published to the run's event stream as they happen.
+    """
+    rq_job = get_current_job()
+    run_id = rq_job.id if rq_job else _local_run_id(test_id)
+    # Runs enqueued without timeouts get the default profile's.
+    run_options = RunOptions.from_dict(options).for_profile(None)
+    run = _start_run(
+        job_id,
+        test_id,
+        run_id,
+        run_options,
+        run_events.publish,
+        settings.runner_run_timeout_seconds,
+    )
+    if run.status == "passed":
+        _execute(run)
+    run.finish()
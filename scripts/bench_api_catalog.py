@@ -0,0 +1,153 @@
+"""
+Benchmark of build_api_catalog on a synthetic HAR.
+
+Writes a HAR of about --size-mb megabytes (JSON API calls with textual
+bodies, mixed with base64 images, as Playwright records them in `embed`
+mode), plus one response with a --large-body-mb megabyte textual body (a
+bundled script or data dump), then builds the job's API catalog in a fresh
+process per reader and reports wall time and peak RSS:
+
+- stream: `semantic.build_api_catalog` (entries streamed with ijson).
+- load:   the HAR read whole and `json.loads`-ed first, as before.
+
+    python scripts/bench_api_catalog.py --size-mb 500 --large-body-mb 300
+
+Needs the backend requirements installed; nothing else is touched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "apps" / "backend"
+JOB_ID = "bench_job"
+
+
+def _entry(index: int) -> dict:
+    headers = [{"name": f"x-header-{n}", "value": "v" * 40} for n in range(12)]
+    if index % 10 == 0:
+        body = base64.b64encode(os.urandom(150_000)).decode("ascii")
+        content = {"size": 150_000, "mimeType": "image/png", "text": body, "encoding": "base64"}
+        url = f"https://example.test/static/img_{index}.png"
+    else:
+        payload = {"id": index, "items": [{"name": f"item {n}", "price": n * 1.5} for n in range(40)]}
+        text = json.dumps(payload)
+        content = {"size": len(text), "mimeType": "application/json", "text": text}
+        url = f"https://example.test/api/items/{index}?page={index % 7}"
+    return {
+        "startedDateTime": "2024-01-01T00:00:00.000Z",
+        "time": 12.5,
+        "request": {"method": "GET", "url": url, "httpVersion": "HTTP/1.1", "headers": headers, "cookies": []},
+        "response": {"status": 200, "statusText": "OK", "headers": headers, "cookies": [], "content": content},
+        "timings": {"send": 0.1, "wait": 10.0, "receive": 2.4},
+    }
+
+
+# Escaped quotes throughout, as in an embedded JSON or JavaScript body.
+_LARGE_BODY_PIECE = '{"k": "v", "s": "\\u00e9"} ' * 40_000
+
+
+def _write_large_entry(handle, size_mb: int) -> None:
+    """One entry with a `size_mb` MB body, written piece by piece to keep this process small."""
+    pieces = max(1, size_mb * 1_000_000 // len(_LARGE_BODY_PIECE))
+    entry = {
+        "startedDateTime": "2024-01-01T00:00:00.000Z",
+        "time": 250.0,
+        "request": {"method": "GET", "url": "https://example.test/static/bundle.js", "headers": [], "cookies": []},
+        "response": {
+            "status": 200,
+            "headers": [],
+            "cookies": [],
+            "content": {"size": pieces * len(_LARGE_BODY_PIECE), "mimeType": "application/javascript", "text": ""},
+        },
+        "timings": {"send": 0.1, "wait": 40.0, "receive": 209.9},
+    }
+    before, after = json.dumps(entry).split('"text": ""')
+    escaped = json.dumps(_LARGE_BODY_PIECE)[1:-1]
+    handle.write(before + '"text": "')
+    for _ in range(pieces):
+        handle.write(escaped)
+    handle.write('"' + after)
+
+
+def write_har(path: Path, size_mb: int, large_body_mb: int = 0) -> int:
+    """
+    Stream a HAR of roughly `size_mb` MB, plus the large body, to `path`;
+    returns the entry count.
+    """
+    target = size_mb * 1_000_000
+    count = 0
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write('{"log": {"version": "1.2", "creator": {"name": "bench"}, "entries": [')
+        if large_body_mb:
+            _write_large_entry(handle, large_body_mb)
+            count += 1
+            target += handle.tell()
+        while handle.tell() < target:
+            handle.write(("," if count else "") + json.dumps(_entry(count)))
+            count += 1
+        handle.write("]}}")
+    return count
+
+
+def _run_reader(mode: str) -> None:
+    sys.path.insert(0, str(BACKEND_DIR))
+    import semantic
+    from har import read_response_body
+
+    started = time.perf_counter()
+    if mode == "stream":
+        catalog = semantic.build_api_catalog(JOB_ID)
+    else:
+        har_dir = Path(os.environ["STORAGE_ROOT"]) / JOB_ID
+        har = json.loads((har_dir / "trace.har").read_text(encoding="utf-8"))
+        catalog = {
+            "endpoints": [
+                {
+                    "method": entry["request"]["method"],
+                    "url": entry["request"]["url"],
+                    "status": entry["response"]["status"],
+                    "sampleResponseBody": read_response_body(entry["response"]["content"], har_dir),
+                }
+                for entry in har["log"]["entries"]
+            ]
+        }
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"mode": mode, "seconds": round(elapsed, 2), "peakRssMb": round(peak_mb, 1),
+                      "endpoints": len(catalog["endpoints"])}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument("--large-body-mb", type=int, default=100, help="0 leaves the large body out")
+    parser.add_argument("--modes", default="stream,load", help="comma-separated: stream, load")
+    parser.add_argument("--reader", choices=("stream", "load"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.reader:
+        _run_reader(args.reader)
+        return
+
+    with tempfile.TemporaryDirectory() as root:
+        har_path = Path(root) / JOB_ID / "trace.har"
+        har_path.parent.mkdir()
+        count = write_har(har_path, args.size_mb, args.large_body_mb)
+        print(f"HAR: {har_path.stat().st_size / 1e6:.0f} MB, {count} entries")
+        env = {**os.environ, "STORAGE_ROOT": root, "SEMANTIC_CACHE_ENABLED": "false"}
+        for mode in args.modes.split(","):
+            subprocess.run([sys.executable, __file__, "--reader", mode], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()